@@ -0,0 +1,198 @@
+import importlib
+import sys
+import time
+import tkinter as tk
+from collections import OrderedDict
+
+# --- Single-window application shell ---
+# Every page used to create its own tk.Tk() and run its own mainloop(). Here one
+# root window hosts all of them: a screen module is imported and built the first
+# time it is visited (build_screen(parent, navigate)), kept as a hidden frame so
+# going back to it is instant, and destroyed again when too many screens (or too
+# many widgets) are being kept around - the least visited ones go first.
+#
+# Usage:
+#   python app_shell.py [first screen name]
+
+# Screen name -> module implementing build_screen(parent, navigate=None)
+SCREENS = {
+    "start": "logo_enavroom",
+    "home": "home_page",
+    "book_enavroom": "book_enavroom",
+    "book_enacar": "book_enacar",
+    "messages": "message_page",
+    "notifications": "notifications_page",
+    "history": "history_page",
+    "moto_taxi": "drop_down_test",
+    "enacar": "drop_down_enacar",
+    "pickup_dropoff": "pickup_dropoff_page",
+    "pickup": "choose_pickup_loc",
+    "dropoff": "choose_dropoff_loc",
+    "vehicle": "map",
+}
+
+BACK = "back"  # navigate(BACK) returns to the previous screen
+FIRST_SCREEN = "start"
+
+MAX_BUILT_SCREENS = 6
+MAX_WIDGETS = 1500  # rough memory cap: widgets kept alive across all built screens
+DEFAULT_GEOMETRY = "400x700"
+
+
+def nav_command(navigate, screen, fallback):
+    """Button command: switch to screen inside the shell, or run fallback when the
+       page is running on its own (navigate is None).
+    """
+    if navigate is None:
+        return fallback
+    return lambda: navigate(screen)
+
+
+def count_widgets(widget):
+    count = 1
+    for child in widget.winfo_children():
+        count += count_widgets(child)
+    return count
+
+
+def run_standalone(build_screen, title, geometry=DEFAULT_GEOMETRY, resizable=False):
+    """Runs one page in its own window, as the page scripts did before the shell."""
+    import startup_profile
+    if startup_profile.enabled():
+        # Profile this page in a fresh interpreter instead of opening it
+        sys.exit(startup_profile.profile_current_script())
+    root = tk.Tk()
+    root.title(title)
+    root.geometry(geometry)
+    if not resizable:
+        root.resizable(False, False)
+    build_screen(root).pack(fill=tk.BOTH, expand=True)
+    root.mainloop()
+
+
+class _BuiltScreen:
+    __slots__ = ("name", "frame", "widgets", "visits", "last_shown")
+
+    def __init__(self, name, frame, widgets):
+        self.name = name
+        self.frame = frame
+        self.widgets = widgets
+        self.visits = 0
+        self.last_shown = 0.0
+
+
+class Router:
+    """Builds screens lazily inside one window and switches between them."""
+
+    def __init__(self, root, screens=None, max_screens=MAX_BUILT_SCREENS, max_widgets=MAX_WIDGETS):
+        self.root = root
+        self.screens = dict(SCREENS if screens is None else screens)
+        self.max_screens = max_screens
+        self.max_widgets = max_widgets
+        self.container = tk.Frame(root)
+        self.container.pack(fill=tk.BOTH, expand=True)
+        self._built = OrderedDict()  # name -> _BuiltScreen
+        self._history = []
+        self.current = None
+        self.evictions = 0
+        self.switch_times = {}       # name -> list of (ms, was_built_now)
+
+    # --- Navigation ---
+    def navigate(self, name):
+        if name == BACK:
+            if len(self._history) < 2:
+                return
+            self._history.pop()
+            name = self._history.pop()
+        if name not in self.screens:
+            raise KeyError(f"Unknown screen: {name}")
+        if name == self.current:
+            return
+
+        start = time.perf_counter()
+        screen = self._built.get(name)
+        built_now = screen is None
+        if built_now:
+            screen = self._build(name)
+
+        if self.current is not None and self.current in self._built:
+            self._built[self.current].frame.pack_forget()
+        screen.frame.pack(fill=tk.BOTH, expand=True)
+        module = sys.modules[self.screens[name]]
+        self.root.title(getattr(module, "SCREEN_TITLE", "ENAVROOM"))
+        self.root.geometry(getattr(module, "SCREEN_GEOMETRY", DEFAULT_GEOMETRY))
+
+        self.current = name
+        screen.visits += 1
+        screen.last_shown = time.monotonic()
+        self._built.move_to_end(name)
+        self._history.append(name)
+        del self._history[:-50]
+
+        self.root.update_idletasks()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.switch_times.setdefault(name, []).append((elapsed_ms, built_now))
+        self._evict()
+
+    def _build(self, name):
+        module = importlib.import_module(self.screens[name])
+        frame = module.build_screen(self.container, navigate=self.navigate)
+        screen = _BuiltScreen(name, frame, count_widgets(frame))
+        self._built[name] = screen
+        return screen
+
+    # --- Eviction ---
+    def built_widgets(self):
+        return sum(screen.widgets for screen in self._built.values())
+
+    def _evict(self):
+        while len(self._built) > 1 and (len(self._built) > self.max_screens
+                                        or self.built_widgets() > self.max_widgets):
+            hidden = [s for s in self._built.values() if s.name != self.current]
+            # Rarely visited first, then least recently shown
+            victim = min(hidden, key=lambda s: (s.visits, s.last_shown))
+            del self._built[victim.name]
+            victim.frame.destroy()  # images are released by image_lifetime
+            self.evictions += 1
+
+    # --- Reporting ---
+    def latency_stats(self):
+        """Per screen: visits, cold (first build) and warm switch times in ms."""
+        stats = {}
+        for name, samples in self.switch_times.items():
+            cold = [ms for ms, built in samples if built]
+            warm = [ms for ms, built in samples if not built]
+            stats[name] = {
+                "switches": len(samples),
+                "cold_ms": round(max(cold), 2) if cold else None,
+                "warm_mean_ms": round(sum(warm) / len(warm), 2) if warm else None,
+                "warm_max_ms": round(max(warm), 2) if warm else None,
+                "last_ms": round(samples[-1][0], 2),
+            }
+        return stats
+
+    def stats(self):
+        return {
+            "current": self.current,
+            "built_screens": list(self._built),
+            "built_widgets": self.built_widgets(),
+            "evictions": self.evictions,
+            "latency": self.latency_stats(),
+        }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    first = argv[0] if argv else FIRST_SCREEN
+    root = tk.Tk()
+    root.resizable(False, False)
+    router = Router(root)
+    import quote_cache  # here, not at the top: text-only screens import this module too
+    quote_cache.start_prewarm()  # campus routes are priced by the time the booking screen opens
+    router.navigate(first)
+    root.mainloop()
+    return router
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import json
+import mmap
+import os
+import threading
+
+# --- Runtime side of the pre-sized icon atlases (see build_assets.py) ---
+# Instead of opening and resizing each PNG, the image cache asks here first: the
+# atlas for the current scale is memory-mapped once as raw RGBA and each sprite
+# is sliced out of that single buffer. Sprites whose source file changed since
+# the build (different mtime/size) are ignored so the normal decode path is used.
+
+INDEX_VERSION = 1
+DEFAULT_ATLAS_DIR = os.environ.get("ENAVROOM_ATLAS_DIR") or \
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+
+def sprite_key(filename, size=None):
+    return f"{filename}@{size[0]}x{size[1]}" if size else filename
+
+
+def atlas_basename(scale):
+    return f"atlas@{scale:g}x"
+
+
+def current_scale():
+    try:
+        return float(os.environ.get("ENAVROOM_UI_SCALE", "1"))
+    except ValueError:
+        return 1.0
+
+
+class Atlas:
+    """One decoded (or memory-mapped) atlas image plus its sprite index."""
+
+    def __init__(self, index, image, mapping=None):
+        self.index = index
+        self.image = image
+        self._mapping = mapping  # keeps the mmap open as long as the image uses it
+        self.sprites = index["sprites"]
+        self.sources = index["sources"]
+
+    @classmethod
+    def load(cls, atlas_dir, scale):
+        """Loads an atlas, or returns None if it hasn't been built."""
+        from PIL import Image
+
+        base = os.path.join(atlas_dir, atlas_basename(scale))
+        try:
+            with open(base + ".json", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get("version") != INDEX_VERSION:
+            return None
+        size = tuple(index["size"])
+        try:
+            with open(base + ".rgba", "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(mapping) != size[0] * size[1] * 4:
+                mapping.close()
+                raise ValueError("raw atlas does not match its index")
+            image = Image.frombuffer("RGBA", size, mapping, "raw", "RGBA", 0, 1)
+            return cls(index, image, mapping)
+        except (OSError, ValueError):
+            pass
+        try:
+            with Image.open(base + ".png") as img:
+                return cls(index, img.convert("RGBA"))
+        except OSError:
+            return None
+
+    def is_fresh(self, path):
+        stamp = self.sources.get(os.path.basename(path))
+        if stamp is None:
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        return stamp == [stat.st_mtime_ns, stat.st_size]
+
+    def lookup(self, path, size=None):
+        """Returns a PIL copy of the sprite for (path, size), or None if not in the atlas."""
+        box = self.sprites.get(sprite_key(os.path.basename(path), size))
+        if box is None or not self.is_fresh(path):
+            return None
+        x, y, w, h = box
+        return self.image.crop((x, y, x + w, y + h))
+
+
+# --- Loaded atlases, one per (folder, scale); None when not built ---
+_atlases = {}
+_atlases_lock = threading.Lock()  # the image loader threads look sprites up too
+
+
+def get_atlas(scale=None, atlas_dir=None):
+    scale = current_scale() if scale is None else scale
+    atlas_dir = atlas_dir or DEFAULT_ATLAS_DIR
+    key = (atlas_dir, scale)
+    with _atlases_lock:
+        if key not in _atlases:
+            _atlases[key] = Atlas.load(atlas_dir, scale)
+        return _atlases[key]
+
+
+def lookup(path, size=None):
+    """Sprite for (path, size) from the current atlas, or None to fall back to decoding."""
+    atlas = get_atlas()
+    if atlas is None:
+        return None
+    return atlas.lookup(path, tuple(size) if size else None)
+
+
+def reset():
+    """Forgets loaded atlases (e.g. after running build_assets.py again)."""
+    with _atlases_lock:
+        _atlases.clear()
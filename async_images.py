@@ -0,0 +1,77 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+import image_cache
+
+# --- Background image decoding ---
+# Decoding and resizing happen on a small worker pool (Pillow releases the GIL
+# while it works), so a screen can show placeholders and appear right away.
+# Tk is not thread safe: workers only produce PIL images, and the PhotoImage is
+# built and handed to the caller on the Tk thread by polling with after().
+
+DEFAULT_WORKERS = 4
+POLL_INTERVAL_MS = 15
+
+
+class AsyncImageLoader:
+    """Loads images off the Tk thread and delivers PhotoImages back on it."""
+
+    def __init__(self, master, max_workers=DEFAULT_WORKERS, poll_ms=POLL_INTERVAL_MS):
+        self.master = master
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-loader")
+        self._done = queue.SimpleQueue()
+        self._pending = 0
+        self._poll_id = None
+        self._closed = False
+        master.bind("<Destroy>", self._on_master_destroy, add="+")
+
+    def load(self, path, size, on_ready, on_error=None):
+        """Starts decoding path at size. on_ready(photo) / on_error(exc) run on the Tk thread."""
+        if self._closed:
+            return
+        future = self._executor.submit(image_cache.load_pil, path, size)
+        future.add_done_callback(lambda f: self._done.put((f, path, size, on_ready, on_error)))
+        self._pending += 1
+        if self._poll_id is None:
+            self._poll_id = self.master.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                future, path, size, on_ready, on_error = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            error = future.exception()
+            try:
+                if error is None:
+                    # Already decoded by the worker, so this is a cache hit
+                    on_ready(image_cache.load_photo(path, size))
+                elif on_error is not None:
+                    on_error(error)
+            except Exception as e:
+                # e.g. the widget was destroyed while its image was loading
+                print(f"Error delivering image {path}: {e}")
+        if self._pending > 0 and not self._closed:
+            self._poll_id = self.master.after(self.poll_ms, self._poll)
+
+    def pending(self):
+        return self._pending
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._poll_id is not None:
+            try:
+                self.master.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_master_destroy(self, event):
+        if event.widget is self.master:
+            self.close()
@@ -0,0 +1,78 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# --- Cold vs warm start asset loading benchmark ---
+# Loads every (image, size) the screens request (see build_assets.py) the way a
+# fresh launch would: a new in-process image cache each time, with the on-disk
+# thumbnail cache empty (cold) or filled by the previous launch (warm).
+# The atlas is turned off so only the thumbnail cache is measured.
+#
+# Usage:
+#   python bench_assets.py --source ~/Downloads --runs 5
+
+os.environ["ENAVROOM_ATLAS_DIR"] = os.path.join(tempfile.gettempdir(), "enavroom-no-atlas")
+
+import build_assets
+import image_cache
+import thumbnail_cache
+
+
+def _load_all(requests, source_dir):
+    cache = image_cache.ImageCache()
+    start = time.perf_counter()
+    for filename, size in requests:
+        cache.get_pil(os.path.join(source_dir, filename), size)
+    elapsed = time.perf_counter() - start
+    return elapsed, cache.stats()
+
+
+def run(source_dir, runs):
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    requests = [(f, s) for f, s in build_assets.collect_requests(project_dir)
+                if s and os.path.exists(os.path.join(source_dir, f))]
+    if not requests:
+        print(f"No requested images found in {source_dir}")
+        return 1
+    print(f"{len(requests)} resized images from {source_dir}")
+
+    cold_times = []
+    warm_times = []
+    for _ in range(runs):
+        thumb_dir = tempfile.mkdtemp(prefix="enavroom-thumbs-")
+        try:
+            thumbnail_cache.set_shared_cache(thumbnail_cache.ThumbnailCache(thumb_dir))
+            elapsed, _ = _load_all(requests, source_dir)
+            cold_times.append(elapsed)
+
+            # Next "launch": new thumbnail cache object reading the same folder
+            thumbnail_cache.set_shared_cache(thumbnail_cache.ThumbnailCache(thumb_dir))
+            elapsed, stats = _load_all(requests, source_dir)
+            warm_times.append(elapsed)
+            if stats["thumbnail_hits"] != len(requests):
+                print(f"Warning: only {stats['thumbnail_hits']} of {len(requests)} loads hit the thumbnail cache")
+        finally:
+            shutil.rmtree(thumb_dir, ignore_errors=True)
+
+    cold = min(cold_times) * 1000
+    warm = min(warm_times) * 1000
+    print(f"cold start: {cold:8.2f} ms (best of {runs})")
+    print(f"warm start: {warm:8.2f} ms (best of {runs})")
+    print(f"speed-up:   {cold / warm if warm else float('inf'):8.1f}x")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare cold and warm start asset load time.")
+    parser.add_argument("--source", default=os.path.dirname(os.path.abspath(__file__)),
+                        help="folder holding the source PNGs (default: this folder)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+    return run(args.source, args.runs)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
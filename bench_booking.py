@@ -0,0 +1,93 @@
+import argparse
+import sys
+import tempfile
+import threading
+import time
+
+import booking_service
+
+# --- Booking journal benchmark ---
+# Many threads book at once (each call returns only when its booking is
+# fsynced), then every booking is moved on to "assigned". Reports durable
+# bookings per second, how many events shared each fsync (group commit) and
+# call latency, then how long a restart takes: replaying the whole journal,
+# and loading the snapshot written by close().
+#
+# Usage:
+#   python bench_booking.py --threads 64 --bookings 20000 [--folder /path/on/the/real/disk]
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run(folder, thread_count, booking_count, fsync):
+    service = booking_service.BookingService(folder, snapshot_every=10 ** 9, fsync=fsync)
+    latencies = []
+    ids = []
+    per_thread = booking_count // thread_count
+
+    def book():
+        mine = []
+        times = []
+        for i in range(per_thread):
+            start = time.perf_counter()
+            mine.append(service.create("PUP Main", "PUP LHS", "Enavroom-vroom", 75, "Cash").id)
+            times.append(time.perf_counter() - start)
+        latencies.extend(times)
+        ids.extend(mine)
+
+    def assign(chunk):
+        for booking_id in chunk:
+            service.set_status(booking_id, "assigned")
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=book) for _ in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    print(f"create   {len(ids)} bookings in {seconds:.2f} s ({len(ids) / seconds:,.0f} /s), "
+          f"p50 {_percentile(latencies, 0.5) * 1000:.2f} ms, p99 {_percentile(latencies, 0.99) * 1000:.2f} ms")
+    print(f"         {service.stats()}")
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=assign, args=(ids[i::thread_count],)) for i in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    print(f"assign   {len(ids)} status changes in {seconds:.2f} s ({len(ids) / seconds:,.0f} /s)")
+
+    # Restart without close(): everything comes from the journal
+    replayed = booking_service.BookingService(folder, fsync=fsync)
+    print(f"replay   {replayed.stats()}")
+    service = replayed
+    start = time.perf_counter()
+    service.close()
+    print(f"snapshot written in {(time.perf_counter() - start) * 1000:.1f} ms")
+    reopened = booking_service.BookingService(folder, fsync=fsync)
+    print(f"reopen   {reopened.stats()}")
+    assert all(reopened.get(booking_id).status == "assigned" for booking_id in ids)
+    reopened.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the booking journal (group commit).")
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--bookings", type=int, default=20000)
+    parser.add_argument("--folder", help="journal folder (default: a temporary one)")
+    parser.add_argument("--no-fsync", action="store_true", help="skip fsync, to see the cost of the rest")
+    args = parser.parse_args(argv)
+    if args.folder:
+        return run(args.folder, args.threads, args.bookings, not args.no_fsync)
+    with tempfile.TemporaryDirectory() as folder:
+        return run(folder, args.threads, args.bookings, not args.no_fsync)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
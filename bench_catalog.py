@@ -0,0 +1,165 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import fuzzy_index
+import location_catalog
+
+# --- Location search benchmark ---
+# Builds a synthetic Metro Manila catalog (default 500k places made from street,
+# barangay and city names) and times location_catalog searches on it, then
+# misspelled names, which go through the fuzzy_index fallback.
+#
+# Usage:
+#   python bench_catalog.py --places 500000 --queries 2000
+
+CITIES = ["City of Manila", "Quezon City", "Makati City", "Pasig City", "Taguig City", "Mandaluyong City",
+          "San Juan City", "Pasay City", "Parañaque City", "Las Piñas City", "Muntinlupa City",
+          "Marikina City", "Caloocan City", "Malabon City", "Navotas City", "Valenzuela City", "Pateros"]
+KINDS = ["Building", "Residences", "Tower", "Plaza", "Market", "Elementary School", "Church", "Terminal",
+         "Hospital", "Barangay Hall", "Mall", "Condominium", "Station", "Park", "Bakery", "Pharmacy"]
+QUERY_KINDS = ["typing", "full name", "name + area", "common word", "fragments"]
+SYLLABLES = ["ma", "sa", "ka", "ta", "li", "ng", "ba", "lo", "pi", "nas", "ro", "san", "del", "mo", "ri",
+             "gu", "ya", "cruz", "to", "mas", "an", "ge", "les", "ver", "de", "bo", "ni", "fa", "cio"]
+
+
+def _word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def synthetic_places(count, seed=1):
+    rng = random.Random(seed)
+    streets = [f"{_word(rng)} Street" for _ in range(5000)] + [f"{_word(rng)} Avenue" for _ in range(800)]
+    barangays = [_word(rng) for _ in range(1700)]
+    for place_id in range(count):
+        name = f"{_word(rng)} {rng.choice(KINDS)}"
+        address = (f"{rng.randint(1, 2999)} {rng.choice(streets)}, {rng.choice(barangays)}, "
+                   f"{rng.choice(CITIES)}, Metro Manila, Philippines")
+        yield location_catalog.Place(place_id, name, address)
+
+
+def make_queries(catalog, count, seed=2):
+    """[(kind, query)] - the kinds of text people type into the location pickers."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        place = catalog.get(rng.randrange(len(catalog)))
+        name_words = place.name.split()
+        area = place.address.split(",")[1].split()
+        kind = rng.choice(QUERY_KINDS)
+        if kind == "typing":       # first letters of the name
+            query = name_words[0][:rng.randint(2, len(name_words[0]))]
+        elif kind == "full name":
+            query = place.name
+        elif kind == "name + area":  # "sabanas mar" style
+            query = f"{name_words[0]} {area[0][:rng.randint(3, len(area[0]))]}"
+        elif kind == "common word":  # matches a big part of the catalog
+            query = rng.choice(CITIES).split()[0][:5]
+        else:                      # fragments from the middle of two words
+            query = f"{name_words[0][1:5]} {area[-1][:4]}"
+        queries.append((kind, query))
+    return queries
+
+
+def _misspell(word, rng):
+    """word with one letter dropped, replaced, added or swapped with the next one."""
+    i = rng.randrange(len(word) - 1)
+    edit = rng.randrange(4)
+    if edit == 0:
+        return word[:i] + word[i + 1:]
+    if edit == 1:
+        return word[:i] + rng.choice("aeiouy") + word[i + 1:]
+    if edit == 2:
+        return word[:i] + rng.choice("aeiouy") + word[i:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def make_typos(catalog, count, seed=3):
+    """Place names with one misspelled word, like "Sabanass Tower"."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        words = catalog.get(rng.randrange(len(catalog))).name.split()
+        words[0] = _misspell(words[0], rng)
+        queries.append(" ".join(words))
+    return queries
+
+
+def _summary(times):
+    times = sorted(times)
+    return (f"mean {statistics.mean(times):6.3f} ms  p50 {times[len(times) // 2]:6.3f} ms  "
+            f"p95 {times[int(len(times) * 0.95)]:6.3f} ms  max {times[-1]:6.3f} ms")
+
+
+def run(place_count, query_count, limit):
+    start = time.perf_counter()
+    places = list(synthetic_places(place_count))
+    catalog = location_catalog.LocationCatalog(places)
+    print(f"built {len(catalog)} places in {time.perf_counter() - start:.2f} s  {catalog.stats()}")
+
+    by_kind = {kind: [] for kind in QUERY_KINDS}
+    empty = 0
+    for kind, query in make_queries(catalog, query_count):
+        start = time.perf_counter()
+        results = catalog.search(query, limit)
+        by_kind[kind].append((time.perf_counter() - start) * 1000)
+        empty += not results
+    print(f"{query_count} searches (limit {limit}), {empty} without results")
+    for kind, times in by_kind.items():
+        if times:
+            print(f"  {kind:13} {len(times):5d}  {_summary(times)}")
+    print(f"  {'all':13} {query_count:5d}  {_summary([t for times in by_kind.values() for t in times])}")
+    # Fragment searches build trigram bitmaps as they go; the same searches again use them
+    again = {kind: [] for kind in QUERY_KINDS}
+    for kind, query in make_queries(catalog, query_count):
+        start = time.perf_counter()
+        catalog.search(query, limit)
+        again[kind].append((time.perf_counter() - start) * 1000)
+    print(f"the same searches again ({catalog.stats()['trigram_bitmaps']} trigram bitmaps kept)")
+    for kind in ("fragments", "all"):
+        times = again[kind] if kind != "all" else [t for times in again.values() for t in times]
+        print(f"  {kind:13} {len(times):5d}  {_summary(times)}")
+
+    # Typos: the first one builds the fuzzy index, then save / load it like a relaunch would
+    fuzzy = catalog.fuzzy()
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "fuzzy.pickle")
+        start = time.perf_counter()
+        fuzzy.save(path)
+        save_ms = (time.perf_counter() - start) * 1000
+        loaded = fuzzy_index.FuzzyIndex.load(path)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"fuzzy index {fuzzy.stats()}")
+    print(f"  saved in {save_ms:.0f} ms ({size_mb:.1f} MB), loaded in {loaded.load_seconds * 1000:.0f} ms")
+    typo_times = []
+    lookup_times = []
+    empty = 0
+    for query in make_typos(catalog, query_count):
+        start = time.perf_counter()
+        results = catalog.search(query, limit)
+        typo_times.append((time.perf_counter() - start) * 1000)
+        empty += not results
+        start = time.perf_counter()
+        fuzzy.lookup(location_catalog.normalize(query).split()[0])
+        lookup_times.append((time.perf_counter() - start) * 1000)
+    print(f"{query_count} misspelled searches, {empty} without results")
+    print(f"  {'search':13} {query_count:5d}  {_summary(typo_times)}")
+    print(f"  {'word lookup':13} {query_count:5d}  {_summary(lookup_times)}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark location_catalog search.")
+    parser.add_argument("--places", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=location_catalog.DEFAULT_LIMIT)
+    args = parser.parse_args(argv)
+    return run(args.places, args.queries, args.limit)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
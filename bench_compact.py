@@ -0,0 +1,116 @@
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import bench_catalog
+import compact_catalog
+import location_catalog
+
+# --- Compact catalog benchmark ---
+# Compares a list of Place objects with a compact_catalog file for the same
+# synthetic places: memory held, time to open, and time to read places back.
+# Then the same for the whole LocationCatalog (what get_catalog() loads, with
+# its search indexes) over either, plus search time, with RSS where /proc has it.
+#
+# Usage:
+#   python bench_compact.py --places 1000000
+
+
+def _heap_mb(make):
+    """(result of make(), MB of Python heap it keeps alive)."""
+    gc.collect()
+    tracemalloc.start()
+    result = make()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size / (1024 * 1024)
+
+
+def _rss_mb():
+    """Resident memory of this process (Linux), or None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return None
+
+
+def _catalog(label, make, queries):
+    gc.collect()
+    rss = _rss_mb()
+    start = time.perf_counter()
+    catalog = make()
+    open_s = time.perf_counter() - start
+    gc.collect()
+    rss_mb = None if rss is None else _rss_mb() - rss
+    start = time.perf_counter()
+    results = [[place.id for place in catalog.search(query)] for _, query in queries]
+    search_us = (time.perf_counter() - start) / len(queries) * 1e6
+    print(f"{label:15} opened in {open_s:.2f} s"
+          + ("" if rss_mb is None else f", RSS +{rss_mb:.1f} MB")
+          + f", {search_us:.0f} us per search")
+    return catalog, results
+
+
+def _read_all(places, indexes):
+    start = time.perf_counter()
+    for i in indexes:
+        place = places[i]
+        place.name, place.address, place.lat
+    return (time.perf_counter() - start) / len(indexes) * 1e6
+
+
+def run(place_count, reads):
+    start = time.perf_counter()
+    image = compact_catalog.build(bench_catalog.synthetic_places(place_count))
+    print(f"built {place_count} places in {time.perf_counter() - start:.1f} s")
+    indexes = [random.Random(4).randrange(place_count) for _ in range(reads)]
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "places.bin")
+        with open(path, "wb") as f:
+            f.write(image)
+        del image
+
+        start = time.perf_counter()
+        compact, compact_mb = _heap_mb(lambda: compact_catalog.CompactPlaces.open(path))
+        open_ms = (time.perf_counter() - start) * 1000
+        print(f"compact file   {os.path.getsize(path) / (1024 * 1024):7.1f} MB on disk (mapped), "
+              f"{compact_mb:6.2f} MB Python heap, opened in {open_ms:.1f} ms, "
+              f"{_read_all(compact, indexes):.2f} us per place read  {compact.stats()}")
+
+        start = time.perf_counter()
+        places, list_mb = _heap_mb(lambda: list(bench_catalog.synthetic_places(place_count)))
+        print(f"list of Place  {list_mb:7.1f} MB Python heap, made in {time.perf_counter() - start:.1f} s, "
+              f"{_read_all(places, indexes):.2f} us per place read")
+        compact.close()
+
+        # The catalog the app uses: indexes built over each kind of places
+        queries = bench_catalog.make_queries(location_catalog.LocationCatalog(places[:10000]), 500)
+        del places
+        catalog, compact_results = _catalog("catalog/compact",
+                                            lambda: location_catalog.load_catalog(path), queries)
+        catalog.places.close()
+        del catalog
+        _, list_results = _catalog("catalog/list", lambda: location_catalog.LocationCatalog(
+            bench_catalog.synthetic_places(place_count)), queries)
+        assert compact_results == list_results
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark compact_catalog against a list of places.")
+    parser.add_argument("--places", type=int, default=1000000)
+    parser.add_argument("--reads", type=int, default=100000)
+    args = parser.parse_args(argv)
+    return run(args.places, args.reads)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
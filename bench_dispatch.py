@@ -0,0 +1,140 @@
+import argparse
+import random
+import sys
+import tempfile
+import time
+
+import booking_service
+import dispatch
+import fleet_store
+
+# --- Dispatch benchmark ---
+# One dispatch window: drivers spread over Metro Manila, requests partly
+# spread the same way and partly bunched around the campus (class change),
+# with the usual mix of vehicle types. Times the grid candidate search and the
+# assignment separately, and compares the total pickup distance with handing
+# each request, in arrival order, its nearest free driver. First checks that a
+# cancelled booking is not matched and that a refused match frees its driver.
+#
+# Usage:
+#   python bench_dispatch.py --drivers 10000 --requests 2000
+
+SOUTH, NORTH = 14.40, 14.76
+WEST, EAST = 120.94, 121.12
+CAMPUS = (14.5979, 121.0108)
+VEHICLES = [("Enavroom-vroom", 0.6), ("Car (4-seater)", 0.3), ("Car (6-seater)", 0.1)]
+
+
+def _vehicle(rng):
+    return rng.choices([v for v, _ in VEHICLES], [share for _, share in VEHICLES])[0]
+
+
+def make_window(driver_count, request_count, campus_share, seed):
+    rng = random.Random(seed)
+    drivers = [(f"D{i}", rng.uniform(SOUTH, NORTH), rng.uniform(WEST, EAST), _vehicle(rng))
+               for i in range(driver_count)]
+    requests = []
+    for i in range(request_count):
+        if rng.random() < campus_share:
+            lat, lon = rng.gauss(CAMPUS[0], 0.01), rng.gauss(CAMPUS[1], 0.01)
+        else:
+            lat, lon = rng.uniform(SOUTH, NORTH), rng.uniform(WEST, EAST)
+        requests.append(dispatch.Request(i, lat, lon, _vehicle(rng)))
+    return drivers, requests
+
+
+def greedy(pairs):
+    """Nearest still-free candidate per request, in arrival order."""
+    taken = set()
+    matched = []
+    for request_pairs in pairs:
+        driver = next((index for _, index in request_pairs if index not in taken), None)
+        if driver is not None:
+            taken.add(driver)
+        matched.append(driver)
+    return matched
+
+
+def _summary(label, pairs, matched, seconds):
+    costs = [next(cost for cost, index in p if index == driver) for p, driver in zip(pairs, matched)
+             if driver is not None]
+    mean = sum(costs) / len(costs) if costs else 0.0
+    print(f"  {label:12} {seconds * 1000:8.1f} ms  matched {len(costs):5}  "
+          f"total pickup {sum(costs) / 1000:8.1f} km  mean {mean:6.0f} m")
+
+
+def check_cancelled():
+    """A booking cancelled before its window gets no driver; one cancelled while the window
+       runs (on_assign refuses it) leaves its driver available.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        service = booking_service.BookingService(folder, fsync=False)
+        fleet = fleet_store.FleetStore()
+        fleet.update(1, CAMPUS[0], CAMPUS[1], 0, vehicle="Enavroom-vroom")
+        fleet.update(2, CAMPUS[0] + 0.001, CAMPUS[1], 0, vehicle="Enavroom-vroom")
+
+        def is_requested(booking_id):
+            return service.get(booking_id).status == "requested"
+
+        def mark_assigned(booking_id, driver_id, metres):
+            service.set_status(booking_id, "assigned")
+
+        dispatcher = dispatch.Dispatcher(on_assign=mark_assigned, fleet=fleet, is_open=is_requested)
+        kept = service.create("PUP Main", "PUP LHS", "Enavroom-vroom", 75, "Cash")
+        gone = service.create("PUP Main", "CEA", "Enavroom-vroom", 75, "Cash")
+        for booking in (kept, gone):
+            dispatcher.submit(booking.id, CAMPUS[0], CAMPUS[1], booking.vehicle)
+        service.cancel(gone.id)
+        assignments = dispatcher.run_window()
+        assert [booking_id for booking_id, _, _ in assignments] == [kept.id], assignments
+        assert len(fleet.available()) == 1 and dispatcher.open_requests() == 0
+
+        # Cancelled after the window took it: the match is refused, the driver stays free
+        late = service.create("PUP Main", "Hasmin", "Enavroom-vroom", 75, "Cash")
+        dispatcher.is_open = None
+        dispatcher.submit(late.id, CAMPUS[0], CAMPUS[1], late.vehicle)
+        service.cancel(late.id)
+        assert dispatcher.run_window() == []
+        assert len(fleet.available()) == 1 and dispatcher.stats()["failed"] == 1
+        service.close()
+    print("cancelled bookings: not matched, refused match frees its driver")
+
+
+def run(driver_count, request_count, campus_share):
+    check_cancelled()
+    drivers, requests = make_window(driver_count, request_count, campus_share, seed=1)
+    print(f"{len(drivers)} drivers, {len(requests)} requests ({campus_share:.0%} around the campus)")
+
+    start = time.perf_counter()
+    pairs = dispatch.candidate_pairs(requests, drivers)
+    candidates_seconds = time.perf_counter() - start
+    print(f"  candidates   {candidates_seconds * 1000:8.1f} ms  {sum(len(p) for p in pairs)} pairs "
+          f"(of {len(drivers) * len(requests)} possible)")
+
+    start = time.perf_counter()
+    matched = dispatch.assign(pairs, len(drivers))
+    _summary("assignment", pairs, matched, time.perf_counter() - start)
+    start = time.perf_counter()
+    _summary("greedy", pairs, greedy(pairs), time.perf_counter() - start)
+
+    dispatcher = dispatch.Dispatcher()
+    for driver_id, lat, lon, vehicle in drivers:
+        dispatcher.set_driver(driver_id, lat, lon, vehicle)
+    for request in requests:
+        dispatcher.submit(request.booking_id, request.lat, request.lon, request.vehicle)
+    dispatcher.run_window()
+    print(f"  run_window   {dispatcher.stats()['last_window']}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark one dispatch window.")
+    parser.add_argument("--drivers", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--campus", type=float, default=0.3, help="share of requests around the campus")
+    args = parser.parse_args(argv)
+    return run(args.drivers, args.requests, args.campus)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
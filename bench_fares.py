@@ -0,0 +1,58 @@
+import argparse
+import sys
+import time
+
+import fares
+
+# --- Fare benchmark ---
+# Re-quotes a batch of made-up past trips (1-25 km, city speeds, a mix of
+# vehicles and surge) with fares.Tariffs.quote_many, and a sample of them
+# one by one with quote() for comparison (same pesos expected).
+#
+# Usage:
+#   python bench_fares.py --trips 5000000
+
+
+def make_trips(count, vehicle_count, seed):
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    metres = rng.uniform(1000, 25000, count)
+    seconds = metres / rng.uniform(3, 12, count)  # 11-43 km/h
+    vehicles = rng.integers(0, vehicle_count, count)
+    surge = rng.choice([1.0, 1.0, 1.0, 1.2, 1.5], count)
+    return metres, seconds, vehicles, surge
+
+
+def run(trip_count, loop_count):
+    tariffs = fares.Tariffs.load()
+    metres, seconds, vehicles, surge = make_trips(trip_count, len(tariffs.vehicles), seed=1)
+
+    start = time.perf_counter()
+    quotes = tariffs.quote_many(metres, seconds, vehicles, surge)
+    seconds_taken = time.perf_counter() - start
+    print(f"quote_many  {trip_count} trips in {seconds_taken:.3f} s ({trip_count / seconds_taken:,.0f} /s)")
+
+    names = [tariffs.vehicles[v] for v in vehicles[:loop_count].tolist()]
+    start = time.perf_counter()
+    looped = [tariffs.quote(m, s, name, g) for m, s, name, g in
+              zip(metres[:loop_count].tolist(), seconds[:loop_count].tolist(), names, surge[:loop_count].tolist())]
+    seconds_taken = time.perf_counter() - start
+    print(f"quote loop  {loop_count} trips in {seconds_taken:.3f} s ({loop_count / seconds_taken:,.0f} /s)")
+
+    different = sum(a != b for a, b in zip(looped, quotes[:loop_count].tolist()))
+    print(f"{different} of {loop_count} looped quotes differ from the batch")
+    print("mean fare per vehicle: " + ", ".join(
+        f"{name} ₱{quotes[vehicles == v].mean():.0f}" for v, name in enumerate(tariffs.vehicles)))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark batch fare quotes.")
+    parser.add_argument("--trips", type=int, default=5000000)
+    parser.add_argument("--loop", type=int, default=200000, help="trips also quoted one by one")
+    args = parser.parse_args(argv)
+    return run(args.trips, min(args.loop, args.trips))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
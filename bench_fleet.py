@@ -0,0 +1,114 @@
+import argparse
+import sys
+import time
+
+import fleet_store
+
+# --- Fleet store benchmark ---
+# Drivers spread over Metro Manila send GPS pings; they arrive in batches, a
+# few of them late (older than what is already stored). Times ingest() per
+# batch and compares it with updating one object per driver ping by ping, then
+# times what the readers do: the map's nearby() count and the dispatcher's
+# available() list, while the store is full.
+#
+# Usage:
+#   python bench_fleet.py --drivers 20000 --pings 2000000 --batch 5000
+
+SOUTH, NORTH = 14.40, 14.76
+WEST, EAST = 120.94, 121.12
+CAMPUS = (14.5979, 121.0108)
+LATE_SHARE = 0.02  # pings that arrive after a newer one from the same driver
+
+
+class _Driver:
+    __slots__ = ("lat", "lon", "heading", "seen", "status", "vehicle")
+
+
+def make_batches(driver_count, ping_count, batch_size, seed):
+    """[(ids, lats, lons, headings, times)] of NumPy arrays, ping_count pings in all."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(SOUTH, NORTH, driver_count)
+    lons = rng.uniform(WEST, EAST, driver_count)
+    clock = time.time() - 30
+    batches = []
+    for _ in range(max(1, ping_count // batch_size)):
+        ids = rng.integers(0, driver_count, batch_size)
+        lats[ids] += rng.normal(0, 0.0001, batch_size)
+        lons[ids] += rng.normal(0, 0.0001, batch_size)
+        clock += 0.01
+        times = np.full(batch_size, clock) + rng.uniform(0, 0.01, batch_size)
+        times[rng.random(batch_size) < LATE_SHARE] -= 1.0
+        batches.append((ids, lats[ids], lons[ids], rng.uniform(0, 360, batch_size), times))
+    return batches
+
+
+def _objects(driver_count, batches):
+    """Pings applied one by one to a dict of driver objects, for comparison."""
+    drivers = {}
+    start = time.perf_counter()
+    for ids, lats, lons, headings, times in batches:
+        for driver_id, lat, lon, heading, seen in zip(ids.tolist(), lats.tolist(), lons.tolist(),
+                                                      headings.tolist(), times.tolist()):
+            driver = drivers.get(driver_id)
+            if driver is None:
+                driver = drivers[driver_id] = _Driver()
+                driver.seen = -1.0
+                driver.status = fleet_store.AVAILABLE
+                driver.vehicle = 0
+            if seen > driver.seen:
+                driver.lat, driver.lon, driver.heading, driver.seen = lat, lon, heading % 360, seen
+    return time.perf_counter() - start
+
+
+def run(driver_count, ping_count, batch_size):
+    import numpy as np
+    batches = make_batches(driver_count, ping_count, batch_size, seed=1)
+    pings = sum(len(batch[0]) for batch in batches)
+    print(f"{driver_count} drivers, {pings} pings in batches of {batch_size}")
+
+    fleet = fleet_store.FleetStore()
+    rng = np.random.default_rng(2)
+    ids = np.arange(driver_count)
+    fleet.ingest(ids, np.full(driver_count, CAMPUS[0]), np.full(driver_count, CAMPUS[1]),
+                 np.zeros(driver_count), np.full(driver_count, time.time() - 60),
+                 vehicles=rng.choice(len(fleet_store.VEHICLES), driver_count, p=[0.6, 0.3, 0.1]))
+    batch_seconds = []
+    for batch in batches:
+        start = time.perf_counter()
+        fleet.ingest(*batch)
+        batch_seconds.append(time.perf_counter() - start)
+    seconds = sum(batch_seconds)
+    batch_seconds.sort()
+    stats = fleet.stats()
+    print(f"  ingest     {pings / seconds:12,.0f} pings/s  batch p50 {batch_seconds[len(batch_seconds) // 2] * 1000:.2f} ms"
+          f"  p99 {batch_seconds[int(len(batch_seconds) * 0.99)] * 1000:.2f} ms  ({stats['dropped']} late or superseded pings dropped)")
+    object_seconds = _objects(driver_count, batches)
+    print(f"  objects    {pings / object_seconds:12,.0f} pings/s  (one object per driver, ping by ping)")
+    print(f"  memory     {stats['bytes_per_driver']} bytes a driver record, "
+          f"{stats['bytes'] / stats['drivers']:.1f} bytes a driver with the id lookup and spare capacity")
+
+    for label, read, repeat in [
+        ("column", lambda: fleet.column("lat"), 10000),
+        ("nearby", lambda: fleet.nearby(CAMPUS[0], CAMPUS[1], 2000), 200),
+        ("available", lambda: fleet.available("Car (4-seater)"), 20),
+    ]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = read()
+        per_call = (time.perf_counter() - start) / repeat
+        print(f"  {label:10} {per_call * 1000:9.3f} ms a call  ({len(result)} results)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark batched GPS ingest into the fleet store.")
+    parser.add_argument("--drivers", type=int, default=20000)
+    parser.add_argument("--pings", type=int, default=2000000)
+    parser.add_argument("--batch", type=int, default=5000, help="pings per ingest() call")
+    args = parser.parse_args(argv)
+    return run(args.drivers, args.pings, args.batch)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
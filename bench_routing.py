@@ -0,0 +1,110 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import contraction
+import routing
+from spatial_index import haversine_m
+
+# --- Routing benchmark ---
+# Builds a city-sized street grid over Metro Manila (jittered junctions, an
+# avenue every AVENUE_EVERY streets, some one-way and some missing blocks) and
+# compares the contraction hierarchy with the plain searches of routing.py:
+# preprocessing time, index size on disk, load time and query latency for
+# random node pairs. The hierarchy's answers are checked against Dijkstra.
+#
+# Usage:
+#   python bench_routing.py --size 150 --queries 300
+
+SOUTH, NORTH = 14.40, 14.76
+WEST, EAST = 120.94, 121.12
+AVENUE_EVERY = 8
+
+
+def make_grid(size, seed):
+    """routing.RoadGraph of a size x size street grid."""
+    rng = random.Random(seed)
+    lat_step = (NORTH - SOUTH) / size
+    lon_step = (EAST - WEST) / size
+    lats = []
+    lons = []
+    for row in range(size):
+        for column in range(size):
+            lats.append(SOUTH + (row + rng.uniform(-0.3, 0.3)) * lat_step)
+            lons.append(WEST + (column + rng.uniform(-0.3, 0.3)) * lon_step)
+    edges = []
+    for row in range(size):
+        for column in range(size):
+            node = row * size + column
+            for other, avenue in ((node + 1, row % AVENUE_EVERY == 0), (node + size, column % AVENUE_EVERY == 0)):
+                if (other == node + 1 and column == size - 1) or other >= size * size:
+                    continue
+                if not avenue and rng.random() < 0.05:
+                    continue  # missing block
+                length = haversine_m(lats[node], lons[node], lats[other], lons[other])
+                speed = routing.SPEEDS_KPH["primary" if avenue else "residential"] / 3.6
+                edges.append((node, other, length, length / speed))
+                if avenue or rng.random() > 0.15:  # some one-way streets
+                    edges.append((other, node, length, length / speed))
+    return routing.RoadGraph(lats, lons, edges)
+
+
+def _time(label, pairs, run_one):
+    times = []
+    for source, target in pairs:
+        start = time.perf_counter()
+        run_one(source, target)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    print(f"  {label:20} {len(times) / (sum(times) / 1000):9.0f} /s  mean {statistics.mean(times):8.3f} ms  "
+          f"p50 {times[len(times) // 2]:8.3f} ms  p95 {times[int(len(times) * 0.95)]:8.3f} ms")
+
+
+def run(size, query_count):
+    start = time.perf_counter()
+    graph = make_grid(size, seed=1)
+    print(f"graph {graph.stats()} in {time.perf_counter() - start:.2f} s")
+
+    hierarchy = contraction.ContractionHierarchy.build(graph)
+    print(f"preprocessing {hierarchy.build_seconds:.2f} s: {hierarchy.stats()}")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "roads.pickle")
+        hierarchy.save(path, "bench")
+        file_mb = os.path.getsize(path) / (1024 * 1024)
+        hierarchy = contraction.ContractionHierarchy.load(path, "bench")
+    print(f"index file {file_mb:.2f} MB, loaded in {hierarchy.load_seconds * 1000:.1f} ms")
+
+    rng = random.Random(2)
+    pairs = [(rng.randrange(len(graph)), rng.randrange(len(graph))) for _ in range(query_count)]
+
+    # Same answers as Dijkstra (travel times; metres may differ between equally fast paths)
+    wrong = 0
+    for source, target in pairs[:50]:
+        expected = graph.costs_from(source, [target]).get(target)
+        found = hierarchy.path(source, target)
+        if (expected is None) != (found is None) or (found and abs(found[0] - expected[0]) > 1e-6):
+            wrong += 1
+    print(f"checked 50 pairs against Dijkstra: {wrong} different")
+
+    print("queries:")
+    _time("dijkstra", pairs, lambda s, t: graph.costs_from(s, [t]))
+    _time("a*", pairs, graph.shortest_path)
+    _time("hierarchy distance", pairs, hierarchy.query)
+    _time("hierarchy path", pairs, hierarchy.path)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark contraction hierarchy routing against A* and Dijkstra.")
+    parser.add_argument("--size", type=int, default=150, help="streets per side of the grid")
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args(argv)
+    return run(args.size, args.queries)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
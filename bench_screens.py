@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+# --- Time-to-interactive benchmark for every screen ---
+# Each screen is built through its build_screen() entry point (no mainloop) in
+# its own interpreter, several times in a row, and we record:
+#   widgets        - widgets created by the screen
+#   build_ms       - build_screen() + update_idletasks()
+#   first_paint_ms - from the start of the build until the screen is mapped and drawn
+#   idle_ms        - idle-loop latency: delay of an after(0) callback, sampled
+#                    repeatedly once the screen is up (mean and worst)
+# The median of the runs is compared with bench_baselines.json; anything more
+# than --threshold (20%) slower than its baseline fails the run, and so does a
+# screen without a baseline (or no baseline file at all): record them on the
+# reference machine with --update-baseline and commit the file.
+#
+# If DISPLAY isn't set an Xvfb server is started for the benchmark.
+#
+# Usage:
+#   python bench_screens.py                     # all screens, compare to baselines
+#   python bench_screens.py map choose_pickup_loc --runs 10
+#   python bench_screens.py --update-baseline   # record new baselines
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINES = os.path.join(PROJECT_DIR, "bench_baselines.json")
+DEFAULT_THRESHOLD = 0.20
+TIMED_KEYS = ("build_ms", "first_paint_ms", "idle_mean_ms", "idle_max_ms")
+IDLE_SAMPLES = 50
+
+
+# --- Child process: build one screen repeatedly ---
+def _measure_once(root, module, tk):
+    start = time.perf_counter()
+    frame = module.build_screen(root)
+    frame.pack(fill=tk.BOTH, expand=True)
+    root.update_idletasks()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # First paint: wait for the frame to be mapped, then let Tk draw it
+    while not frame.winfo_ismapped():
+        root.update()
+    root.update()
+    first_paint_ms = (time.perf_counter() - start) * 1000
+
+    delays = []
+    for _ in range(IDLE_SAMPLES):
+        done = []
+        scheduled = time.perf_counter()
+        root.after(0, lambda: done.append(time.perf_counter()))
+        while not done:
+            root.update()
+        delays.append((done[0] - scheduled) * 1000)
+
+    import app_shell
+    widgets = app_shell.count_widgets(frame)
+    frame.destroy()
+    root.update()
+    return {
+        "widgets": widgets,
+        "build_ms": build_ms,
+        "first_paint_ms": first_paint_ms,
+        "idle_mean_ms": statistics.mean(delays),
+        "idle_max_ms": max(delays),
+    }
+
+
+def _bench_child(module_name, runs):
+    import importlib
+    import tkinter as tk
+
+    module = importlib.import_module(module_name)
+    root = tk.Tk()
+    root.geometry(getattr(module, "SCREEN_GEOMETRY", "400x700"))
+    samples = [_measure_once(root, module, tk) for _ in range(runs)]
+    root.destroy()
+    print(json.dumps(samples))
+
+
+def bench_module(module_name, runs, timeout=300):
+    code = f"import bench_screens; bench_screens._bench_child({module_name!r}, {runs})"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR,
+                          capture_output=True, text=True, timeout=timeout)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        error = proc.stderr.strip().splitlines()[-1:] or ["no output"]
+        return {"module": module_name, "error": error[0]}
+    samples = json.loads(lines[-1])
+    # The first run pays for imports and cold caches; report it separately
+    result = {"module": module_name, "runs": runs, "widgets": samples[0]["widgets"],
+              "cold_build_ms": round(samples[0]["build_ms"], 2)}
+    for key in TIMED_KEYS:
+        result[key] = round(statistics.median(s[key] for s in samples), 2)
+    return result
+
+
+# --- Virtual display ---
+def start_xvfb():
+    """Starts Xvfb on a free display number and points DISPLAY at it."""
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        return None
+    for number in range(99, 130):
+        if os.path.exists(f"/tmp/.X11-unix/X{number}") or os.path.exists(f"/tmp/.X{number}-lock"):
+            continue
+        proc = subprocess.Popen([xvfb, f":{number}", "-screen", "0", "1024x768x24", "-nolisten", "tcp"],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and proc.poll() is None:
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                os.environ["DISPLAY"] = f":{number}"
+                return proc
+            time.sleep(0.05)
+        proc.terminate()
+    return None
+
+
+# --- Baselines ---
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("screens", {})
+
+
+def save_baselines(path, results):
+    screens = load_baselines(path)
+    for result in results:
+        if "error" not in result:
+            screens[result["module"]] = {key: result[key] for key in ("widgets",) + TIMED_KEYS}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"python": sys.version.split()[0], "screens": screens}, f, indent=2, sort_keys=True)
+
+
+def compare(results, baselines, threshold):
+    """Returns a list of regressions (more than threshold slower than baseline, or no baseline)."""
+    regressions = []
+    for result in results:
+        if "error" in result:
+            regressions.append(f"{result['module']}: failed ({result['error']})")
+            continue
+        baseline = baselines.get(result["module"])
+        if not baseline:
+            regressions.append(f"{result['module']}: no baseline (run with --update-baseline)")
+            continue
+        for key in TIMED_KEYS:
+            old = baseline.get(key)
+            if old and result[key] > old * (1 + threshold):
+                regressions.append(f"{result['module']}: {key} {result[key]:.2f} ms vs baseline "
+                                   f"{old:.2f} ms (+{(result[key] / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time-to-interactive benchmark for the ENAVROOM screens.")
+    parser.add_argument("modules", nargs="*", help="screen modules (default: all app_shell screens)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baselines", default=DEFAULT_BASELINES)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slow-down before failing (0.20 = 20%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baselines")
+    args = parser.parse_args(argv)
+
+    if not args.update_baseline and not os.path.exists(args.baselines):
+        print(f"No baselines at {args.baselines}: run with --update-baseline first and commit the file")
+        return 2
+
+    import app_shell
+    modules = args.modules or list(dict.fromkeys(app_shell.SCREENS.values()))
+
+    xvfb = None
+    if not os.environ.get("DISPLAY"):
+        xvfb = start_xvfb()
+        if xvfb is None:
+            print("No DISPLAY and Xvfb could not be started")
+            return 2
+    try:
+        results = []
+        for module_name in modules:
+            result = bench_module(module_name, max(1, args.runs))
+            results.append(result)
+            if "error" in result:
+                print(f"{module_name:22} ERROR {result['error']}")
+            else:
+                print(f"{module_name:22} {result['widgets']:5d} widgets  build {result['build_ms']:7.2f} ms  "
+                      f"paint {result['first_paint_ms']:7.2f} ms  idle {result['idle_mean_ms']:5.2f}"
+                      f"/{result['idle_max_ms']:5.2f} ms  (cold build {result['cold_build_ms']:.2f} ms)")
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    if args.update_baseline:
+        save_baselines(args.baselines, results)
+        print(f"Baselines written to {args.baselines}")
+        return 0
+    regressions = compare(results, load_baselines(args.baselines), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
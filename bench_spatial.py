@@ -0,0 +1,70 @@
+import argparse
+import random
+import statistics
+import sys
+import time
+
+import spatial_index
+
+# --- Nearest-place benchmark ---
+# Scatters points over Metro Manila (pickup spots, drivers) and times
+# spatial_index queries one by one and as NumPy batches.
+#
+# Usage:
+#   python bench_spatial.py --points 100000 --queries 5000
+
+SOUTH, NORTH = 14.40, 14.76
+WEST, EAST = 120.94, 121.12
+
+
+def random_points(count, seed):
+    rng = random.Random(seed)
+    return [(rng.uniform(SOUTH, NORTH), rng.uniform(WEST, EAST)) for _ in range(count)]
+
+
+def _time(label, queries, run_one):
+    times = []
+    for lat, lon in queries:
+        start = time.perf_counter()
+        run_one(lat, lon)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    print(f"  {label:16} {len(times) / (sum(times) / 1000):9.0f} /s  mean {statistics.mean(times):6.3f} ms  "
+          f"p50 {times[len(times) // 2]:6.3f} ms  p95 {times[int(len(times) * 0.95)]:6.3f} ms")
+
+
+def run(point_count, query_count, radius_m):
+    points = random_points(point_count, seed=1)
+    index = spatial_index.SpatialIndex((i, lat, lon) for i, (lat, lon) in enumerate(points))
+    print(f"built {index.stats()}")
+    queries = random_points(query_count, seed=2)
+    _time("nearest k=1", queries, lambda lat, lon: index.nearest(lat, lon, 1))
+    _time("nearest k=5", queries, lambda lat, lon: index.nearest(lat, lon, 5))
+    _time(f"within {radius_m:.0f} m", queries, lambda lat, lon: index.within(lat, lon, radius_m))
+
+    try:
+        import numpy as np
+    except ImportError:
+        print("  (NumPy not installed, batch queries skipped)")
+        return 0
+    lats = np.array([q[0] for q in queries])
+    lons = np.array([q[1] for q in queries])
+    for k in (1, 5):
+        start = time.perf_counter()
+        index.nearest_many(lats, lons, k)
+        seconds = time.perf_counter() - start
+        print(f"  {'batch k=' + str(k):16} {query_count / seconds:9.0f} /s  ({seconds * 1000:.1f} ms for {query_count})")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark spatial_index queries.")
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--radius", type=float, default=500.0, help="metres, for within()")
+    args = parser.parse_args(argv)
+    return run(args.points, args.queries, args.radius)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
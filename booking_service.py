@@ -0,0 +1,359 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+
+# --- Bookings ---
+# Every booking and every status change is an event appended to a journal
+# file (journal.log in DEFAULT_DIR). A call returns only once its event is on
+# disk (fsync), but callers don't each pay for an fsync: one writer thread takes
+# every event queued since its last write, writes them together and fsyncs once
+# for the whole group (group commit), so many concurrent bookings share one
+# disk flush.
+#
+# Journal lines are "<crc32 hex> <json>\n"; a line cut short by a crash fails
+# its checksum and is dropped, with everything after it, when the journal is
+# replayed. Every SNAPSHOT_EVERY events (and on close) the state is written to
+# snapshot.json and the journal starts over, so a restart loads the snapshot and
+# replays only the events after it.
+#
+#   service = get_service()
+#   booking = service.create("PUP Main", "PUP LHS", "Enavroom-vroom", 75, "Cash")
+#   service.set_status(booking.id, "assigned")
+#   service.get(booking.id).status   ->  "assigned"
+
+DEFAULT_DIR = os.environ.get(
+    "ENAVROOM_BOOKINGS_DIR", os.path.join(os.path.expanduser("~"), ".local", "share", "enavroom", "bookings"))
+JOURNAL_NAME = "journal.log"
+SNAPSHOT_NAME = "snapshot.json"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_EVERY = 50000  # events
+
+# Status -> statuses a booking may move to from it
+TRANSITIONS = {
+    "requested": {"assigned", "cancelled"},
+    "assigned": {"picked_up", "cancelled"},
+    "picked_up": {"completed"},
+    "completed": set(),
+    "cancelled": set(),
+}
+
+
+class Booking:
+    __slots__ = ("id", "pickup", "dropoff", "vehicle", "fare", "payment", "status", "created", "updated")
+
+    def __init__(self, id, pickup, dropoff, vehicle, fare, payment, status="requested", created=None, updated=None):
+        self.id = id
+        self.pickup = pickup      # place names
+        self.dropoff = dropoff
+        self.vehicle = vehicle
+        self.fare = fare          # whole pesos, as quoted
+        self.payment = payment
+        self.status = status
+        self.created = created    # time.time()
+        self.updated = updated
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"Booking({self.id}, {self.pickup!r} -> {self.dropoff!r}, {self.vehicle!r}, {self.status})"
+
+
+def _encode(event):
+    payload = json.dumps(event, separators=(",", ":")).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def _decode(line):
+    """The event on one journal line, or None if the line is damaged or incomplete."""
+    if len(line) < 10 or not line.endswith(b"\n") or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def _fsync_folder(folder):
+    fd = os.open(folder, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class BookingService:
+    """Bookings in memory, every change made durable in the journal before a call returns."""
+
+    def __init__(self, folder=DEFAULT_DIR, snapshot_every=SNAPSHOT_EVERY, fsync=True):
+        """fsync=False skips the disk flushes (benchmarks of the rest only)."""
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.journal_path = os.path.join(folder, JOURNAL_NAME)
+        self.snapshot_path = os.path.join(folder, SNAPSHOT_NAME)
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.bookings = {}
+        self.seq = 0          # last event applied
+        self.next_id = 1
+        self.commits = 0      # journal writes (one fsync each)
+        self.events_written = 0
+        self.replayed = 0
+        self.dropped_bytes = 0  # damaged journal tail cut off by the last replay
+        start = time.perf_counter()
+        self._snapshot_seq = self._recover()
+        self.recover_seconds = time.perf_counter() - start
+
+        self._journal = open(self.journal_path, "ab")
+        self._lock = threading.Lock()
+        self._queued = threading.Condition(self._lock)   # events waiting for the writer
+        self._durable = threading.Condition(self._lock)  # durable_seq moved on
+        self._pending = []
+        self._durable_seq = self.seq
+        self._error = None
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="booking-journal", daemon=True)
+        self._writer.start()
+
+    # --- Recovery ---
+    def _recover(self):
+        """Loads the snapshot and replays the journal after it; returns the snapshot's seq."""
+        snapshot_seq = 0
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            snapshot = None
+        if snapshot is not None:
+            if snapshot.get("version") != SNAPSHOT_VERSION:
+                raise ValueError(f"{self.snapshot_path} has an unknown snapshot version")
+            for fields in snapshot["bookings"]:
+                booking = Booking(**fields)
+                self.bookings[booking.id] = booking
+            self.seq = snapshot_seq = snapshot["seq"]
+            self.next_id = snapshot["next_id"]
+
+        good_bytes = 0
+        try:
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    event = _decode(line)
+                    if event is None:
+                        break
+                    good_bytes += len(line)
+                    if event["seq"] > self.seq:
+                        self._apply(event)
+                        self.replayed += 1
+                size = f.seek(0, os.SEEK_END)
+        except FileNotFoundError:
+            return snapshot_seq
+        if size > good_bytes:
+            # A write cut short by a crash: nothing after it was acknowledged
+            self.dropped_bytes = size - good_bytes
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(good_bytes)
+                os.fsync(f.fileno())
+        return snapshot_seq
+
+    def _apply(self, event):
+        if event["type"] == "created":
+            booking = Booking(**event["booking"])
+            self.bookings[booking.id] = booking
+            self.next_id = max(self.next_id, booking.id + 1)
+        elif event["type"] == "status":
+            booking = self.bookings[event["id"]]
+            booking.status = event["status"]
+            booking.updated = event["at"]
+        self.seq = event["seq"]
+
+    # --- Changes ---
+    def create(self, pickup, dropoff, vehicle, fare, payment):
+        """Records a new "requested" Booking and returns it once it is durable."""
+        now = time.time()
+        with self._lock:
+            self._check_open()
+            booking = Booking(self.next_id, pickup, dropoff, vehicle, fare, payment, "requested", now, now)
+            seq = self._append({"type": "created", "booking": booking.to_dict()})
+            self._wait_durable(seq)
+            return self.bookings[booking.id]
+
+    def set_status(self, booking_id, status):
+        """Moves a booking to status (see TRANSITIONS) once the change is durable."""
+        with self._lock:
+            self._check_open()
+            booking = self.bookings.get(booking_id)
+            if booking is None:
+                raise ValueError(f"No booking {booking_id}")
+            if status not in TRANSITIONS.get(booking.status, ()):
+                raise ValueError(f"Booking {booking_id} can't go from {booking.status!r} to {status!r}")
+            seq = self._append({"type": "status", "id": booking_id, "status": status, "at": time.time()})
+            self._wait_durable(seq)
+        return booking
+
+    def cancel(self, booking_id):
+        return self.set_status(booking_id, "cancelled")
+
+    def get(self, booking_id):
+        with self._lock:
+            return self.bookings.get(booking_id)
+
+    def _check_open(self):
+        if self._closed:
+            raise ValueError("The booking service is closed")
+        if self._error is not None:
+            raise self._error
+
+    def _append(self, event):
+        """Applies event in memory and queues it for the writer (lock held); returns its seq."""
+        event["seq"] = self.seq + 1
+        self._apply(event)
+        self._pending.append(_encode(event))
+        self._queued.notify()
+        return event["seq"]
+
+    def _wait_durable(self, seq):
+        while self._durable_seq < seq and self._error is None:
+            self._durable.wait()
+        if self._durable_seq < seq:
+            raise self._error
+
+    # --- Writer (group commit) ---
+    def _write_loop(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._queued.wait()
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, []
+                batch_seq = self.seq
+            try:
+                self._journal.write(b"".join(batch))
+                self._journal.flush()
+                if self.fsync:
+                    os.fsync(self._journal.fileno())
+            except OSError as e:
+                with self._lock:
+                    self._error = e
+                    self._durable.notify_all()
+                return
+            with self._lock:
+                self._durable_seq = batch_seq
+                self.commits += 1
+                self.events_written += len(batch)
+                self._durable.notify_all()
+                snapshot_due = batch_seq - self._snapshot_seq >= self.snapshot_every
+            if snapshot_due:
+                try:
+                    self._snapshot()
+                except OSError as e:
+                    with self._lock:
+                        self._error = e
+                        self._durable.notify_all()
+                    return
+
+    def _snapshot(self):
+        """Writes the state to the snapshot file and starts an empty journal (writer thread only)."""
+        with self._lock:
+            seq = self.seq
+            state = {"version": SNAPSHOT_VERSION, "seq": seq, "next_id": self.next_id,
+                     "bookings": [booking.to_dict() for booking in self.bookings.values()]}
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f, separators=(",", ":"))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        # The new snapshot must be on disk under its name before the journal goes
+        if self.fsync:
+            _fsync_folder(self.folder)
+        # Events up to seq are in the snapshot now (even those still queued, which
+        # the replay skips), so the journal can start over. Truncating in place
+        # keeps self._journal open even if this fails.
+        self._journal.truncate(0)
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        with self._lock:
+            self._snapshot_seq = seq
+            self._durable_seq = max(self._durable_seq, seq)
+            self._durable.notify_all()
+
+    def close(self):
+        """Writes what is queued, takes a snapshot and stops the writer."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queued.notify()
+        self._writer.join()
+        try:
+            if self._error is None:
+                self._snapshot()
+        finally:
+            self._journal.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "bookings": len(self.bookings),
+                "seq": self.seq,
+                "commits": self.commits,
+                "events_written": self.events_written,
+                "events_per_commit": round(self.events_written / self.commits, 1) if self.commits else None,
+                "replayed": self.replayed,
+                "dropped_bytes": self.dropped_bytes,
+                "recover_ms": round(self.recover_seconds * 1000, 2),
+            }
+
+
+_shared_service = None
+_shared_lock = threading.Lock()
+
+
+def get_service():
+    """The booking service shared by every screen (closed when the program exits)."""
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            import atexit
+            _shared_service = BookingService()
+            atexit.register(_shared_service.close)
+        return _shared_service
+
+
+_LOOK_UP = object()  # book_trip(): no quote given, get it from quote_cache
+
+
+def book_trip(pickup, dropoff, vehicle, payment="Cash", service=None, dispatcher=None, quote=_LOOK_UP):
+    """Books pickup -> dropoff (Places) for vehicle at its quoted fare (None without a route)
+       and queues it for a driver (see dispatch.py). quote is the Quote the rider was shown
+       (None: no route); without it the quote cache is asked, which may compute the route.
+       service and dispatcher default to the shared ones.
+    """
+    import dispatch
+    if quote is _LOOK_UP:
+        import quote_cache
+        quote = quote_cache.get_cache().get(pickup, dropoff, vehicle)
+    booking = (service or get_service()).create(pickup.name, dropoff.name, vehicle,
+                                                quote.fare if quote else None, payment)
+    if pickup.lat is not None:
+        (dispatcher or dispatch.get_dispatcher()).submit(booking.id, pickup.lat, pickup.lon, vehicle)
+    return booking
+
+
+def book_current_trip(vehicle, payment="Cash"):
+    """book_trip() for the current trip (see trip.py)."""
+    import trip
+    pickup, dropoff = trip.get_trip()
+    return book_trip(pickup, dropoff, vehicle, payment)
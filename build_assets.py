@@ -0,0 +1,235 @@
+import argparse
+import ast
+import glob
+import json
+import os
+import sys
+
+import asset_atlas
+
+# --- Offline asset build step ---
+# Scans the screen scripts for every (image, size) they ask the load helpers for,
+# resizes each source image once per scale factor and packs the results into one
+# atlas per scale:
+#   atlas@<scale>x.png   - the packed sprites (for inspection / fallback)
+#   atlas@<scale>x.rgba  - the same pixels as raw RGBA, memory-mapped at runtime
+#   atlas@<scale>x.json  - compact index: sprite key -> [x, y, w, h] + source stamps
+#
+# Usage:
+#   python build_assets.py --source ~/Downloads --out assets --scales 1 2
+
+# Helpers the screens use to load an image -> (filename position, size position)
+LOADER_NAMES = {
+    "load_and_resize_image_from_downloads": (0, 1),
+    "load_and_resize_icon_from_downloads": (0, 1),
+    "load_image": (0, 1),
+    "load_photo": (0, 1),
+    "load_image_async": (2, 3),
+}
+
+# Requests the scan can't see because the filename isn't a literal at the call:
+# map.py's service_options icons (loaded in create_service_option) and the logos
+# home_page.py / logo_enavroom.py load through a path variable
+EXTRA_REQUESTS = [
+    ("enavroom logo.png", (250, 100)),
+    ("logo.png", None),
+    ("enavroom_price.png", (40, 40)),
+    ("car_4.png", (40, 40)),
+    ("car_6.png", (40, 40)),
+]
+
+ATLAS_MAX_WIDTH = 2048
+SPRITE_PADDING = 1
+
+
+# --- Scanning the screens ---
+def _call_name(node):
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    return None
+
+
+def _literal(node, constants):
+    if node is None:
+        return None
+    if isinstance(node, ast.Name):
+        return constants.get(node.id)
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        return None
+
+
+def _size_argument(call, position, constants):
+    node = None
+    if len(call.args) > position:
+        node = call.args[position]
+    for keyword in call.keywords:
+        if keyword.arg == "size":
+            node = keyword.value
+    if node is None:
+        return None, False
+    return _literal(node, constants), True
+
+
+def _is_size(value):
+    return (isinstance(value, tuple) and len(value) == 2
+            and all(isinstance(v, int) for v in value))
+
+
+def scan_source(source):
+    """Returns the (filename, size) pairs one screen script requests."""
+    tree = ast.parse(source)
+
+    # Simple constant assignments like `icon_size = (40, 40)`
+    constants = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                constants[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                pass
+
+    # Default sizes of loaders defined in this file, and wrappers like
+    # create_nav_button(parent, filename, ...) that call a loader with a fixed size
+    default_sizes = {}
+    wrappers = {}
+    for func in ast.walk(tree):
+        if not isinstance(func, ast.FunctionDef):
+            continue
+        params = [a.arg for a in func.args.args]
+        if func.name in LOADER_NAMES and "size" in params:
+            defaults = func.args.defaults
+            offset = len(params) - len(defaults)
+            index = params.index("size")
+            if index >= offset:
+                default_sizes[func.name] = _literal(defaults[index - offset], constants)
+            continue
+        for call in ast.walk(func):
+            if not isinstance(call, ast.Call) or _call_name(call) not in LOADER_NAMES:
+                continue
+            name = _call_name(call)
+            file_pos, size_pos = LOADER_NAMES[name]
+            if len(call.args) <= file_pos:
+                continue
+            first = call.args[file_pos]
+            size, _ = _size_argument(call, size_pos, constants)
+            if isinstance(first, ast.Name) and first.id in params and _is_size(size):
+                wrappers[func.name] = (params.index(first.id), size)
+
+    requests = set()
+    for call in ast.walk(tree):
+        if not isinstance(call, ast.Call):
+            continue
+        name = _call_name(call)
+        if name in LOADER_NAMES:
+            file_pos, size_pos = LOADER_NAMES[name]
+            if len(call.args) <= file_pos:
+                continue
+            filename = _literal(call.args[file_pos], constants)
+            size, given = _size_argument(call, size_pos, constants)
+            if not given:
+                size = default_sizes.get(name)
+        elif name in wrappers:
+            index, size = wrappers[name]
+            if len(call.args) <= index:
+                continue
+            filename = _literal(call.args[index], constants)
+        else:
+            continue
+        if isinstance(filename, str) and filename.lower().endswith(".png"):
+            requests.add((filename, size if _is_size(size) else None))
+    return requests
+
+
+def collect_requests(project_dir):
+    requests = set(EXTRA_REQUESTS)
+    for path in sorted(glob.glob(os.path.join(project_dir, "*.py"))):
+        if os.path.basename(path) in ("build_assets.py", "asset_atlas.py"):
+            continue
+        with open(path, encoding="utf-8") as f:
+            requests |= scan_source(f.read())
+    return sorted(requests, key=lambda r: (r[0], r[1] or (0, 0)))
+
+
+# --- Packing ---
+def _shelf_pack(sprites, max_width):
+    """Places sprites (key, image) on rows, tallest first. Returns positions and atlas size."""
+    positions = {}
+    x = y = row_height = width = 0
+    for key, img in sorted(sprites, key=lambda s: s[1].size[1], reverse=True):
+        w, h = img.size
+        if x and x + w > max_width:
+            y += row_height + SPRITE_PADDING
+            x = row_height = 0
+        positions[key] = (x, y, w, h)
+        x += w + SPRITE_PADDING
+        row_height = max(row_height, h)
+        width = max(width, x)
+    return positions, (max(width, 1), max(y + row_height, 1))
+
+
+def build_atlas(requests, source_dir, out_dir, scale):
+    from PIL import Image
+
+    sprites = []
+    sources = {}
+    for filename, size in requests:
+        path = os.path.join(source_dir, filename)
+        if not os.path.exists(path):
+            print(f"Warning: {path} not found, skipping.")
+            continue
+        with Image.open(path) as img:
+            img = img.convert("RGBA")
+            target = size or img.size
+            scaled = (max(1, round(target[0] * scale)), max(1, round(target[1] * scale)))
+            sprites.append((asset_atlas.sprite_key(filename, size), img.resize(scaled, Image.LANCZOS)))
+        stat = os.stat(path)
+        sources[filename] = [stat.st_mtime_ns, stat.st_size]
+
+    positions, atlas_size = _shelf_pack(sprites, ATLAS_MAX_WIDTH)
+    atlas = Image.new("RGBA", atlas_size, (0, 0, 0, 0))
+    for key, img in sprites:
+        atlas.paste(img, positions[key][:2])
+
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, asset_atlas.atlas_basename(scale))
+    atlas.save(base + ".png", optimize=True)
+    with open(base + ".rgba", "wb") as f:
+        f.write(atlas.tobytes())
+    index = {
+        "version": asset_atlas.INDEX_VERSION,
+        "scale": scale,
+        "size": list(atlas_size),
+        "sources": sources,
+        "sprites": {key: list(pos) for key, pos in sorted(positions.items())},
+    }
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    print(f"Wrote {base}.png/.rgba/.json: {len(sprites)} sprites, {atlas_size[0]}x{atlas_size[1]}")
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build pre-sized icon atlases for the ENAVROOM screens.")
+    parser.add_argument("--source", default=os.path.join(os.path.expanduser("~"), "Downloads"),
+                        help="folder holding the source PNGs (default: ~/Downloads)")
+    parser.add_argument("--out", default=asset_atlas.DEFAULT_ATLAS_DIR, help="output folder for the atlases")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0], help="scale factors to build")
+    parser.add_argument("--list", action="store_true", help="only print the requested (image, size) pairs")
+    args = parser.parse_args(argv)
+
+    requests = collect_requests(os.path.dirname(os.path.abspath(__file__)))
+    if args.list:
+        for filename, size in requests:
+            print(filename, "x".join(map(str, size)) if size else "original")
+        return 0
+    for scale in args.scales:
+        build_atlas(requests, args.source, args.out, scale)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
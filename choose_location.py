@@ -0,0 +1,116 @@
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import messagebox
+import os # Import os for path manipulation
+import image_cache # Shared image cache (decodes each asset once)
+import location_catalog # Searchable list of pickup / drop-off places
+from typeahead import Typeahead # Debounced search on a worker thread
+from virtual_list import VirtualList, clip_lines # Reuses row widgets while scrolling
+from app_shell import nav_command, BACK # Screen switching inside the app shell
+
+# --- Choose a location (shared by the pickup and drop-off screens) ---
+# Locations come from the shared catalog (locations.csv). The search box feeds a
+# Typeahead: searches run on its worker thread once typing pauses, and the first
+# one (every place, for the empty box) also loads the catalog there, so building
+# the screen doesn't depend on how many places there are.
+RESULTS_SHOWN = 100 # Search results listed
+ROW_HEIGHT = 90 # Every row has the same height (name + up to two address lines)
+ADDRESS_WIDTH = 300 # Address wrap width in pixels
+ADDRESS_LINES = 2 # Longer addresses are cut short with "…" so they fit the row
+
+# --- Helper Functions for Images ---
+def get_download_image_path(filename):
+    home_dir = os.path.expanduser('~')
+    downloads_path = os.path.join(home_dir, 'Downloads')
+    full_path = os.path.join(downloads_path, filename)
+    return full_path
+
+def load_and_resize_image_from_downloads(filename, size=None):
+    path = get_download_image_path(filename)
+    try:
+        return image_cache.load_photo(path, size)
+    except FileNotFoundError:
+        messagebox.showerror("Error", f"Image '{path}' not found.\nPlease ensure '{filename}' is in your Downloads folder.")
+        return None
+    except Exception as e:
+        messagebox.showerror("Error", f"Could not load image '{path}': {e}")
+        return None
+
+def search_places(text, limit):
+    """Worker thread: the best places for text, or every place for an empty box."""
+    if text.strip():
+        return location_catalog.search(text, limit=limit)
+    return location_catalog.get_catalog().places # Every place, scrolled lazily
+
+def build_location_screen(parent, navigate, title, title_size=18):
+    """Builds a Choose ... Location screen titled title inside parent and returns its frame.
+       navigate(name) switches screens when running inside app_shell.
+    """
+    # --- Screen Frame (the window itself comes from app_shell) ---
+    root = tk.Frame(parent)
+    root.configure(bg="white")
+
+    # Top header bar (purple)
+    top_frame = tk.Frame(root, bg="#360042", height=60)
+    top_frame.pack(fill="x")
+    top_frame.pack_propagate(False) # Prevent frame from shrinking to fit contents
+
+    # --- Load and place the ENAVROOM logo inside the top_frame ---
+    enavroom_logo = load_and_resize_image_from_downloads("enavroom_logo.png", size=(120, 50)) # Adjusted size for header
+    if enavroom_logo:
+        logo_label = tk.Label(top_frame, image=enavroom_logo, bg="#360042") # Label background matches header
+        logo_label.image = enavroom_logo # Keep a reference to prevent garbage collection
+        logo_label.pack(expand=True) # Use expand=True to center the logo
+
+    # Title and Cancel button below the header
+    title_frame = tk.Frame(root, bg="white")
+    title_frame.pack(fill="x", pady=(20, 10), padx=20)
+
+    tk.Label(title_frame, text=title, font=("Helvetica", title_size, "bold"), bg="white").pack(side="left")
+
+    tk.Button(title_frame, text="Cancel", font=("Helvetica", 10), bg="white", bd=0,
+              command=nav_command(navigate, BACK, lambda: root.winfo_toplevel().destroy()), fg="black", activebackground="white", activeforeground="red").pack(side="right")
+
+    # Search box (filters the list once typing pauses)
+    search_entry = tk.Entry(root, font=("Helvetica", 12), bg="#f2f2f2", bd=0,
+                            highlightthickness=1, highlightcolor="#3b0057", highlightbackground="#d3d3d3")
+    search_entry.pack(fill="x", padx=20, pady=(0, 10), ipady=6)
+
+    # Scrollable list area (only the rows in view exist; they are reused while scrolling)
+    canvas = tk.Canvas(root, bg="white", bd=0, highlightthickness=0)
+    scrollbar = tk.Scrollbar(root, orient="vertical")
+
+    scrollbar.pack(side="right", fill="y")
+    canvas.pack(side="left", fill="both", expand=True)
+
+    address_font = tkfont.Font(root, family="Helvetica", size=11) # Measured to clip long addresses
+
+    def create_row(parent):
+        frame = tk.Frame(parent, bg="white", padx=10, pady=10)
+
+        icon_label = tk.Label(frame, text="📍", font=("Helvetica", 16), bg="white", fg="#3b0057")
+        icon_label.pack(side="left", padx=(0, 10))
+
+        text_frame = tk.Frame(frame, bg="white")
+        text_frame.pack(side="left", fill="x", expand=True)
+
+        frame.name_label = tk.Label(text_frame, font=("Helvetica", 14, "bold"), bg="white", anchor="w")
+        frame.name_label.pack(anchor="w")
+
+        frame.addr_label = tk.Label(text_frame, font=address_font, bg="white", fg="#444444", wraplength=ADDRESS_WIDTH, justify="left")
+        frame.addr_label.pack(anchor="w")
+        return frame
+
+    def fill_row(frame, place):
+        frame.name_label.config(text=place.name)
+        frame.addr_label.config(text=clip_lines(address_font, place.address, ADDRESS_WIDTH, ADDRESS_LINES))
+
+    # Clicking anywhere on a row selects its location
+    def select_location(place):
+        messagebox.showinfo("Selected Location", f"{place.name}\n\n{place.address}")
+
+    location_list = VirtualList(canvas, scrollbar, ROW_HEIGHT, create_row, fill_row, select_location)
+    # Searches (and loading the catalog) happen on the typeahead's worker thread
+    root.typeahead = Typeahead(search_entry, search_places, show=location_list.set_items, limit=RESULTS_SHOWN)
+
+    return root
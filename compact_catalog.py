@@ -0,0 +1,239 @@
+import argparse
+import math
+import mmap
+import struct
+import sys
+import time
+from array import array
+
+# --- Compact place storage ---
+# A list of Place objects keeps a separate Python string for every name and
+# address, so "Sta. Mesa, City of Manila, Metro Manila, Philippines" is stored
+# once per place. Here every distinct string (names and the comma-separated
+# address parts) is stored once, UTF-8, in one shared buffer; a place is just
+# numbers pointing into it:
+#
+#   strings   offsets (uint32, one per string + 1) and the UTF-8 bytes
+#   names     string id per place
+#   addresses offsets per place into the address part ids (uint32)
+#   lats/lons float64 per place (NaN when unknown)
+#
+# The same layout is the file format (a header plus these sections), so open()
+# just maps the file: nothing is read until a place is looked at, and the pages
+# are shared with the OS file cache. CompactPlaces[i] returns a PlaceView, a
+# small __slots__ object that decodes its fields on access and can be used
+# wherever a location_catalog.Place is.
+#
+# Usage:
+#   python compact_catalog.py locations.csv locations.places   (then point
+#   ENAVROOM_LOCATIONS at locations.places)
+
+MAGIC = b"ENVPLC01"
+HEADER = struct.Struct("<8sQQQ")  # magic, places, strings, address parts
+SECTIONS = [("string_offsets", "I"), ("string_data", "B"), ("names", "I"),
+            ("address_offsets", "I"), ("address_parts", "I"), ("lats", "d"), ("lons", "d")]
+SECTION = struct.Struct("<QQ")    # offset, length in bytes
+ADDRESS_SEPARATOR = ", "
+
+
+def is_compact(path):
+    """True if path is a file written by CompactPlaces.save()."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def build(places):
+    """The file image (bytes) for places: anything with name, address, lat, lon."""
+    string_ids = {}
+    string_offsets = array("I", [0])
+    string_data = bytearray()
+
+    def intern(text):
+        string_id = string_ids.get(text)
+        if string_id is None:
+            string_id = string_ids[text] = len(string_ids)
+            string_data.extend(text.encode("utf-8"))
+            if len(string_data) > 0xFFFFFFFF:
+                raise ValueError("Too much text for a compact catalog (4 GiB)")
+            string_offsets.append(len(string_data))
+        return string_id
+
+    names = array("I")
+    address_offsets = array("I", [0])
+    address_parts = array("I")
+    lats = array("d")
+    lons = array("d")
+    for place in places:
+        names.append(intern(place.name))
+        address_parts.extend(intern(part) for part in place.address.split(ADDRESS_SEPARATOR))
+        address_offsets.append(len(address_parts))
+        lats.append(math.nan if place.lat is None else place.lat)
+        lons.append(math.nan if place.lon is None else place.lon)
+
+    blocks = [string_offsets, string_data, names, address_offsets, address_parts, lats, lons]
+    position = HEADER.size + SECTION.size * len(blocks)
+    table = []
+    for block in blocks:
+        position += -position % 8  # keeps every section 8-byte aligned
+        size = len(block) * (block.itemsize if isinstance(block, array) else 1)
+        table.append((position, size))
+        position += size
+    image = bytearray(position)
+    HEADER.pack_into(image, 0, MAGIC, len(names), len(string_ids), len(address_parts))
+    for i, ((offset, size), block) in enumerate(zip(table, blocks)):
+        SECTION.pack_into(image, HEADER.size + SECTION.size * i, offset, size)
+        image[offset:offset + size] = bytes(block)
+    return bytes(image)
+
+
+class PlaceView:
+    """One place of a CompactPlaces; the fields are decoded when read."""
+
+    __slots__ = ("_places", "id")
+
+    def __init__(self, places, place_id):
+        self._places = places
+        self.id = place_id
+
+    @property
+    def name(self):
+        return self._places.name(self.id)
+
+    @property
+    def address(self):
+        return self._places.address(self.id)
+
+    @property
+    def lat(self):
+        return self._places.lat(self.id)
+
+    @property
+    def lon(self):
+        return self._places.lon(self.id)
+
+    def __eq__(self, other):
+        return isinstance(other, PlaceView) and other._places is self._places and other.id == self.id
+
+    def __hash__(self):
+        return hash((id(self._places), self.id))
+
+    def __repr__(self):
+        return f"Place({self.id}, {self.name!r})"
+
+
+class CompactPlaces:
+    """Read-only sequence of places stored in the compact layout (bytes or a mapped file)."""
+
+    def __init__(self, buffer, mapping=None):
+        self._mapping = mapping  # the mmap behind buffer, if any (see close())
+        self._buffer = memoryview(buffer)
+        magic, self._count, self.string_count, self.part_count = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a compact place catalog")
+        for i, (name, code) in enumerate(SECTIONS):
+            offset, size = SECTION.unpack_from(self._buffer, HEADER.size + SECTION.size * i)
+            setattr(self, "_" + name, self._buffer[offset:offset + size].cast(code))
+
+    @classmethod
+    def from_places(cls, places):
+        return cls(build(places))
+
+    @classmethod
+    def open(cls, path):
+        """Maps the file at path; places are read from it on demand."""
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapping, mapping)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self._buffer)
+
+    def close(self):
+        """Releases the mapped file (views made before must not be used afterwards)."""
+        for name, _ in SECTIONS:
+            getattr(self, "_" + name).release()
+        self._buffer.release()
+        if self._mapping is not None:
+            self._mapping.close()
+
+    # --- Fields ---
+    def string(self, string_id):
+        offsets = self._string_offsets
+        return str(self._string_data[offsets[string_id]:offsets[string_id + 1]], "utf-8")
+
+    def name(self, place_id):
+        return self.string(self._names[place_id])
+
+    def address(self, place_id):
+        parts = self._address_parts[self._address_offsets[place_id]:self._address_offsets[place_id + 1]]
+        return ADDRESS_SEPARATOR.join(self.string(part) for part in parts)
+
+    def name_id(self, place_id):
+        """String id of the place's name (see string())."""
+        return self._names[place_id]
+
+    def address_ids(self, place_id):
+        """String ids of the parts of the place's address, in order."""
+        return self._address_parts[self._address_offsets[place_id]:self._address_offsets[place_id + 1]]
+
+    def lat(self, place_id):
+        value = self._lats[place_id]
+        return None if value != value else value  # NaN: unknown
+
+    def lon(self, place_id):
+        value = self._lons[place_id]
+        return None if value != value else value
+
+    # --- Sequence ---
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [PlaceView(self, i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("place index out of range")
+        return PlaceView(self, index)
+
+    def __iter__(self):
+        return (PlaceView(self, i) for i in range(self._count))
+
+    def stats(self):
+        return {
+            "places": self._count,
+            "strings": self.string_count,
+            "address_parts": self.part_count,
+            "bytes": len(self._buffer),
+            "mapped": self._mapping is not None,
+        }
+
+
+def convert(csv_path, out_path):
+    """Writes the places of a locations CSV (name, address, optional lat/lon) as a compact file."""
+    import location_catalog
+    image = build(location_catalog.read_places(csv_path))
+    with open(out_path, "wb") as f:
+        f.write(image)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a locations CSV file to the compact format.")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    convert(args.input, args.output)
+    places = CompactPlaces.open(args.output)
+    print(f"{places.stats()} in {time.perf_counter() - start:.2f} s")
+    places.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+import argparse
+import heapq
+import math
+import os
+import pickle
+import sys
+import tempfile
+import time
+from array import array
+
+# --- Contraction hierarchy ---
+# Offline speed-up for routing.RoadGraph. Nodes are "contracted" one by one,
+# least important first (few shortcuts needed, few contracted neighbours): a
+# node is taken out of the graph and, for every pair of its neighbours whose
+# fastest path went through it, a shortcut edge is added between them. The node
+# order is the node's rank.
+#
+# A query then searches forwards from the start and backwards from the end,
+# both only along edges that go up in rank, and meets near the top of the
+# hierarchy; each side settles a few hundred nodes even on a city graph, where
+# Dijkstra settles a large part of it. Shortcuts remember the node they skipped,
+# so the full road path can be unpacked.
+#
+#   hierarchy = ContractionHierarchy.build(graph)
+#   hierarchy.save(path, source)          # offline, once per road file
+#   hierarchy = ContractionHierarchy.load(path, source)
+#   hierarchy.query(from_node, to_node)   ->  (seconds, metres) or None
+#   hierarchy.path(from_node, to_node)    ->  (seconds, metres, [nodes]) or None
+#
+# The app only loads a prebuilt hierarchy (routing.get_graph()); build it once
+# per road file, and again after every change to it.
+#
+# Usage:
+#   python contraction.py --build [--roads roads.geojson]
+
+INDEX_VERSION = 1
+WITNESS_SETTLED_LIMIT = 60  # nodes a witness search may settle before a shortcut is just added
+DEFAULT_CACHE_DIR = os.environ.get(
+    "ENAVROOM_ROUTING_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "enavroom"))
+
+
+def _witness_costs(out_edges, start, skip, max_cost, targets):
+    """Costs of the fastest paths from start that avoid skip, for a small local search."""
+    best = {start: 0.0}
+    settled = 0
+    remaining = set(targets)
+    queue = [(0.0, start)]
+    while queue and remaining and settled < WITNESS_SETTLED_LIMIT:
+        cost, node = heapq.heappop(queue)
+        if cost > best.get(node, math.inf):
+            continue
+        if cost > max_cost:
+            break
+        settled += 1
+        remaining.discard(node)
+        for next_node, (edge_cost, _, _) in out_edges[node].items():
+            if next_node == skip:
+                continue
+            next_cost = cost + edge_cost
+            if next_cost < best.get(next_node, math.inf):
+                best[next_node] = next_cost
+                heapq.heappush(queue, (next_cost, next_node))
+    return best
+
+
+def _shortcuts(out_edges, in_edges, node):
+    """[(from, to, seconds, metres)] needed to keep fastest paths when node is removed."""
+    needed = []
+    outgoing = out_edges[node]
+    for source, (in_cost, in_metres, _) in in_edges[node].items():
+        targets = {t: c for t, c in outgoing.items() if t != source}
+        if not targets:
+            continue
+        max_cost = in_cost + max(c[0] for c in targets.values())
+        witness = _witness_costs(out_edges, source, node, max_cost, targets)
+        for target, (out_cost, out_metres, _) in targets.items():
+            via = in_cost + out_cost
+            if witness.get(target, math.inf) > via:
+                needed.append((source, target, via, in_metres + out_metres))
+    return needed
+
+
+class ContractionHierarchy:
+    """Upward edge arrays per node (forward and backward) plus node ranks."""
+
+    def __init__(self, rank, forward, backward, build_seconds=0.0, shortcut_count=0):
+        """forward / backward: (offsets, targets, seconds, metres, middles) arrays, see build()."""
+        self.rank = rank
+        self.forward = forward
+        self.backward = backward
+        self.build_seconds = build_seconds
+        self.load_seconds = None
+        self.shortcut_count = shortcut_count
+
+    @classmethod
+    def build(cls, graph):
+        """Contracts every node of a routing.RoadGraph (slow: run it offline)."""
+        start = time.perf_counter()
+        count = len(graph)
+        out_edges = [{} for _ in range(count)]  # node -> {next node: (seconds, metres, middle)}
+        in_edges = [{} for _ in range(count)]
+        for node in range(count):
+            for edge in range(graph.offsets[node], graph.offsets[node + 1]):
+                target = graph.targets[edge]
+                edge_data = (graph.seconds[edge], graph.lengths[edge], -1)
+                if target != node and edge_data < out_edges[node].get(target, (math.inf,)):
+                    out_edges[node][target] = edge_data
+                    in_edges[target][node] = edge_data
+        all_edges = [dict(edges) for edges in out_edges]  # the final graph: roads + shortcuts
+
+        contracted_neighbours = [0] * count
+
+        def priority(node):
+            shortcuts = _shortcuts(out_edges, in_edges, node)
+            return len(shortcuts) - len(out_edges[node]) - len(in_edges[node]) + contracted_neighbours[node]
+
+        queue = [(priority(node), node) for node in range(count)]
+        heapq.heapify(queue)
+        rank = array("I", [0] * count)
+        next_rank = 0
+        shortcut_count = 0
+        while queue:
+            _, node = heapq.heappop(queue)
+            # Lazy update: contract only if it is still the least important node
+            current = priority(node)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, node))
+                continue
+            for source, target, seconds, metres in _shortcuts(out_edges, in_edges, node):
+                shortcut = (seconds, metres, node)
+                if shortcut < out_edges[source].get(target, (math.inf,)):
+                    out_edges[source][target] = shortcut
+                    in_edges[target][source] = shortcut
+                if shortcut < all_edges[source].get(target, (math.inf,)):
+                    all_edges[source][target] = shortcut
+                    shortcut_count += 1
+            for neighbour in list(out_edges[node]) + list(in_edges[node]):
+                contracted_neighbours[neighbour] += 1
+            for target in out_edges[node]:
+                del in_edges[target][node]
+            for source in in_edges[node]:
+                del out_edges[source][node]
+            out_edges[node] = {}
+            in_edges[node] = {}
+            rank[node] = next_rank
+            next_rank += 1
+
+        # Forward search uses edges u -> v going up; backward search (from the end)
+        # uses edges u -> v with u above v, stored at v
+        forward = [[] for _ in range(count)]
+        backward = [[] for _ in range(count)]
+        for source, edges in enumerate(all_edges):
+            for target, (seconds, metres, middle) in edges.items():
+                if rank[target] > rank[source]:
+                    forward[source].append((target, seconds, metres, middle))
+                else:
+                    backward[target].append((source, seconds, metres, middle))
+        return cls(rank, _to_arrays(forward), _to_arrays(backward), time.perf_counter() - start, shortcut_count)
+
+    # --- Queries ---
+    def _search(self, source, target):
+        """(seconds, meeting node, forward parents, backward parents) or None."""
+        sides = [
+            (self.forward, {source: 0.0}, {source: None}, [(0.0, source)]),
+            (self.backward, {target: 0.0}, {target: None}, [(0.0, target)]),
+        ]
+        best = math.inf
+        meeting = None
+        done = [False, False]
+        turn = 0
+        while not all(done):
+            if done[turn]:
+                turn = 1 - turn
+                continue
+            (offsets, targets, seconds, _, _), costs, parents, queue = sides[turn]
+            other_costs = sides[1 - turn][1]
+            if not queue or queue[0][0] >= best:
+                done[turn] = True
+                continue
+            cost, node = heapq.heappop(queue)
+            if cost > costs[node]:
+                continue
+            if node in other_costs and cost + other_costs[node] < best:
+                best = cost + other_costs[node]
+                meeting = node
+            for edge in range(offsets[node], offsets[node + 1]):
+                next_node = targets[edge]
+                next_cost = cost + seconds[edge]
+                if next_cost < costs.get(next_node, math.inf):
+                    costs[next_node] = next_cost
+                    parents[next_node] = (node, edge)
+                    heapq.heappush(queue, (next_cost, next_node))
+            turn = 1 - turn
+        if meeting is None:
+            return None
+        return best, meeting, sides[0][2], sides[1][2]
+
+    def query(self, source, target):
+        """(seconds, metres) of the fastest path between two road nodes, or None."""
+        found = self._search(source, target)
+        if found is None:
+            return None
+        seconds, meeting, forward_parents, backward_parents = found
+        metres = 0.0
+        for parents, edges in ((forward_parents, self.forward), (backward_parents, self.backward)):
+            node = meeting
+            while parents[node] is not None:
+                node, edge = parents[node]
+                metres += edges[3][edge]
+        return seconds, metres
+
+    def path(self, source, target):
+        """(seconds, metres, [road nodes]) of the fastest path, shortcuts unpacked, or None."""
+        found = self._search(source, target)
+        if found is None:
+            return None
+        seconds, meeting, forward_parents, backward_parents = found
+        up = []  # (from, to, middle) edges from source to the meeting node
+        node = meeting
+        while forward_parents[node] is not None:
+            previous, edge = forward_parents[node]
+            up.append((previous, node, self.forward[4][edge]))
+            node = previous
+        up.reverse()
+        down = []
+        node = meeting
+        while backward_parents[node] is not None:
+            following, edge = backward_parents[node]
+            down.append((node, following, self.backward[4][edge]))
+            node = following
+        nodes = [source]
+        metres = 0.0
+        for start, end, middle in up + down:
+            for a, b in self._unpack(start, end, middle):
+                nodes.append(b)
+                metres += self._edge(a, b)[1]
+        return seconds, metres, nodes
+
+    def _edge(self, start, end):
+        """(seconds, metres, middle) of the hierarchy edge start -> end."""
+        if self.rank[end] > self.rank[start]:
+            offsets, targets, seconds, metres, middles = self.forward
+            node, other = start, end
+        else:
+            offsets, targets, seconds, metres, middles = self.backward
+            node, other = end, start
+        best = None
+        for edge in range(offsets[node], offsets[node + 1]):
+            if targets[edge] == other and (best is None or seconds[edge] < best[0]):
+                best = (seconds[edge], metres[edge], middles[edge])
+        return best
+
+    def _unpack(self, start, end, middle):
+        """Road edges (a, b) that the hierarchy edge start -> end stands for."""
+        stack = [(start, end, middle)]
+        while stack:
+            start, end, middle = stack.pop()
+            if middle < 0:
+                yield start, end
+            else:
+                stack.append((middle, end, self._edge(middle, end)[2]))
+                stack.append((start, middle, self._edge(start, middle)[2]))
+
+    # --- Size / persistence ---
+    def stats(self):
+        edges = len(self.forward[1]) + len(self.backward[1])
+        size = sum(len(block) * block.itemsize for side in (self.forward, self.backward) for block in side)
+        return {
+            "nodes": len(self.rank),
+            "edges": edges,
+            "shortcuts": self.shortcut_count,
+            "build_ms": round(self.build_seconds * 1000, 2),
+            "load_ms": None if self.load_seconds is None else round(self.load_seconds * 1000, 2),
+            "size_mb": round((size + len(self.rank) * self.rank.itemsize) / (1024 * 1024), 2),
+        }
+
+    def save(self, path, source=None):
+        """Writes the hierarchy to path (atomically). source identifies the road file,
+           e.g. its (path, mtime, size), and is checked by load().
+        """
+        data = {
+            "version": INDEX_VERSION,
+            "source": source,
+            "build_seconds": self.build_seconds,
+            "shortcuts": self.shortcut_count,
+            "rank": self.rank.tobytes(),
+            "forward": [block.tobytes() for block in self.forward],
+            "backward": [block.tobytes() for block in self.backward],
+        }
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path, source=None):
+        """The hierarchy saved at path, or None if missing, unreadable or built from another source."""
+        start = time.perf_counter()
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") != INDEX_VERSION or data.get("source") != source:
+                return None
+            rank = _from_bytes("I", data["rank"])
+            forward = tuple(_from_bytes(code, block) for code, block in zip(EDGE_CODES, data["forward"]))
+            backward = tuple(_from_bytes(code, block) for code, block in zip(EDGE_CODES, data["backward"]))
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, KeyError, TypeError, ValueError):
+            return None
+        hierarchy = cls(rank, forward, backward, data["build_seconds"], data["shortcuts"])
+        hierarchy.load_seconds = time.perf_counter() - start
+        return hierarchy
+
+
+EDGE_CODES = ("I", "I", "d", "d", "i")  # offsets, targets, seconds, metres, middle node (-1: a road)
+
+
+def _to_arrays(adjacency):
+    offsets = array("I", [0])
+    targets = array("I")
+    seconds = array("d")
+    metres = array("d")
+    middles = array("i")
+    for edges in adjacency:
+        for target, edge_seconds, edge_metres, middle in edges:
+            targets.append(target)
+            seconds.append(edge_seconds)
+            metres.append(edge_metres)
+            middles.append(middle)
+        offsets.append(len(targets))
+    return offsets, targets, seconds, metres, middles
+
+
+def _from_bytes(code, data):
+    block = array(code)
+    block.frombytes(data)
+    return block
+
+
+def main(argv=None):
+    import routing
+    parser = argparse.ArgumentParser(description="Build the contraction hierarchy of a road file for routing.py.")
+    parser.add_argument("--roads", default=routing.DEFAULT_ROADS, help="road GeoJSON file")
+    parser.add_argument("--build", action="store_true",
+                        help="build and save the hierarchy if the saved one is missing or stale")
+    parser.add_argument("--force", action="store_true", help="with --build, rebuild even if it is up to date")
+    args = parser.parse_args(argv)
+
+    graph = routing.RoadGraph.load_geojson(args.roads)
+    path = routing.hierarchy_path(graph.source[0])
+    hierarchy = None if args.force else ContractionHierarchy.load(path, graph.source)
+    if hierarchy is not None:
+        print(f"{path} is up to date: {hierarchy.stats()}")
+        return 0
+    if not args.build:
+        print(f"No up-to-date hierarchy for {args.roads} at {path} (run with --build)")
+        return 1
+    hierarchy = ContractionHierarchy.build(graph)
+    hierarchy.save(path, graph.source)
+    print(f"Wrote {path}: {hierarchy.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
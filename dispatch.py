@@ -0,0 +1,363 @@
+import heapq
+import math
+import threading
+import time
+
+import fleet_store
+from spatial_index import EARTH_RADIUS_M
+
+# --- Dispatch ---
+# Bookings waiting for a driver are collected for WINDOW_SECONDS, then the whole
+# window is matched at once against the available drivers, so that two riders
+# near the same driver don't both get offered them (first come, first served
+# would give the driver to the first rider even when the second has no one
+# else nearby).
+#
+# Candidate pairs are pruned with a grid of CELL_M cells per vehicle type: each
+# request only looks at the cells around it, ring by ring, until it has its
+# CANDIDATES nearest drivers (and none further than MAX_PICKUP_M), so the work
+# grows with the number of requests, not requests x drivers. The pairs are then
+# assigned with the shortest augmenting path form of the Hungarian algorithm
+# on that sparse graph: every request in turn finds the cheapest way to get a
+# driver, possibly moving already matched requests to their next best driver;
+# the result has the least total pickup distance over the candidate pairs.
+# Leaving a request without a driver counts as UNASSIGNED_COST_M of pickup
+# distance, which also bounds how far each search goes; such requests stay
+# open for the next window.
+#
+# With a fleet store (see fleet_store.py; get_dispatcher() uses the shared one)
+# the drivers of each window are the available ones in the store, heard from in
+# the last MAX_PING_AGE_S, and matched drivers are marked BUSY there; without
+# one, drivers are added and taken off with set_driver() / remove_driver().
+# Requests whose booking was cancelled meanwhile (is_open) are dropped before
+# matching, and a driver whose match on_assign refuses is made available again.
+#
+#   dispatcher = get_dispatcher()
+#   dispatcher.set_driver("D-17", 14.5979, 121.0108, "Enavroom-vroom")
+#   dispatcher.submit(booking.id, pickup.lat, pickup.lon, booking.vehicle)
+#   dispatcher.run_window()   ->  [(booking id, driver id, pickup metres)]
+#   (get_dispatcher() runs a window every WINDOW_SECONDS on a daemon thread)
+
+WINDOW_SECONDS = 2.0
+CELL_M = 500
+MAX_PICKUP_M = 5000
+CANDIDATES = 8  # nearest drivers kept per request
+UNASSIGNED_COST_M = 2 * MAX_PICKUP_M
+
+
+class Request:
+    __slots__ = ("booking_id", "lat", "lon", "vehicle", "submitted", "windows")
+
+    def __init__(self, booking_id, lat, lon, vehicle, submitted=None):
+        self.booking_id = booking_id
+        self.lat = lat
+        self.lon = lon
+        self.vehicle = vehicle
+        self.submitted = submitted   # time.monotonic() when it came in
+        self.windows = 0             # windows it has been through without a driver
+
+    def __repr__(self):
+        return f"Request({self.booking_id}, {self.vehicle!r})"
+
+
+def candidate_pairs(requests, drivers, max_pickup_m=MAX_PICKUP_M, candidates=CANDIDATES, cell_m=CELL_M):
+    """For every request (anything with lat, lon, vehicle), its nearest drivers of the same
+       vehicle type as [(metres, driver index)], closest first. drivers is a list of
+       (driver id, lat, lon, vehicle).
+    """
+    if not requests:
+        return []
+    origin_lat = sum(r.lat for r in requests) / len(requests)
+    x_scale = EARTH_RADIUS_M * math.cos(math.radians(origin_lat)) * math.pi / 180
+    y_scale = EARTH_RADIUS_M * math.pi / 180
+
+    grid = {}  # (vehicle, cell x, cell y) -> [(x, y, driver index)]
+    for index, (_, lat, lon, vehicle) in enumerate(drivers):
+        x = x_scale * lon
+        y = y_scale * lat
+        grid.setdefault((vehicle, int(x // cell_m), int(y // cell_m)), []).append((x, y, index))
+
+    max_ring = math.ceil(max_pickup_m / cell_m)
+    limit = max_pickup_m * max_pickup_m
+    pairs = []
+    for request in requests:
+        x = x_scale * request.lon
+        y = y_scale * request.lat
+        cx = int(x // cell_m)
+        cy = int(y // cell_m)
+        vehicle = request.vehicle
+        best = []  # max-heap of (-squared distance, driver index), at most candidates long
+        for ring in range(max_ring + 1):
+            # Cells of this ring are at least (ring - 1) cells away from the request
+            if len(best) == candidates and -best[0][0] <= ((ring - 1) * cell_m) ** 2:
+                break
+            if ring == 0:
+                cells = [(cx, cy)]
+            else:
+                cells = [(cx + dx, cy + dy) for dx in range(-ring, ring + 1) for dy in (-ring, ring)]
+                cells += [(cx + dx, cy + dy) for dx in (-ring, ring) for dy in range(-ring + 1, ring)]
+            for cell_x, cell_y in cells:
+                for px, py, index in grid.get((vehicle, cell_x, cell_y), ()):
+                    dx = px - x
+                    dy = py - y
+                    d2 = dx * dx + dy * dy
+                    if d2 > limit:
+                        continue
+                    if len(best) < candidates:
+                        heapq.heappush(best, (-d2, index))
+                    elif d2 < -best[0][0]:
+                        heapq.heapreplace(best, (-d2, index))
+        pairs.append(sorted((math.sqrt(-d2), index) for d2, index in best))
+    return pairs
+
+
+def assign(pairs, driver_count, unassigned_cost=UNASSIGNED_COST_M):
+    """Least-cost matching of requests to drivers over sparse candidate pairs (as made by
+       candidate_pairs()), where a request without a driver costs unassigned_cost.
+       Returns the driver index per request, or None for requests left without one.
+    """
+    # Every request also gets its own stand-in driver (driver_count + request index)
+    # at unassigned_cost, so there is always something to match it with
+    request_price = [0.0] * len(pairs)   # dual values: reduced cost = cost - request - driver
+    driver_price = [0.0] * (driver_count + len(pairs))
+    owner = {}                           # driver index -> request index
+    matched = [None] * len(pairs)
+
+    for start in range(len(pairs)):
+        # Dijkstra over drivers on reduced costs, from the new request through the
+        # requests that already hold the drivers it reaches
+        reached = {start: 0.0}          # request -> distance
+        distance = {}                   # driver -> best distance found
+        via = {}                        # driver -> request it was reached from
+        settled = {}                    # driver -> final distance
+        queue = []
+        request, base = start, 0.0
+        while True:
+            price = request_price[request]
+            for cost, driver in pairs[request] + [(unassigned_cost, driver_count + request)]:
+                d = base + cost - price - driver_price[driver]
+                if driver not in settled and d < distance.get(driver, math.inf):
+                    distance[driver] = d
+                    via[driver] = request
+                    heapq.heappush(queue, (d, driver))
+            while True:
+                d, driver = heapq.heappop(queue)  # never runs dry: the stand-in is free
+                if driver not in settled and d <= distance[driver]:
+                    break
+            settled[driver] = d
+            if driver not in owner:
+                found = (driver, d)
+                break
+            request, base = owner[driver], d
+            reached[request] = d
+
+        driver, total = found
+        # Keep the reduced costs of every edge >= 0 and of the matched ones at 0
+        for request, d in reached.items():
+            request_price[request] += total - d
+        for settled_driver, d in settled.items():
+            driver_price[settled_driver] -= total - d
+        while True:
+            request = via[driver]
+            previous = matched[request]
+            matched[request] = driver
+            owner[driver] = request
+            if request == start:
+                break
+            driver = previous
+    return [driver if driver < driver_count else None for driver in matched]
+
+
+class Dispatcher:
+    """Open requests and available drivers; run_window() matches them."""
+
+    def __init__(self, on_assign=None, max_pickup_m=MAX_PICKUP_M, candidates=CANDIDATES, fleet=None,
+                 is_open=None):
+        """on_assign(booking id, driver id, pickup metres) is called for every match; if it
+           raises, the driver is made available again. fleet (a fleet_store.FleetStore) is
+           where the drivers come from, if given. is_open(booking id) tells whether a booking
+           still wants a driver (e.g. not cancelled); those that don't are dropped.
+        """
+        self.on_assign = on_assign
+        self.fleet = fleet
+        self.is_open = is_open
+        self.max_pickup_m = max_pickup_m
+        self.candidates = candidates
+        self._drivers = {}  # driver id -> (lat, lon, vehicle), available ones only
+        self._open = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+        self.windows = 0
+        self.assigned = 0
+        self.dropped = 0           # requests no longer open, dropped before matching
+        self.failed = 0            # matches on_assign refused
+        self.window_seconds = 0.0  # total time spent matching
+        self.last_window = {}
+
+    def set_driver(self, driver_id, lat, lon, vehicle):
+        """Adds or moves an available driver."""
+        with self._lock:
+            self._drivers[driver_id] = (lat, lon, vehicle)
+
+    def remove_driver(self, driver_id):
+        """Takes a driver off (busy or offline)."""
+        with self._lock:
+            self._drivers.pop(driver_id, None)
+
+    def submit(self, booking_id, lat, lon, vehicle):
+        """Queues a booking for the next window."""
+        with self._lock:
+            self._open.append(Request(booking_id, lat, lon, vehicle, time.monotonic()))
+
+    def open_requests(self):
+        with self._lock:
+            return len(self._open)
+
+    def run_window(self):
+        """Matches every open request it can; returns [(booking id, driver id, pickup metres)].
+           Matched drivers are no longer available.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            requests, self._open = self._open, []
+            if self.fleet is None:
+                drivers = [(driver_id, lat, lon, vehicle) for driver_id, (lat, lon, vehicle) in self._drivers.items()]
+        if self.fleet is not None:
+            drivers = self.fleet.available()
+        if self.is_open is not None:
+            still_open = [request for request in requests if self.is_open(request.booking_id)]
+            dropped = len(requests) - len(still_open)
+            requests = still_open
+        else:
+            dropped = 0
+        pairs = candidate_pairs(requests, drivers, self.max_pickup_m, self.candidates)
+        candidates_done = time.perf_counter()
+        matched = assign(pairs, len(drivers))
+        assignments = []
+        waiting = []
+        for request, request_pairs, driver in zip(requests, pairs, matched):
+            if driver is None:
+                request.windows += 1
+                waiting.append(request)
+                continue
+            metres = next(cost for cost, index in request_pairs if index == driver)
+            assignments.append((request.booking_id, driver, metres))
+        self._take_drivers([drivers[driver] for _, driver, _ in assignments])
+
+        done = []
+        refused = []
+        for booking_id, driver, metres in assignments:
+            driver_id = drivers[driver][0]
+            if self.on_assign is not None:
+                try:
+                    self.on_assign(booking_id, driver_id, metres)
+                except Exception as e:
+                    print(f"Error assigning driver {driver_id} to booking {booking_id}: {e}")
+                    refused.append(drivers[driver])
+                    continue
+            done.append((booking_id, driver_id, metres))
+        self._release_drivers(refused)
+
+        with self._lock:
+            self._open[:0] = waiting  # before the requests that came in meanwhile
+            self.windows += 1
+            self.assigned += len(done)
+            self.dropped += dropped
+            self.failed += len(refused)
+            seconds = time.perf_counter() - start
+            self.window_seconds += seconds
+            self.last_window = {
+                "requests": len(requests),
+                "dropped": dropped,
+                "drivers": len(drivers),
+                "pairs": sum(len(p) for p in pairs),
+                "assigned": len(done),
+                "failed": len(refused),
+                "candidates_ms": round((candidates_done - start) * 1000, 2),
+                "total_ms": round(seconds * 1000, 2),
+            }
+        return done
+
+    def _take_drivers(self, drivers):
+        """Makes matched drivers (driver id, lat, lon, vehicle) unavailable."""
+        if self.fleet is not None:
+            self.fleet.set_status([driver[0] for driver in drivers], fleet_store.BUSY)
+            return
+        with self._lock:
+            for driver in drivers:
+                self._drivers.pop(driver[0], None)
+
+    def _release_drivers(self, drivers):
+        """Makes drivers whose match fell through available again."""
+        if not drivers:
+            return
+        if self.fleet is not None:
+            self.fleet.set_status([driver[0] for driver in drivers], fleet_store.AVAILABLE)
+            return
+        with self._lock:
+            for driver_id, lat, lon, vehicle in drivers:
+                self._drivers.setdefault(driver_id, (lat, lon, vehicle))
+
+    def start(self, interval=WINDOW_SECONDS):
+        """Runs a window every interval seconds on a daemon thread."""
+        if self._thread is not None:
+            return
+
+        def loop():
+            while not self._stopped.wait(interval):
+                if self.open_requests():
+                    self.run_window()
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=loop, name="dispatch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the thread started by start(), after the window it may be running."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "drivers": len(self._drivers) if self.fleet is None else self.last_window.get("drivers"),
+                "open": len(self._open),
+                "windows": self.windows,
+                "assigned": self.assigned,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "mean_window_ms": round(self.window_seconds * 1000 / self.windows, 2) if self.windows else None,
+                "last_window": self.last_window,
+            }
+
+
+def _mark_assigned(booking_id, driver_id, metres):
+    import booking_service
+    booking_service.get_service().set_status(booking_id, "assigned")
+
+
+def _is_requested(booking_id):
+    import booking_service
+    booking = booking_service.get_service().get(booking_id)
+    return booking is not None and booking.status == "requested"
+
+
+_shared_dispatcher = None
+_shared_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """The dispatcher shared by the booking screens, drawing on the shared fleet store;
+       matched bookings become "assigned".
+    """
+    global _shared_dispatcher
+    with _shared_lock:
+        if _shared_dispatcher is None:
+            _shared_dispatcher = Dispatcher(on_assign=_mark_assigned, fleet=fleet_store.get_fleet(),
+                                            is_open=_is_requested)
+            _shared_dispatcher.start()
+        return _shared_dispatcher
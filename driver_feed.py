@@ -0,0 +1,126 @@
+import os
+import random
+import threading
+import time
+
+import fleet_store
+
+# --- Demo driver feed ---
+# The app has no driver side yet: nothing else sends GPS pings to the shared
+# fleet store, so the dispatcher would never find a driver for a booking. Until
+# there is one, this feed stands in for it. DEMO_DRIVERS drivers start around
+# the catalog places and ping every PING_SECONDS, drifting a little. A driver
+# the dispatcher made BUSY becomes AVAILABLE again TRIP_SECONDS later, at
+# another place (where it dropped its rider off).
+#
+# A real driver app would instead call, for every GPS fix:
+#   fleet_store.get_fleet().update(driver_id, lat, lon, heading, vehicle="Car (4-seater)")
+#
+#   start_demo(fleet_store.get_fleet())   # done by get_fleet(); ENAVROOM_DEMO_DRIVERS=0 turns it off
+
+PING_SECONDS = 2.0
+TRIP_SECONDS = 90.0
+DRIFT_DEG = 0.0002   # how far a driver moves between pings
+SPREAD_DEG = 0.005   # drivers start about half a kilometre around a place
+VEHICLE_SHARES = {"Enavroom-vroom": 0.6, "Car (4-seater)": 0.3, "Car (6-seater)": 0.1}
+
+
+def _drivers_from_env():
+    value = os.environ.get("ENAVROOM_DEMO_DRIVERS")
+    if value:
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    return 40
+
+
+DEMO_DRIVERS = _drivers_from_env()
+
+
+class DemoFeed:
+    """Pings count made-up drivers (ids 0 to count - 1) into fleet from a daemon thread."""
+
+    def __init__(self, fleet, count=DEMO_DRIVERS, ping_seconds=PING_SECONDS, trip_seconds=TRIP_SECONDS,
+                 places=None, seed=None):
+        self.fleet = fleet
+        self.count = count
+        self.ping_seconds = ping_seconds
+        self.trip_seconds = trip_seconds
+        self.places = places  # Places with coordinates; default: the shared catalog's
+        self.rng = random.Random(seed)
+        self._drivers = None  # [[lat, lon, vehicle index, busy since or None]]
+        self._stopped = threading.Event()
+        self._thread = None
+        self.pings = 0
+        self.trips = 0
+
+    def _start_drivers(self):
+        if self.places is None:
+            import location_catalog
+            self.places = [p for p in location_catalog.get_catalog().places if p.lat is not None]
+        weights = [VEHICLE_SHARES.get(v, 0) for v in fleet_store.VEHICLES]
+        self._drivers = []
+        for _ in range(self.count):
+            lat, lon = self._near_place()
+            self._drivers.append([lat, lon, self.rng.choices(range(len(fleet_store.VEHICLES)), weights)[0], None])
+
+    def _near_place(self):
+        place = self.rng.choice(self.places)
+        return place.lat + self.rng.gauss(0, SPREAD_DEG), place.lon + self.rng.gauss(0, SPREAD_DEG)
+
+    def ping(self, now=None):
+        """One round: every driver pings, and drivers busy for trip_seconds are freed."""
+        if self._drivers is None:
+            self._start_drivers()
+        if not self._drivers:
+            return
+        now = time.time() if now is None else now
+        records = self.fleet.rows()
+        busy = set(records["id"][records["status"] == fleet_store.BUSY].tolist())
+        freed = []
+        for driver_id, driver in enumerate(self._drivers):
+            if driver_id not in busy:
+                driver[3] = None
+            elif driver[3] is None:
+                driver[3] = now
+            elif now - driver[3] >= self.trip_seconds:
+                driver[0], driver[1] = self._near_place()
+                driver[3] = None
+                freed.append(driver_id)
+            driver[0] += self.rng.gauss(0, DRIFT_DEG)
+            driver[1] += self.rng.gauss(0, DRIFT_DEG)
+        self.fleet.ingest(range(len(self._drivers)), [d[0] for d in self._drivers], [d[1] for d in self._drivers],
+                          [self.rng.uniform(0, 360) for _ in self._drivers], [now] * len(self._drivers),
+                          vehicles=[d[2] for d in self._drivers])
+        if freed:
+            self.fleet.set_status(freed, fleet_store.AVAILABLE)
+        self.pings += len(self._drivers)
+        self.trips += len(freed)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.ping()
+            except Exception as e:
+                print(f"Demo driver feed error: {e}")
+            self._stopped.wait(self.ping_seconds)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="demo-drivers", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def start_demo(fleet, count=DEMO_DRIVERS):
+    """Starts a DemoFeed into fleet, or returns None when count is 0."""
+    if count <= 0:
+        return None
+    return DemoFeed(fleet, count).start()
@@ -0,0 +1,130 @@
+import csv
+import math
+import os
+import threading
+from array import array
+
+# --- Fares ---
+# Prices come from a tariff per vehicle type (tariffs.csv): a base fare, a
+# rate per km and per minute of the road route, a minimum fare and a surge
+# multiplier:
+#
+#   fare = round(max(minimum, base + per_km * km + per_minute * minutes) * surge)
+#
+# in whole pesos. quote() prices one trip for the booking screen; quote_many()
+# prices whole NumPy arrays of trips at once (one vectorized expression, no
+# Python loop per trip), which is what re-quoting past trips under a new
+# tariffs file uses. Both give the same pesos for the same trip.
+#
+#   tariffs = get_tariffs()
+#   tariffs.quote(2400, 540, "Car (4-seater)")            ->  250
+#   tariffs.quote_many(metres, seconds, vehicle_ids)      ->  float64 array (NaN: no route)
+#   tariffs.quote_trips([(pickup, dropoff, vehicle), ...], routing.get_matrix())
+
+DEFAULT_TARIFFS = os.environ.get(
+    "ENAVROOM_TARIFFS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "tariffs.csv"))
+COMPONENTS = ("base", "per_km", "per_minute", "minimum", "surge")
+
+
+class Tariffs:
+    """Fare components per vehicle type, one array per component indexed by vehicle id."""
+
+    def __init__(self, rows):
+        """rows: (vehicle name, base, per_km, per_minute, minimum, surge)."""
+        self.vehicles = []
+        self._ids = {}
+        for name in COMPONENTS:
+            setattr(self, name, array("d"))
+        for vehicle, *values in rows:
+            if vehicle in self._ids:
+                raise ValueError(f"Vehicle {vehicle!r} has two tariffs")
+            self._ids[vehicle] = len(self.vehicles)
+            self.vehicles.append(vehicle)
+            for name, value in zip(COMPONENTS, values):
+                getattr(self, name).append(float(value))
+        self._np_components = None  # NumPy copies of the components, made by the first batch
+
+    @classmethod
+    def load(cls, path=DEFAULT_TARIFFS):
+        """Reads a tariffs CSV with vehicle, base, per_km, per_minute, minimum and surge columns."""
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls([row["vehicle"]] + [row[name] for name in COMPONENTS] for row in csv.DictReader(f))
+
+    def vehicle_id(self, vehicle):
+        try:
+            return self._ids[vehicle]
+        except KeyError:
+            raise ValueError(f"No tariff for vehicle {vehicle!r}") from None
+
+    def set_surge(self, vehicle, multiplier):
+        """Changes the current surge multiplier of one vehicle type."""
+        self.surge[self.vehicle_id(vehicle)] = float(multiplier)
+        self._np_components = None
+
+    # --- Quotes ---
+    def quote(self, metres, seconds, vehicle, surge=None):
+        """Fare in whole pesos for one trip; surge overrides the vehicle's current multiplier."""
+        v = self.vehicle_id(vehicle)
+        fare = self.base[v] + self.per_km[v] * (metres / 1000) + self.per_minute[v] * (seconds / 60)
+        return round(max(self.minimum[v], fare) * (self.surge[v] if surge is None else surge))
+
+    def _components(self):
+        import numpy as np
+        if self._np_components is None:
+            self._np_components = [np.array(getattr(self, name), dtype=np.float64) for name in COMPONENTS]
+        return self._np_components
+
+    def vehicle_ids(self, vehicles):
+        """Array of vehicle ids for an array (or list) of vehicle names."""
+        import numpy as np
+        names, inverse = np.unique(np.asarray(vehicles, dtype=object).astype(str), return_inverse=True)
+        return np.array([self.vehicle_id(name) for name in names.tolist()], dtype=np.intp)[inverse]
+
+    def quote_many(self, metres, seconds, vehicles, surge=None):
+        """Fares in whole pesos for arrays of trips: metres, seconds and vehicle ids (or names)
+           of the same length; surge is an optional array (or one number) of multipliers.
+           Trips with NaN metres / seconds get NaN.
+        """
+        import numpy as np
+        metres = np.asarray(metres, dtype=np.float64)
+        seconds = np.asarray(seconds, dtype=np.float64)
+        vehicles = np.asarray(vehicles)
+        if not np.issubdtype(vehicles.dtype, np.integer):
+            vehicles = self.vehicle_ids(vehicles)
+        base, per_km, per_minute, minimum, current_surge = (c[vehicles] for c in self._components())
+        fare = base + per_km * (metres / 1000) + per_minute * (seconds / 60)
+        fare = np.fmax(minimum, fare)
+        fare[np.isnan(metres) | np.isnan(seconds)] = np.nan  # fmax turned them into the minimum
+        return np.rint(fare * (current_surge if surge is None else surge))
+
+    def quote_trips(self, trips, matrix):
+        """Fares for (pickup place, drop-off place, vehicle name) triples, with road distances
+           from a routing.DistanceMatrix. NaN where there is no route.
+        """
+        import numpy as np
+        metres = []
+        seconds = []
+        vehicles = []
+        for pickup, dropoff, vehicle in trips:
+            found = matrix.get(pickup, dropoff)
+            metres.append(found[0] if found else math.nan)
+            seconds.append(found[1] if found else math.nan)
+            vehicles.append(vehicle)
+        return self.quote_many(np.array(metres), np.array(seconds), self.vehicle_ids(vehicles))
+
+    def stats(self):
+        return {"vehicles": len(self.vehicles), "batch_ready": self._np_components is not None}
+
+
+_shared_tariffs = None
+_shared_lock = threading.Lock()
+
+
+def get_tariffs():
+    """The tariffs loaded from DEFAULT_TARIFFS, shared by every screen."""
+    global _shared_tariffs
+    with _shared_lock:
+        if _shared_tariffs is None:
+            _shared_tariffs = Tariffs.load()
+        return _shared_tariffs
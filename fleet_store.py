@@ -0,0 +1,203 @@
+import threading
+import time
+
+from spatial_index import EARTH_RADIUS_M
+
+# --- Fleet state ---
+# Latest position, heading, status and last-seen time of every driver, kept in
+# one preallocated NumPy structured array (32 bytes a driver, float32 lat/lon
+# is good to about a metre) instead of an object per driver, plus 4 bytes per
+# id in the id -> row lookup. Driver ids are whole numbers, so that lookup is a
+# plain array too and a whole batch of ids becomes rows at once; ingest()
+# applies a batch of GPS pings in a few vectorized operations. Pings older than
+# what is stored are dropped, and of several pings for one driver the newest wins.
+#
+# Readers get views (rows() / column()) of the live array: no copy, but also
+# no snapshot - values may move on while they look. Growing the store swaps in
+# a bigger array; views taken before keep the old one.
+#
+#   fleet = get_fleet()
+#   fleet.ingest(ids, lats, lons, headings, times)        # NumPy arrays (or lists)
+#   fleet.set_status([17], BUSY)
+#   fleet.available("Car (4-seater)")  ->  [(driver id, lat, lon, vehicle)]
+#   fleet.nearby(14.5979, 121.0108, 1000)  ->  driver ids
+#
+# The app has no driver side yet, so get_fleet() starts the demo pings of
+# driver_feed.py into the shared store (ENAVROOM_DEMO_DRIVERS=0 turns them off).
+
+OFFLINE, AVAILABLE, BUSY = 0, 1, 2
+VEHICLES = ("Enavroom-vroom", "Car (4-seater)", "Car (6-seater)")
+DEFAULT_CAPACITY = 1024
+MAX_PING_AGE_S = 60  # drivers not heard from for longer are left out of available() / nearby()
+
+
+def _record():
+    import numpy as np
+    return np.dtype([("id", "<i8"), ("lat", "<f4"), ("lon", "<f4"), ("seen", "<f8"),
+                     ("heading", "<u2"), ("status", "u1"), ("vehicle", "u1"), ("pings", "<u4")])
+
+
+class FleetStore:
+    """Driver records in a structured array, rows found through an id -> row array."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        import numpy as np
+        self._np = np
+        self.record = _record()
+        self._records = np.zeros(capacity, dtype=self.record)
+        self._row_of = np.full(capacity, -1, dtype=np.int32)  # driver id -> row (-1: unknown)
+        self.count = 0
+        self._lock = threading.Lock()
+        self.pings = 0
+        self.dropped = 0  # out-of-order or repeated pings
+        self.ingest_seconds = 0.0
+
+    # --- Rows ---
+    def _grow(self, rows, max_id):
+        np = self._np
+        if rows > len(self._records):
+            records = np.zeros(max(rows, 2 * len(self._records)), dtype=self.record)
+            records[:self.count] = self._records[:self.count]
+            self._records = records
+        if max_id >= len(self._row_of):
+            row_of = np.full(max(max_id + 1, 2 * len(self._row_of)), -1, dtype=np.int32)
+            row_of[:len(self._row_of)] = self._row_of
+            self._row_of = row_of
+
+    def _rows_for(self, driver_ids, vehicles=None):
+        """Rows of driver_ids (an int64 array), adding the drivers not seen before."""
+        np = self._np
+        if len(driver_ids) and driver_ids.min() < 0:
+            raise ValueError("Driver ids must be >= 0")
+        max_id = int(driver_ids.max()) if len(driver_ids) else -1
+        if max_id >= len(self._row_of):
+            self._grow(self.count, max_id)
+        rows = self._row_of[driver_ids]
+        new = rows < 0
+        if new.any():
+            new_ids, first = np.unique(driver_ids[new], return_index=True)
+            self._grow(self.count + len(new_ids), max_id)
+            new_rows = np.arange(self.count, self.count + len(new_ids), dtype=np.int32)
+            self._row_of[new_ids] = new_rows
+            records = self._records[new_rows]
+            records["id"] = new_ids
+            records["seen"] = -np.inf
+            records["status"] = AVAILABLE
+            if vehicles is not None:
+                records["vehicle"] = np.asarray(vehicles)[new][first]
+            self._records[new_rows] = records
+            self.count += len(new_ids)
+            rows = self._row_of[driver_ids]
+        return rows
+
+    # --- Writes ---
+    def ingest(self, driver_ids, lats, lons, headings, times, statuses=None, vehicles=None):
+        """Applies a batch of pings (arrays of the same length; heading in degrees, time as
+           time.time()). New drivers are added, as AVAILABLE unless statuses says otherwise,
+           with vehicles (indexes into VEHICLES) if given. Returns how many pings were applied.
+        """
+        np = self._np
+        start = time.perf_counter()
+        driver_ids = np.asarray(driver_ids, dtype=np.int64)
+        times = np.asarray(times, dtype=np.float64)
+        with self._lock:
+            rows = self._rows_for(driver_ids, vehicles)
+            # Newest ping per driver: sort by (row, time) and keep the last of every row
+            order = np.lexsort((times, rows))
+            last = np.ones(len(order), dtype=bool)
+            last[:-1] = rows[order[1:]] != rows[order[:-1]]
+            keep = order[last]
+            keep = keep[times[keep] > self._records["seen"][rows[keep]]]
+            target = rows[keep]
+            records = self._records
+            records["lat"][target] = np.asarray(lats, dtype=np.float64)[keep]
+            records["lon"][target] = np.asarray(lons, dtype=np.float64)[keep]
+            records["heading"][target] = np.asarray(headings, dtype=np.float64)[keep] % 360
+            records["seen"][target] = times[keep]
+            records["pings"][target] += 1
+            if statuses is not None:
+                records["status"][target] = np.asarray(statuses)[keep]
+            self.pings += len(driver_ids)
+            self.dropped += len(driver_ids) - len(keep)
+            self.ingest_seconds += time.perf_counter() - start
+        return len(keep)
+
+    def update(self, driver_id, lat, lon, heading, seen=None, status=None, vehicle=None):
+        """One ping (seen defaults to now)."""
+        return self.ingest([driver_id], [lat], [lon], [heading], [time.time() if seen is None else seen],
+                           None if status is None else [status],
+                           None if vehicle is None else [VEHICLES.index(vehicle)])
+
+    def set_status(self, driver_ids, status):
+        np = self._np
+        with self._lock:
+            rows = self._row_of[np.asarray(driver_ids, dtype=np.int64)]
+            self._records["status"][rows[rows >= 0]] = status
+
+    # --- Reads ---
+    def rows(self):
+        """View of the records of every driver (no copy)."""
+        with self._lock:
+            view = self._records[:self.count]
+        view.flags.writeable = False
+        return view
+
+    def column(self, name):
+        """View of one field ("lat", "lon", "status", ...) for every driver (no copy)."""
+        return self.rows()[name]
+
+    def _live(self, vehicle, max_age, status):
+        np = self._np
+        records = self.rows()
+        mask = records["seen"] >= time.time() - max_age
+        if status is not None:
+            mask &= records["status"] == status
+        if vehicle is not None:
+            mask &= records["vehicle"] == VEHICLES.index(vehicle)
+        return records, np.flatnonzero(mask)
+
+    def available(self, vehicle=None, max_age=MAX_PING_AGE_S):
+        """[(driver id, lat, lon, vehicle name)] of the available drivers heard from lately."""
+        records, rows = self._live(vehicle, max_age, AVAILABLE)
+        chosen = records[rows]
+        return list(zip(chosen["id"].tolist(), chosen["lat"].tolist(), chosen["lon"].tolist(),
+                        [VEHICLES[v] for v in chosen["vehicle"].tolist()]))
+
+    def nearby(self, lat, lon, radius_m, vehicle=None, status=AVAILABLE, max_age=MAX_PING_AGE_S):
+        """Ids of the drivers within radius_m of (lat, lon), closest first."""
+        np = self._np
+        records, rows = self._live(vehicle, max_age, status)
+        y_scale = EARTH_RADIUS_M * np.pi / 180
+        x_scale = y_scale * np.cos(np.radians(lat))
+        dx = (records["lon"][rows] - lon) * x_scale
+        dy = (records["lat"][rows] - lat) * y_scale
+        d2 = dx * dx + dy * dy
+        inside = np.flatnonzero(d2 <= radius_m * radius_m)
+        return records["id"][rows[inside[np.argsort(d2[inside])]]]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "drivers": self.count,
+                "capacity": len(self._records),
+                "bytes_per_driver": self.record.itemsize,
+                "bytes": self._records.nbytes + self._row_of.nbytes,
+                "pings": self.pings,
+                "dropped": self.dropped,
+                "pings_per_s": round(self.pings / self.ingest_seconds) if self.ingest_seconds else None,
+            }
+
+
+_shared_fleet = None
+_shared_lock = threading.Lock()
+
+
+def get_fleet():
+    """The fleet store shared by the screens and the dispatcher, fed by the demo drivers."""
+    global _shared_fleet
+    with _shared_lock:
+        if _shared_fleet is None:
+            import driver_feed
+            _shared_fleet = FleetStore()
+            driver_feed.start_demo(_shared_fleet)
+        return _shared_fleet
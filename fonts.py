@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+
+# --- Font manager and placeholder glyph tiles ---
+# ImageFont.truetype() searches the system font folders and parses the file on
+# every call, and on Linux "arial.ttf" usually isn't there at all. Fonts are
+# resolved once per (family, size) here, failed lookups are remembered so they
+# aren't retried, and the grey placeholder tiles shown for missing images are
+# rendered once per (text, size, colours).
+
+# Files tried for each family, in order (the first one Pillow can open wins)
+FONT_FILES = {
+    "arial": ["arial.ttf", "Arial.ttf", "LiberationSans-Regular.ttf", "DejaVuSans.ttf"],
+}
+
+PLACEHOLDER_BG = (200, 200, 200)  # Grey background
+PLACEHOLDER_FG = (0, 0, 0)
+MAX_TILES = 256
+
+_lock = threading.Lock()
+_fonts = {}            # (family, size) -> ImageFont
+_missing_files = set()  # font files truetype() could not open
+_tiles = OrderedDict()  # (text, size, bg, fg) -> PIL image
+_stats = {"font_hits": 0, "font_misses": 0, "negative_hits": 0,
+          "tile_hits": 0, "tile_misses": 0}
+
+
+def _default_font(size):
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.load_default(size)  # Pillow >= 10.1 can scale the default font
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def get_font(family="arial", size=12):
+    """Returns a cached font for (family, size), falling back to Pillow's default font."""
+    from PIL import ImageFont
+
+    key = (family.lower(), size)
+    with _lock:
+        font = _fonts.get(key)
+        if font is not None:
+            _stats["font_hits"] += 1
+            return font
+        _stats["font_misses"] += 1
+
+        for filename in FONT_FILES.get(key[0], [family]):
+            if filename in _missing_files:
+                _stats["negative_hits"] += 1
+                continue
+            try:
+                font = ImageFont.truetype(filename, size)
+                break
+            except OSError:
+                # Not installed here, don't search for it again
+                _missing_files.add(filename)
+        if font is None:
+            font = _default_font(size)
+        _fonts[key] = font
+        return font
+
+
+def _render_tile(text, size, bg, fg):
+    from PIL import Image, ImageDraw
+
+    tile = Image.new("RGB", size, bg)
+    d = ImageDraw.Draw(tile)
+    font = get_font("arial", max(1, int(size[1] * 0.3)))
+    try:
+        bbox = d.textbbox((0, 0), text, font=font)
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
+    except AttributeError:
+        text_width, text_height = d.textsize(text, font=font)
+
+    x = (size[0] - text_width) / 2
+    y = (size[1] - text_height) / 2
+    d.text((x, y), text, fill=fg, font=font)
+    return tile
+
+
+def placeholder_tile(text, size, bg=PLACEHOLDER_BG, fg=PLACEHOLDER_FG):
+    """Grey tile with text centred on it (PIL image, shared - don't draw on it)."""
+    key = (text, tuple(size), bg, fg)
+    with _lock:
+        tile = _tiles.get(key)
+        if tile is not None:
+            _tiles.move_to_end(key)
+            _stats["tile_hits"] += 1
+            return tile
+        _stats["tile_misses"] += 1
+    tile = _render_tile(text, tuple(size), bg, fg)
+    with _lock:
+        _tiles[key] = tile
+        while len(_tiles) > MAX_TILES:
+            _tiles.popitem(last=False)
+    return tile
+
+
+def font_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats["fonts"] = len(_fonts)
+        stats["missing_files"] = len(_missing_files)
+        stats["tiles"] = len(_tiles)
+        return stats
@@ -0,0 +1,249 @@
+import os
+import pickle
+import sys
+import tempfile
+import time
+from array import array
+
+# --- Typo-tolerant word lookup (SymSpell style) ---
+# For every word in the vocabulary, all the strings made by deleting up to
+# max_distance letters from its first prefix_length letters are precomputed and
+# point back to the word. A misspelled query word is looked up the same way
+# (deletes of the query), which finds every word within max_distance edits
+# without comparing against the whole vocabulary; candidates are then checked
+# with a real (Damerau-Levenshtein) edit distance.
+#
+#   index = FuzzyIndex(words, counts)
+#   index.lookup("hasmine")  ->  [("hasmin", 1, 1), ...]   (word, distance, count)
+#
+# The index can be pickled to disk with save() and read back with load(), which
+# returns None when the file was built from a different vocabulary source.
+
+INDEX_VERSION = 1
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+DEFAULT_CACHE_DIR = os.environ.get(
+    "ENAVROOM_FUZZY_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "enavroom"))
+
+
+def deletes(word, max_distance):
+    """Every string made by removing up to max_distance letters from word (word included)."""
+    found = {word}
+    edge = [word]
+    for _ in range(max_distance):
+        next_edge = []
+        for text in edge:
+            if len(text) <= 1:
+                continue
+            for i in range(len(text)):
+                shorter = text[:i] + text[i + 1:]
+                if shorter not in found:
+                    found.add(shorter)
+                    next_edge.append(shorter)
+        edge = next_edge
+    return found
+
+
+def _within(a, b, edits):
+    """True if a can be turned into b with at most edits insertions, deletions,
+       substitutions or swaps of neighbouring letters.
+    """
+    shorter = min(len(a), len(b))
+    start = 0
+    while start < shorter and a[start] == b[start]:
+        start += 1
+    if start == shorter:
+        return abs(len(a) - len(b)) <= edits
+    if edits == 0 or abs(len(a) - len(b)) > edits:
+        return False
+    a = a[start:]
+    b = b[start:]
+    edits -= 1
+    return (_within(a[1:], b[1:], edits)      # substitution
+            or _within(a[1:], b, edits)       # deletion
+            or _within(a, b[1:], edits)       # insertion
+            or (len(a) > 1 and len(b) > 1 and a[0] == b[1] and a[1] == b[0]
+                and _within(a[2:], b[2:], edits)))  # swapped letters
+
+
+def edit_distance(a, b, max_distance):
+    """Damerau-Levenshtein (optimal string alignment) distance between a and b, or
+       max_distance + 1 if it is larger than max_distance. With the small distances
+       used here, trying each budget is much cheaper than filling the whole table.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    # Candidates often share their end with the query as well as their start
+    end = 0
+    shorter = min(len(a), len(b))
+    while end < shorter and a[-1 - end] == b[-1 - end]:
+        end += 1
+    if end:
+        a = a[:-end]
+        b = b[:-end]
+    for distance in range(max_distance + 1):
+        if _within(a, b, distance):
+            return distance
+    return max_distance + 1
+
+
+class FuzzyIndex:
+    """Deletion dictionary over a vocabulary of words.
+
+       The word ids behind every key are stored back to back in one array
+       (_ids[_offsets[slot]:_offsets[slot + 1]]), which keeps the index compact and
+       lets save()/load() write it as a few flat blocks.
+    """
+
+    def __init__(self, words, counts=None, max_distance=MAX_DISTANCE, prefix_length=PREFIX_LENGTH):
+        start = time.perf_counter()
+        self.words = list(words)
+        self.counts = array("I", counts if counts is not None else [1] * len(self.words))
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+
+        # Words sharing a prefix share its deletes, so each prefix is expanded once
+        by_prefix = {}
+        for word_id, word in enumerate(self.words):
+            by_prefix.setdefault(word[:prefix_length], []).append(word_id)
+        by_key = {}
+        for prefix, word_ids in by_prefix.items():
+            for key in deletes(prefix, max_distance):
+                by_key.setdefault(key, []).append(word_ids)
+        self._slots = {}             # deleted string -> slot
+        self._offsets = array("I", [0])
+        self._ids = array("I")
+        for key, groups in by_key.items():
+            self._slots[key] = len(self._slots)
+            for word_ids in groups:
+                self._ids.extend(word_ids)
+            self._offsets.append(len(self._ids))
+        self.build_seconds = time.perf_counter() - start
+        self.load_seconds = None  # set when the index came from load() instead
+
+    def lookup(self, word, max_distance=None, limit=5):
+        """The closest vocabulary words within max_distance edits of word, as
+           (word, distance, count), most common first. Only the closest distance
+           found is returned: one edit away hides everything two edits away.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        max_distance = min(max_distance, self.max_distance)
+        seen = set()
+        found = []
+        # Keys with d letters deleted reach the words d edits away, so the closer
+        # levels are tried first and the (much bigger) next level is often skipped
+        level = [word[:self.prefix_length]]
+        level_keys = set(level)
+        for distance_so_far in range(max_distance + 1):
+            for key in level:
+                slot = self._slots.get(key)
+                if slot is None:
+                    continue
+                for word_id in self._ids[self._offsets[slot]:self._offsets[slot + 1]]:
+                    if word_id in seen:
+                        continue
+                    seen.add(word_id)
+                    candidate = self.words[word_id]
+                    distance = edit_distance(word, candidate, max_distance)
+                    if distance <= max_distance:
+                        found.append((distance, -self.counts[word_id], candidate))
+            closest = [f for f in found if f[0] <= distance_so_far]
+            if closest:
+                closest.sort()
+                return [(candidate, distance, -count) for distance, count, candidate in closest[:limit]]
+            level = [k[:i] + k[i + 1:] for k in level if len(k) > 1 for i in range(len(k))]
+            level = [k for k in dict.fromkeys(level) if k not in level_keys]
+            level_keys.update(level)
+        return []
+
+    def correct(self, word, max_distance=None):
+        """The best vocabulary word for word (word itself if it is known), or None."""
+        matches = self.lookup(word, max_distance, limit=1)
+        return matches[0][0] if matches else None
+
+    # --- Size / persistence ---
+    def memory_bytes(self):
+        """Rough memory used by the index (keys, id arrays and the word list)."""
+        total = sys.getsizeof(self._slots) + sys.getsizeof(self.words)
+        total += sum(sys.getsizeof(key) for key in self._slots)
+        total += sum(sys.getsizeof(word) for word in self.words)
+        for numbers in (self.counts, self._offsets, self._ids):
+            total += sys.getsizeof(numbers)
+        return total
+
+    def stats(self):
+        return {
+            "words": len(self.words),
+            "keys": len(self._slots),
+            "max_distance": self.max_distance,
+            "prefix_length": self.prefix_length,
+            "build_ms": round(self.build_seconds * 1000, 2),
+            "load_ms": None if self.load_seconds is None else round(self.load_seconds * 1000, 2),
+            "memory_mb": round(self.memory_bytes() / (1024 * 1024), 1),
+        }
+
+    def save(self, path, source=None):
+        """Writes the index to path (atomically). source identifies the vocabulary,
+           e.g. the catalog file's (path, mtime, size), and is checked by load().
+        """
+        data = {
+            "version": INDEX_VERSION,
+            "source": source,
+            "max_distance": self.max_distance,
+            "prefix_length": self.prefix_length,
+            "build_seconds": self.build_seconds,
+            "words": "\n".join(self.words),
+            "keys": "\n".join(self._slots),  # in slot order
+            "counts": self.counts.tobytes(),
+            "offsets": self._offsets.tobytes(),
+            "ids": self._ids.tobytes(),
+        }
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path, source=None):
+        """The index saved at path, or None if missing, unreadable or built from another source."""
+        start = time.perf_counter()
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") != INDEX_VERSION or data.get("source") != source:
+                return None
+            index = cls.__new__(cls)
+            index.words = data["words"].split("\n") if data["words"] else []
+            index.max_distance = data["max_distance"]
+            index.prefix_length = data["prefix_length"]
+            index.build_seconds = data["build_seconds"]
+            keys = data["keys"].split("\n")
+            index._slots = dict(zip(keys, range(len(keys))))
+            for name in ("counts", "_offsets", "_ids"):
+                numbers = array("I")
+                numbers.frombytes(data[name.lstrip("_")])
+                setattr(index, name, numbers)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, KeyError, TypeError, ValueError):
+            return None
+        index.load_seconds = time.perf_counter() - start
+        return index
+
+
+def load_or_build(words, counts, cache_path, source):
+    """Loads the saved index for source from cache_path, or builds and saves it."""
+    index = FuzzyIndex.load(cache_path, source) if cache_path else None
+    if index is None:
+        index = FuzzyIndex(words, counts)
+        if cache_path:
+            try:
+                index.save(cache_path, source)
+            except OSError as e:
+                print(f"Could not save fuzzy index to {cache_path}: {e}")
+    return index
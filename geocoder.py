@@ -0,0 +1,220 @@
+import argparse
+import csv
+import functools
+import os
+import sys
+import time
+
+from location_catalog import normalize
+
+# --- Offline geocoder ---
+# Turns free-text addresses ("PUP Condotel Building, Anonas, Sta. Mesa, City of
+# Manila, Metro-Manila, Philippines") into coordinates using a local gazetteer
+# (gazetteer.csv: streets, districts, barangays and cities with a point each).
+#
+# An address is split at its commas; every part is normalized (lower case,
+# accents and punctuation removed, "Sta." -> "santa", "Ave" -> "avenue", "St"
+# -> "street" at the end of a street name only, ...) and searched for gazetteer
+# names through an index of name -> first word, so a part only looks at the
+# names starting with one of its own words. The city
+# found in the address decides between places with the same name in different
+# cities, and the most precise place left wins (street corner, street,
+# barangay, district, city, region).
+#
+#   geocoder = Geocoder.load()
+#   geocoder.geocode("Pureza Street, Sta. Mesa, City of Manila")
+#       ->  Match(14.6015, 121.0055, "street", "Pureza Street")
+#
+# geocode_file() streams a CSV file row by row, so big files need no more
+# memory than a small one. The same address parts repeat across a whole city,
+# so parts are cached (up to COMPONENT_CACHE_SIZE of them).
+#
+# Usage:
+#   python geocoder.py new_places.csv new_places_geocoded.csv --column address
+
+DEFAULT_GAZETTEER = os.environ.get(
+    "ENAVROOM_GAZETTEER",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.csv"))
+COMPONENT_CACHE_SIZE = 50000
+PRECISIONS = ["corner", "street", "barangay", "district", "city", "region"]  # most precise first
+ABBREVIATIONS = {
+    "ave": "avenue", "av": "avenue", "blvd": "boulevard", "rd": "road",
+    "hwy": "highway", "ext": "extension", "brgy": "barangay", "bgy": "barangay",
+    "sta": "santa", "sto": "santo", "gen": "general", "cor": "corner", "jr": "junior",
+}
+# Only spelled out at the end of a street name ("Pureza St." but not "St. Mary's")
+STREET_ENDINGS = {"st": "street"}
+
+
+def normalize_address(text):
+    """normalize() plus the usual address abbreviations spelled out."""
+    words = [ABBREVIATIONS.get(word, word) for word in normalize(text).split()]
+    for i, word in enumerate(words):
+        if word in STREET_ENDINGS and (i == len(words) - 1 or words[i + 1] == "corner"):
+            words[i] = STREET_ENDINGS[word]
+    return " ".join(words)
+
+
+class Match:
+    __slots__ = ("lat", "lon", "precision", "name")
+
+    def __init__(self, lat, lon, precision, name):
+        self.lat = lat
+        self.lon = lon
+        self.precision = precision
+        self.name = name
+
+    def __repr__(self):
+        return f"Match({self.lat:.4f}, {self.lon:.4f}, {self.precision!r}, {self.name!r})"
+
+
+class Geocoder:
+    """Gazetteer entries plus the first-word index used to find them in addresses."""
+
+    def __init__(self, entries):
+        """entries: (name, aliases, kind, city, lat, lon) with aliases a list of names."""
+        self.entries = []
+        self._by_first_word = {}  # first word -> [(normalized name, entry id)]
+        for name, aliases, kind, city, lat, lon in entries:
+            if kind not in PRECISIONS:
+                raise ValueError(f"Unknown gazetteer kind {kind!r} for {name!r}")
+            entry_id = len(self.entries)
+            self.entries.append((name, kind, normalize_address(city) if city else None, lat, lon))
+            for text in dict.fromkeys(normalize_address(n) for n in [name] + list(aliases)):
+                if text:
+                    self._by_first_word.setdefault(text.split()[0], []).append((text, entry_id))
+        self._parts = functools.lru_cache(maxsize=COMPONENT_CACHE_SIZE)(self._find_in_part)
+
+    @classmethod
+    def load(cls, path=DEFAULT_GAZETTEER):
+        """Reads a gazetteer CSV with name, aliases ("|" separated), kind, city, lat, lon."""
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls((row["name"], [a for a in row["aliases"].split("|") if a], row["kind"], row["city"],
+                        float(row["lat"]), float(row["lon"])) for row in csv.DictReader(f))
+
+    def _find_in_part(self, part):
+        """(entry ids named in one address part, left to right; whether the part is
+           a street corner). Longer names win over names inside them ("Old Sta. Mesa
+           Street" over "Sta. Mesa").
+        """
+        padded = f" {part} "
+        found = []
+        for word in set(part.split()):
+            for text, entry_id in self._by_first_word.get(word, ()):
+                start = padded.find(f" {text} ")
+                while start >= 0:
+                    found.append((-len(text), start, entry_id))
+                    start = padded.find(f" {text} ", start + 1)
+        found.sort()
+        spans = []
+        entry_ids = []
+        for length, start, entry_id in found:
+            span = (start, start - length)
+            # Same span again: the same name in another city, kept for the city check
+            if all(span == s or span[1] <= s[0] or span[0] >= s[1] for s in spans):
+                spans.append(span)
+                entry_ids.append((start, entry_id))
+        entry_ids.sort()
+        return tuple(dict.fromkeys(entry_id for _, entry_id in entry_ids)), " corner " in padded
+
+    def geocode(self, address):
+        """Best Match for address, or None when nothing in it is in the gazetteer."""
+        found = []  # (entry id, part index, part is a corner)
+        for index, part in enumerate(normalize_address(p) for p in address.split(",")):
+            if part:
+                entry_ids, corner = self._parts(part)
+                found.extend((entry_id, index, corner) for entry_id in entry_ids)
+        if not found:
+            return None
+        entries = self.entries
+        cities = [entries[e][2] for e, _, _ in found if entries[e][1] == "city"]
+        if cities:
+            found = [f for f in found if entries[f[0]][2] in (cities[0], None)]
+        if not found:
+            return None
+        best = min(PRECISIONS.index(entries[e][1]) for e, _, _ in found)
+        best = [f for f in found if PRECISIONS.index(entries[f[0]][1]) == best]
+        entry_id, part_index, corner = best[0]
+        if corner and entries[entry_id][1] == "street":
+            # "A Street corner B Avenue": halfway between the two streets' points
+            streets = list(dict.fromkeys(e for e, i, _ in best if i == part_index))
+            if len(streets) > 1:
+                return Match(sum(entries[e][3] for e in streets) / len(streets),
+                             sum(entries[e][4] for e in streets) / len(streets),
+                             "corner", " / ".join(entries[e][0] for e in streets))
+        name, kind, _, lat, lon = entries[entry_id]
+        return Match(lat, lon, kind, name)
+
+    def geocode_rows(self, rows, column="address", keep_existing=False):
+        """Yields (row, Match or None) for every row (dict) of rows, one at a time. With
+           keep_existing, rows that already have coordinates are not geocoded (None).
+        """
+        for row in rows:
+            if keep_existing and has_coordinates(row):
+                yield row, None
+            else:
+                yield row, self.geocode(row[column] or "")
+
+    def stats(self):
+        cache = self._parts.cache_info()
+        return {
+            "entries": len(self.entries),
+            "names": sum(len(names) for names in self._by_first_word.values()),
+            "cached_parts": cache.currsize,
+            "cache_hits": cache.hits,
+            "cache_misses": cache.misses,
+        }
+
+
+def has_coordinates(row):
+    return bool(row.get("lat") and row.get("lon"))
+
+
+def geocode_file(in_path, out_path, column="address", geocoder=None):
+    """Copies the CSV file in_path to out_path with lat, lon and precision columns
+       filled in (existing coordinates are kept). Returns counts per precision.
+    """
+    geocoder = geocoder or Geocoder.load()
+    counts = {"rows": 0, "kept": 0, "unmatched": 0}
+    start = time.perf_counter()
+    with open(in_path, newline="", encoding="utf-8") as source, \
+            open(out_path, "w", newline="", encoding="utf-8") as target:
+        rows = csv.DictReader(source)
+        if column not in (rows.fieldnames or []):
+            raise ValueError(f"{in_path} has no {column!r} column")
+        fields = list(rows.fieldnames) + [f for f in ("lat", "lon", "precision") if f not in rows.fieldnames]
+        writer = csv.DictWriter(target, fields, lineterminator="\n")
+        writer.writeheader()
+        for row, match in geocoder.geocode_rows(rows, column, keep_existing=True):
+            counts["rows"] += 1
+            if has_coordinates(row):
+                counts["kept"] += 1
+            elif match is None:
+                counts["unmatched"] += 1
+            else:
+                row["lat"] = f"{match.lat:.6f}"
+                row["lon"] = f"{match.lon:.6f}"
+                row["precision"] = match.precision
+                counts[match.precision] = counts.get(match.precision, 0) + 1
+            writer.writerow(row)
+    counts["seconds"] = round(time.perf_counter() - start, 2)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Add coordinates to the addresses of a CSV file.")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--column", default="address", help="column holding the address")
+    parser.add_argument("--gazetteer", default=DEFAULT_GAZETTEER)
+    args = parser.parse_args(argv)
+    geocoder = Geocoder.load(args.gazetteer)
+    counts = geocode_file(args.input, args.output, args.column, geocoder)
+    rate = counts["rows"] / counts["seconds"] if counts["seconds"] else counts["rows"]
+    print(f"{counts} ({rate:.0f} rows/s)")
+    print(geocoder.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
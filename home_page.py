@@ -1,7 +1,9 @@
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk # Import Pillow modules
 import os # For path handling
+import image_cache # Shared image cache (decodes each asset once)
+import app_shell
+from app_shell import nav_command # Screen switching inside the app shell
 
 # --- Define Colors ---
 PURPLE_DARK = "#360042" # This is the purple from your provided code, not the #4B0082 from previous discussions
@@ -33,121 +35,126 @@ def on_messages_click():
 def on_history_click():
     messagebox.showinfo("Navigation", "History button clicked!")
 
-# --- Main Application Window ---
-root = tk.Tk()
-root.title("ENNVROOM App")
-root.geometry("400x700") # Adjusted height to fit content and navigation bar
-root.resizable(False, False) # Usually good for mobile-like interfaces
-
-# --- 1. Top Header Frame ---
-header_frame = tk.Frame(root, bg=PURPLE_DARK, height=150)
-header_frame.pack(fill=tk.X, side=tk.TOP)
-header_frame.pack_propagate(False)
-
-# --- Load and place the ENNVROOM Logo ---
-logo_image_filename = "enavroom logo.png" # Filename provided by user
-logo_image_path = get_download_image_path(logo_image_filename)
-
-try:
-    pil_logo_image = Image.open(logo_image_path)
-    pil_logo_image = pil_logo_image.resize((250, 100), Image.LANCZOS) # Adjust size as needed
-    tk_logo_image = ImageTk.PhotoImage(pil_logo_image)
-
-    # Added bd=0, relief="flat" to remove potential border/outline
-    logo_label = tk.Label(header_frame, image=tk_logo_image, bg=PURPLE_DARK, bd=0, relief="flat")
-    logo_label.image = tk_logo_image # Keep a reference
-    logo_label.pack(pady=20)
-except FileNotFoundError:
-    messagebox.showerror("Error", f"Logo image '{logo_image_path}' not found.\nPlease check filename and path.")
-    logo_label = tk.Label(header_frame, text="ENNVROOM", font=("Arial", 36, "bold"), fg=TEXT_COLOR_LIGHT, bg=PURPLE_DARK, bd=0, relief="flat")
-    logo_label.pack(pady=20)
-except Exception as e:
-    messagebox.showerror("Error", f"Could not load logo image: {e}\nFalling back to text.")
-    logo_label = tk.Label(header_frame, text="ENNVROOM", font=("Arial", 36, "bold"), fg=TEXT_COLOR_LIGHT, bg=PURPLE_DARK, bd=0, relief="flat")
-    logo_label.pack(pady=20)
-
-# --- 2. Main Content Area Frame ---
-content_frame = tk.Frame(root, bg=LIGHT_GREY)
-content_frame.pack(fill=tk.BOTH, expand=True)
-
-# --- Service Selection Icons (within content_frame) ---
-service_icons_frame = tk.Frame(content_frame, bg="white")
-# Using expand=True to center its contents horizontally within the content_frame
-service_icons_frame.pack(pady=20, padx=20, fill=tk.X)
-
-# --- Function to load and resize icon from Downloads ---
-# Changed default size to (60, 60) for smaller icons
-def load_and_resize_icon_from_downloads(filename, size=(60, 60)): # MODIFIED: Smaller default size
-    path = get_download_image_path(filename)
+SCREEN_TITLE = "ENNVROOM App"
+SCREEN_GEOMETRY = "400x700"
+
+def build_screen(parent, navigate=None):
+    """Builds the Home screen (Moto Taxi / Car) inside parent and returns its frame.
+       navigate(name) switches screens when running inside app_shell.
+    """
+    # --- Screen Frame (the window itself comes from app_shell) ---
+    root = tk.Frame(parent)
+
+    # --- 1. Top Header Frame ---
+    header_frame = tk.Frame(root, bg=PURPLE_DARK, height=150)
+    header_frame.pack(fill=tk.X, side=tk.TOP)
+    header_frame.pack_propagate(False)
+
+    # --- Load and place the ENNVROOM Logo ---
+    logo_image_filename = "enavroom logo.png" # Filename provided by user
+    logo_image_path = get_download_image_path(logo_image_filename)
+
     try:
-        pil_img = Image.open(path)
-        pil_img = pil_img.resize(size, Image.LANCZOS)
-        return ImageTk.PhotoImage(pil_img)
+        tk_logo_image = image_cache.load_photo(logo_image_path, (250, 100)) # Adjust size as needed
+
+        # Added bd=0, relief="flat" to remove potential border/outline
+        logo_label = tk.Label(header_frame, image=tk_logo_image, bg=PURPLE_DARK, bd=0, relief="flat")
+        logo_label.image = tk_logo_image # Keep a reference
+        logo_label.pack(pady=20)
     except FileNotFoundError:
-        messagebox.showerror("Error", f"Icon '{path}' not found.")
-        return None
+        messagebox.showerror("Error", f"Logo image '{logo_image_path}' not found.\nPlease check filename and path.")
+        logo_label = tk.Label(header_frame, text="ENNVROOM", font=("Arial", 36, "bold"), fg=TEXT_COLOR_LIGHT, bg=PURPLE_DARK, bd=0, relief="flat")
+        logo_label.pack(pady=20)
     except Exception as e:
-        messagebox.showerror("Error", f"Could not load icon '{path}': {e}")
+        messagebox.showerror("Error", f"Could not load logo image: {e}\nFalling back to text.")
+        logo_label = tk.Label(header_frame, text="ENNVROOM", font=("Arial", 36, "bold"), fg=TEXT_COLOR_LIGHT, bg=PURPLE_DARK, bd=0, relief="flat")
+        logo_label.pack(pady=20)
+
+    # --- 2. Main Content Area Frame ---
+    content_frame = tk.Frame(root, bg=LIGHT_GREY)
+    content_frame.pack(fill=tk.BOTH, expand=True)
+
+    # --- Service Selection Icons (within content_frame) ---
+    service_icons_frame = tk.Frame(content_frame, bg="white")
+    # Using expand=True to center its contents horizontally within the content_frame
+    service_icons_frame.pack(pady=20, padx=20, fill=tk.X)
+
+    # --- Function to load and resize icon from Downloads ---
+    # Changed default size to (60, 60) for smaller icons
+    def load_and_resize_icon_from_downloads(filename, size=(60, 60)): # MODIFIED: Smaller default size
+        path = get_download_image_path(filename)
+        try:
+            return image_cache.load_photo(path, size)
+        except FileNotFoundError:
+            messagebox.showerror("Error", f"Icon '{path}' not found.")
+            return None
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load icon '{path}': {e}")
+            return None
+
+    # Moto Taxi Icon
+    tk_moto_taxi_icon = load_and_resize_icon_from_downloads("moto taxi.png") # Filename provided
+    if tk_moto_taxi_icon:
+        moto_taxi_label = tk.Label(service_icons_frame, image=tk_moto_taxi_icon, text="Moto Taxi",
+                                   compound=tk.TOP, font=("Arial", 12), fg=TEXT_COLOR_DARK,
+                                   bg="white", cursor="hand2")
+        moto_taxi_label.image = tk_moto_taxi_icon
+        # MODIFIED: Adjusted padx for closer spacing
+        moto_taxi_label.pack(side=tk.LEFT, padx=15, pady=10)
+        moto_taxi_command = nav_command(navigate, "book_enavroom", on_moto_taxi_click)
+        moto_taxi_label.bind("<Button-1>", lambda e: moto_taxi_command())
+
+    # Car Icon
+    tk_car_icon = load_and_resize_icon_from_downloads("car.png") # Filename provided
+    if tk_car_icon:
+        car_label = tk.Label(service_icons_frame, image=tk_car_icon, text="Car",
+                             compound=tk.TOP, font=("Arial", 12), fg=TEXT_COLOR_DARK,
+                             bg="white", cursor="hand2")
+        car_label.image = tk_car_icon
+        # MODIFIED: Adjusted padx for closer spacing
+        car_label.pack(side=tk.LEFT, padx=15, pady=10)
+        car_command = nav_command(navigate, "book_enacar", on_car_click)
+        car_label.bind("<Button-1>", lambda e: car_command())
+
+    # --- 3. Bottom Navigation Bar Frame ---
+    nav_frame = tk.Frame(root, bg="white", height=70, bd=1, relief=tk.RAISED)
+    nav_frame.pack(fill=tk.X, side=tk.BOTTOM)
+    nav_frame.pack_propagate(False)
+
+    # Create a container frame for buttons to easily center them
+    nav_buttons_container = tk.Frame(nav_frame, bg="white")
+    nav_buttons_container.pack(expand=True)
+
+    # --- Function to create navigation buttons ---
+    def create_nav_button(parent, filename, text, command):
+        tk_icon = load_and_resize_icon_from_downloads(filename, size=(30, 30)) # Smaller icons for nav
+        if tk_icon:
+            button = tk.Button(parent, image=tk_icon, text=text, compound=tk.TOP,
+                               font=("Arial", 10), fg=TEXT_COLOR_DARK, bg="white",
+                               command=command, bd=0, relief=tk.FLAT,
+                               activebackground=LIGHT_GREY, activeforeground=PURPLE_DARK,
+                               cursor="hand2")
+            button.image = tk_icon
+            return button
         return None
 
-# Moto Taxi Icon
-tk_moto_taxi_icon = load_and_resize_icon_from_downloads("moto taxi.png") # Filename provided
-if tk_moto_taxi_icon:
-    moto_taxi_label = tk.Label(service_icons_frame, image=tk_moto_taxi_icon, text="Moto Taxi",
-                               compound=tk.TOP, font=("Arial", 12), fg=TEXT_COLOR_DARK,
-                               bg="white", cursor="hand2")
-    moto_taxi_label.image = tk_moto_taxi_icon
-    # MODIFIED: Adjusted padx for closer spacing
-    moto_taxi_label.pack(side=tk.LEFT, padx=15, pady=10)
-    moto_taxi_label.bind("<Button-1>", lambda e: on_moto_taxi_click())
-
-# Car Icon
-tk_car_icon = load_and_resize_icon_from_downloads("car.png") # Filename provided
-if tk_car_icon:
-    car_label = tk.Label(service_icons_frame, image=tk_car_icon, text="Car",
-                         compound=tk.TOP, font=("Arial", 12), fg=TEXT_COLOR_DARK,
-                         bg="white", cursor="hand2")
-    car_label.image = tk_car_icon
-    # MODIFIED: Adjusted padx for closer spacing
-    car_label.pack(side=tk.LEFT, padx=15, pady=10)
-    car_label.bind("<Button-1>", lambda e: on_car_click())
-
-# --- 3. Bottom Navigation Bar Frame ---
-nav_frame = tk.Frame(root, bg="white", height=70, bd=1, relief=tk.RAISED)
-nav_frame.pack(fill=tk.X, side=tk.BOTTOM)
-nav_frame.pack_propagate(False)
-
-# Create a container frame for buttons to easily center them
-nav_buttons_container = tk.Frame(nav_frame, bg="white")
-nav_buttons_container.pack(expand=True)
-
-# --- Function to create navigation buttons ---
-def create_nav_button(parent, filename, text, command):
-    tk_icon = load_and_resize_icon_from_downloads(filename, size=(30, 30)) # Smaller icons for nav
-    if tk_icon:
-        button = tk.Button(parent, image=tk_icon, text=text, compound=tk.TOP,
-                           font=("Arial", 10), fg=TEXT_COLOR_DARK, bg="white",
-                           command=command, bd=0, relief=tk.FLAT,
-                           activebackground=LIGHT_GREY, activeforeground=PURPLE_DARK,
-                           cursor="hand2")
-        button.image = tk_icon
-        return button
-    return None
-
-# Home Button
-home_button = create_nav_button(nav_buttons_container, "home.png", "HOME", on_home_click) # Filename provided
-if home_button:
-    home_button.pack(side=tk.LEFT, padx=20)
-
-# Messages Button
-messages_button = create_nav_button(nav_buttons_container, "message.png", "MESSAGES", on_messages_click) # Filename provided
-if messages_button:
-    messages_button.pack(side=tk.LEFT, padx=20)
-
-# History Button
-history_button = create_nav_button(nav_buttons_container, "history.png", "HISTORY", on_history_click) # Filename provided
-if history_button:
-    history_button.pack(side=tk.LEFT, padx=20)
-
-# Run the application
-root.mainloop()
\ No newline at end of file
+    # Home Button
+    home_button = create_nav_button(nav_buttons_container, "home.png", "HOME", nav_command(navigate, "home", on_home_click)) # Filename provided
+    if home_button:
+        home_button.pack(side=tk.LEFT, padx=20)
+
+    # Messages Button
+    messages_button = create_nav_button(nav_buttons_container, "message.png", "MESSAGES", nav_command(navigate, "messages", on_messages_click)) # Filename provided
+    if messages_button:
+        messages_button.pack(side=tk.LEFT, padx=20)
+
+    # History Button
+    history_button = create_nav_button(nav_buttons_container, "history.png", "HISTORY", nav_command(navigate, "history", on_history_click)) # Filename provided
+    if history_button:
+        history_button.pack(side=tk.LEFT, padx=20)
+
+    return root
+
+
+if __name__ == "__main__":
+    app_shell.run_standalone(build_screen, SCREEN_TITLE, SCREEN_GEOMETRY)
@@ -0,0 +1,225 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import asset_atlas
+import thumbnail_cache
+
+# --- Shared image cache for every screen ---
+# All load/resize helpers go through here so the same PNG at the same size is
+# only decoded and resized once per process. Entries are keyed by
+# (absolute path, target size, file mtime) so an edited file is picked up again,
+# and the least recently used entries are dropped once the byte budget is hit.
+
+# Default budget, can be overridden with ENAVROOM_IMAGE_CACHE_BYTES or set_budget()
+DEFAULT_BUDGET_BYTES = 32 * 1024 * 1024
+
+
+def _budget_from_env():
+    value = os.environ.get("ENAVROOM_IMAGE_CACHE_BYTES")
+    if value:
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    return DEFAULT_BUDGET_BYTES
+
+
+def _default_interp():
+    """Returns the Tcl interpreter of the current default Tk root (or None)."""
+    import tkinter as tk
+    root = getattr(tk, "_default_root", None)
+    return root.tk if root is not None else None
+
+
+class _Entry:
+    __slots__ = ("pil_image", "photo", "interp", "nbytes")
+
+    def __init__(self, pil_image, nbytes):
+        self.pil_image = pil_image
+        self.photo = None
+        self.interp = None
+        self.nbytes = nbytes
+
+
+class ImageCache:
+    """LRU cache of resized PIL images and their PhotoImage, bounded by bytes."""
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes if max_bytes is not None else _budget_from_env()
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.atlas_hits = 0
+        self.thumbnail_hits = 0
+        self.load_seconds = 0.0  # time spent decoding/resizing/building PhotoImages
+
+    # --- Keys and sizes ---
+    @staticmethod
+    def make_key(path, size=None):
+        """Builds the (path, size, mtime) key. Raises FileNotFoundError if missing."""
+        path = os.path.abspath(path)
+        mtime = os.stat(path).st_mtime_ns
+        return (path, tuple(size) if size else None, mtime)
+
+    @staticmethod
+    def _image_bytes(pil_image):
+        width, height = pil_image.size
+        # Decoded PIL pixels plus the RGBA copy Tk keeps for the PhotoImage
+        return width * height * (len(pil_image.getbands()) + 4)
+
+    # --- Lookups ---
+    def get_pil(self, path, size=None):
+        """Returns the decoded (and resized) PIL image for path, decoding on a miss."""
+        key = self.make_key(path, size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.pil_image
+            self.misses += 1
+
+        start = time.perf_counter()
+        pil_image = self._decode(key[0], key[1])
+        with self._lock:
+            self._store(key, _Entry(pil_image, self._image_bytes(pil_image)))
+            self.load_seconds += time.perf_counter() - start
+        return pil_image
+
+    def get_photo(self, path, size=None):
+        """Returns a PhotoImage for path at size, reusing a cached one when possible."""
+        from PIL import ImageTk
+
+        key = self.make_key(path, size)
+        interp = _default_interp()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                # A PhotoImage belongs to one Tk root; rebuild it (without
+                # decoding again) if the screen now runs under a new root.
+                if entry.photo is None or entry.interp is not interp:
+                    start = time.perf_counter()
+                    entry.photo = ImageTk.PhotoImage(entry.pil_image)
+                    entry.interp = interp
+                    self.load_seconds += time.perf_counter() - start
+                return entry.photo
+            self.misses += 1
+
+        start = time.perf_counter()
+        pil_image = self._decode(key[0], key[1])
+        entry = _Entry(pil_image, self._image_bytes(pil_image))
+        entry.photo = ImageTk.PhotoImage(pil_image)
+        entry.interp = interp
+        with self._lock:
+            self._store(key, entry)
+            self.load_seconds += time.perf_counter() - start
+        return entry.photo
+
+    def _decode(self, path, size):
+        # Pre-sized sprite from the build_assets.py atlas, if there is one
+        sprite = asset_atlas.lookup(path, size)
+        if sprite is not None:
+            self.atlas_hits += 1
+            return sprite
+
+        from PIL import Image
+
+        if not size:
+            with Image.open(path) as img:
+                img.load()
+                return img.copy()
+
+        # Resized on a previous launch, no resampling needed
+        thumbnails = thumbnail_cache.get_shared_cache()
+        thumbnail = thumbnails.get(path, size)
+        if thumbnail is not None:
+            self.thumbnail_hits += 1
+            return thumbnail
+
+        with Image.open(path) as img:
+            resized = img.resize(size, Image.LANCZOS)
+        thumbnails.put(path, size, resized)
+        return resized
+
+    def _store(self, key, entry):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes_used -= old.nbytes
+        self._entries[key] = entry
+        self.bytes_used += entry.nbytes
+        self._evict()
+
+    def _evict(self):
+        # Always keep the newest entry, even if it alone is over budget
+        while self.bytes_used > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self.bytes_used -= old.nbytes
+            self.evictions += 1
+
+    def drop_photo(self, photo):
+        """Forgets a PhotoImage that is being deleted (the decoded PIL image stays cached)."""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.photo is photo:
+                    entry.photo = None
+                    entry.interp = None
+
+    # --- Management ---
+    def set_budget(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes_used = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes_used": self.bytes_used,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "atlas_hits": self.atlas_hits,
+                "thumbnail_hits": self.thumbnail_hits,
+                "load_ms": round(self.load_seconds * 1000, 2),
+            }
+
+
+# --- Module-level shared cache used by all screens ---
+_shared_cache = ImageCache()
+
+
+def get_shared_cache():
+    return _shared_cache
+
+
+def load_photo(path, size=None):
+    """Loads path resized to size as a PhotoImage through the shared cache.
+       Raises FileNotFoundError (or the PIL error) like Image.open would.
+    """
+    return _shared_cache.get_photo(path, size)
+
+
+def load_pil(path, size=None):
+    """Same as load_photo but returns the cached PIL image."""
+    return _shared_cache.get_pil(path, size)
+
+
+def set_budget(max_bytes):
+    _shared_cache.set_budget(max_bytes)
+
+
+def cache_stats():
+    return _shared_cache.stats()
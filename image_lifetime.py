@@ -0,0 +1,165 @@
+import weakref
+from collections import OrderedDict
+
+import image_cache
+
+# --- Image lifetime manager ---
+# Tk only keeps a PhotoImage alive while Python holds a reference to it, which is
+# why screens used to pin every image forever (e.g. map.py's _image_references).
+# Here each PhotoImage is tied to the widgets that show it: once the last of those
+# widgets is destroyed the image goes into a small warm pool (so a rebuilt screen
+# can reuse it), and is freed once it falls out of that pool.
+
+DEFAULT_WARM_POOL_SIZE = 16
+
+
+def _photo_bytes(photo):
+    try:
+        return photo.width() * photo.height() * 4
+    except Exception:
+        return 0
+
+
+def _forget_image(photo):
+    """Drops our references to photo. Tk deletes the image itself once the last
+       Python reference is gone (tkinter.Image.__del__), so a widget that still
+       holds it through .image keeps working.
+    """
+    image_cache.get_shared_cache().drop_photo(photo)
+
+
+class _Tracked:
+    __slots__ = ("photo", "key", "widgets")
+
+    def __init__(self, photo, key):
+        self.photo = photo
+        self.key = key
+        self.widgets = weakref.WeakSet()
+
+
+class ImageLifetimeManager:
+    """Keeps PhotoImages alive exactly as long as a widget is using them."""
+
+    def __init__(self, warm_pool_size=DEFAULT_WARM_POOL_SIZE):
+        self.warm_pool_size = warm_pool_size
+        self._live = {}             # photo name -> _Tracked
+        self._warm = OrderedDict()  # key -> PhotoImage no longer shown anywhere
+        self._warm_keys = {}        # photo name -> key, for images sitting in the warm pool
+        self.released = 0
+
+    # --- Attaching images to widgets ---
+    def attach(self, widget, photo, key=None):
+        """Ties photo to widget. key (optional) lets a released image be reused via get_warm."""
+        if photo is None:
+            return None
+        name = str(photo)
+        tracked = self._live.get(name)
+        if tracked is None:
+            warm_key = self._warm_keys.pop(name, None)
+            if warm_key is not None:
+                # Shown again (e.g. handed out by the image cache), take it out of the pool
+                del self._warm[warm_key]
+            tracked = _Tracked(photo, key if key is not None else warm_key)
+            self._live[name] = tracked
+        if widget in tracked.widgets:
+            return photo
+        tracked.widgets.add(widget)
+
+        def on_destroy(event, widget_ref=weakref.ref(widget), name=name):
+            destroyed = widget_ref()
+            if destroyed is not None and event.widget is destroyed:
+                self.detach(destroyed, name)
+
+        widget.bind("<Destroy>", on_destroy, add="+")
+        return photo
+
+    def hold(self, photo, key):
+        """Parks a freshly created image in the warm pool until a widget attaches it."""
+        if photo is None or str(photo) in self._live:
+            return photo
+        self._release(_Tracked(photo, key))
+        self.released -= 1  # never shown yet, so not counted as a release
+        return photo
+
+    def detach(self, widget, name):
+        tracked = self._live.get(name)
+        if tracked is None:
+            return
+        tracked.widgets.discard(widget)
+        if len(tracked.widgets) == 0:
+            del self._live[name]
+            self._release(tracked)
+
+    def _release(self, tracked):
+        self.released += 1
+        if tracked.key is not None and self.warm_pool_size > 0:
+            previous = self._warm.pop(tracked.key, None)
+            if previous is not None:
+                self._warm_keys.pop(str(previous), None)
+                if previous is not tracked.photo:
+                    _forget_image(previous)
+            self._warm[tracked.key] = tracked.photo
+            self._warm_keys[str(tracked.photo)] = tracked.key
+            while len(self._warm) > self.warm_pool_size:
+                self._drop_oldest_warm()
+        else:
+            _forget_image(tracked.photo)
+
+    # --- Warm pool ---
+    def get_warm(self, key, master=None):
+        """Returns a recently released image for key if it belongs to the current Tk root."""
+        photo = self._warm.get(key)
+        if photo is None:
+            return None
+        interp = master.tk if master is not None else image_cache._default_interp()
+        if photo.tk is not interp:
+            # Image from a previous (destroyed) root, it can't be shown anymore
+            del self._warm[key]
+            self._warm_keys.pop(str(photo), None)
+            _forget_image(photo)
+            return None
+        self._warm.move_to_end(key)
+        return photo
+
+    def _drop_oldest_warm(self):
+        _, photo = self._warm.popitem(last=False)
+        self._warm_keys.pop(str(photo), None)
+        _forget_image(photo)
+
+    def clear_warm(self):
+        while self._warm:
+            self._drop_oldest_warm()
+
+    # --- Reporting ---
+    def stats(self):
+        return {
+            "live_images": len(self._live),
+            "pixel_bytes": sum(_photo_bytes(t.photo) for t in self._live.values()),
+            "warm_images": len(self._warm),
+            "warm_pixel_bytes": sum(_photo_bytes(p) for p in self._warm.values()),
+            "released": self.released,
+        }
+
+
+# --- Module-level manager shared by all screens ---
+_shared_manager = ImageLifetimeManager()
+
+
+def get_shared_manager():
+    return _shared_manager
+
+
+def attach(widget, photo, key=None):
+    return _shared_manager.attach(widget, photo, key)
+
+
+def hold(photo, key):
+    return _shared_manager.hold(photo, key)
+
+
+def get_warm(key, master=None):
+    return _shared_manager.get_warm(key, master)
+
+
+def image_stats():
+    return _shared_manager.stats()
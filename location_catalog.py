@@ -0,0 +1,552 @@
+import bisect
+import csv
+import functools
+import hashlib
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+import unicodedata
+from array import array
+
+import compact_catalog
+import fuzzy_index
+import spatial_index
+
+# --- Location catalog ---
+# The pickup / drop-off places used to be copied as a hard-coded list into four
+# screens. They now live in locations.csv and are loaded once into this catalog,
+# which keeps two small indexes so searching stays fast for big catalogs:
+#   - every distinct word (token) -> the places whose name / address contain it
+#   - a sorted word list (prefix search) and trigram -> words (substring search)
+# A query is split into words; each word is matched against the vocabulary
+# (not against every place), the rarest word drives the candidate scan and the
+# other words are checked on those candidates only. Candidates are ranked with
+# name matches first.
+# Fragments from the middle of words ("aranaque") are looked up through
+# trigrams instead: a bitmap per trigram of the places with a word containing
+# it (built when a search first needs it, TRIGRAM_BITMAPS kept), ANDed over
+# the rarest trigrams of every query word, so only the few places left have
+# their text checked. With 200k places (bench_catalog.py) fragments take about
+# 0.9 ms on average once their bitmaps exist, but about 5 ms (15 ms p95) the
+# first time, while the bitmaps are built; other searches stay under 1 ms.
+# When no place matches at all, misspelled words are corrected against the
+# vocabulary with a fuzzy_index ("hasmine" -> "hasmin", "condo tel" -> "condotel")
+# and the search runs again. That index is built on first use and saved next to
+# the other caches, so later launches only load it.
+# Places with coordinates can also be looked up by distance (nearest(), within())
+# through a spatial_index built on first use.
+#
+# The CSV file needs a "name" and an "address" column; "lat" and "lon" are
+# optional (empty for places without coordinates); geocoder.py can fill them in
+# from the addresses. Big catalogs can be converted to a compact_catalog file,
+# which is mapped instead of read (DEFAULT_PATH may point to either kind). The
+# word indexes are still built on load, but over the file's shared strings: no
+# name or address text is kept per place.
+
+DEFAULT_PATH = os.environ.get(
+    "ENAVROOM_LOCATIONS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "locations.csv"))
+DEFAULT_LIMIT = 10
+DEFAULT_NEAREST = 5
+MAX_CANDIDATES = 100   # matching places ranked per search, keeps very common words cheap
+MAX_SCANNED = 5000     # places looked at per search
+MAX_SET_PLACES = 5000  # broader words are checked on the candidates' text instead
+BITMAP_MIN_PLACES = 1024  # words in at least this many places (and 1/64 of all) get a bitmap
+TRIGRAM_BITMAPS = 1024  # trigram -> places bitmaps (len(places) / 8 bytes each) kept for fragment searches
+TRIGRAM_BITMAP_SHARE = 4  # trigrams of words in more than 1/4 of the places don't narrow enough for one
+FRAGMENT_TRIGRAMS = 2  # rarest trigrams ANDed per query word (the text check does the rest)
+FUZZY_MIN_LENGTH = 3   # shorter words are never corrected
+FUZZY_LONG_WORD = 5    # words this long may be two edits off, shorter ones one
+
+_NON_WORD = re.compile(r"[\W_]+")
+_NON_ZERO_BYTE = re.compile(rb"[^\x00]")
+_BYTE_BITS = [tuple(i for i in range(8) if byte >> i & 1) for byte in range(256)]
+_ASCII_PUNCTUATION = {c: " " for c in range(128) if not chr(c).isalnum()}
+
+
+def normalize(text):
+    """Lower case, accents removed ("Parañaque" -> "paranaque"), words separated by one space."""
+    if text.isascii():
+        return " ".join(text.lower().translate(_ASCII_PUNCTUATION).split())
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+def _bit_ids(bits, limit):
+    """Positions of the set bits in bits (lowest first), at most limit of them."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    place_ids = []
+    for match in _NON_ZERO_BYTE.finditer(data):
+        base = match.start() * 8
+        place_ids.extend(base + i for i in _BYTE_BITS[data[match.start()]])
+        if len(place_ids) >= limit:
+            break
+    return place_ids
+
+
+def _iter_bit_ids(bits):
+    """Positions of the set bits in bits, lowest first, found as they are asked for."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for match in _NON_ZERO_BYTE.finditer(data):
+        base = match.start() * 8
+        for i in _BYTE_BITS[data[match.start()]]:
+            yield base + i
+
+
+class Place:
+    __slots__ = ("id", "name", "address", "lat", "lon")
+
+    def __init__(self, place_id, name, address, lat=None, lon=None):
+        self.id = place_id
+        self.name = name
+        self.address = address
+        self.lat = lat
+        self.lon = lon
+
+    def __repr__(self):
+        return f"Place({self.id}, {self.name!r})"
+
+
+class LocationCatalog:
+    """Places plus the word / trigram indexes used by search()."""
+
+    def __init__(self, places, source=None):
+        start = time.perf_counter()
+        # A CompactPlaces is kept as it is: it is already an indexable sequence
+        self.places = places if isinstance(places, compact_catalog.CompactPlaces) else list(places)
+        self.source = source     # (path, mtime, size) of the file the places came from
+        self._fuzzy = None
+        self._spatial = None
+        self._lazy_lock = threading.Lock()  # builds the fuzzy / spatial index once
+        self._names = []         # normalized name, by place id (list sources; see _name())
+        self._texts = []         # normalized " name address", by place id (leading space for word starts)
+        self._token_ids = {}     # word -> token id
+        self._name_postings = []  # token id -> array of place ids (word in the name)
+        self._addr_postings = []  # token id -> array of place ids (word only in the address)
+
+        if isinstance(self.places, compact_catalog.CompactPlaces):
+            self._index_compact(self.places)
+        else:
+            self._name = self._names.__getitem__
+            self._text = self._texts.__getitem__
+            for place in self.places:
+                name = normalize(place.name)
+                address = normalize(place.address)
+                self._names.append(name)
+                self._texts.append(f" {name} {address}")
+                name_tokens = set(name.split())
+                for token in name_tokens:
+                    self._name_postings[self._token_id(token)].append(place.id)
+                for token in set(address.split()) - name_tokens:
+                    self._addr_postings[self._token_id(token)].append(place.id)
+
+        # Vocabulary indexes: sorted words for prefixes, trigrams for substrings
+        self._sorted_tokens = sorted(self._token_ids)
+        self._sorted_ids = array("I", (self._token_ids[t] for t in self._sorted_tokens))
+        self._sorted_sizes = array("Q", [0])  # running total of postings in sorted word order
+        for token_id in self._sorted_ids:
+            self._sorted_sizes.append(self._sorted_sizes[-1] + len(self._name_postings[token_id])
+                                      + len(self._addr_postings[token_id]))
+        self._trigrams = {}
+        self._trigram_sizes = {}  # trigram -> postings of all the words containing it
+        for token, token_id in self._token_ids.items():
+            size = len(self._name_postings[token_id]) + len(self._addr_postings[token_id])
+            for gram in trigrams(token):
+                self._trigrams.setdefault(gram, array("I")).append(token_id)
+                self._trigram_sizes[gram] = self._trigram_sizes.get(gram, 0) + size
+        self._tokens = list(self._token_ids)
+        self._trigram_bits = functools.lru_cache(maxsize=TRIGRAM_BITMAPS)(self._build_trigram_bits)
+
+        # Very common words ("manila", "tower") also get a bitmap (a Python int with
+        # bit i set for place i) so they can be intersected without a Python loop
+        self._bitmaps = {}
+        bitmap_min = max(BITMAP_MIN_PLACES, len(self.places) // 64)
+        for token_id in range(len(self._tokens)):
+            if len(self._name_postings[token_id]) + len(self._addr_postings[token_id]) >= bitmap_min:
+                bits = bytearray((len(self.places) + 7) // 8)
+                for postings in (self._name_postings, self._addr_postings):
+                    for place_id in postings[token_id]:
+                        bits[place_id >> 3] |= 1 << (place_id & 7)
+                self._bitmaps[token_id] = int.from_bytes(bits, "little")
+        self.build_seconds = time.perf_counter() - start
+
+    def _index_compact(self, places):
+        """Word postings for a CompactPlaces, without a string per place: every distinct
+           string is normalized and split once, and _name() / _text() put a place's text
+           back together from its string ids when a search needs it.
+        """
+        self._normalized = {}  # string id -> normalized string, for the strings searches touch
+        self._name = self._compact_name
+        self._text = self._compact_text
+        string_tokens = [None] * places.string_count  # string id -> token ids (while indexing)
+
+        def tokens(string_id):
+            found = string_tokens[string_id]
+            if found is None:
+                found = string_tokens[string_id] = tuple(
+                    {self._token_id(token) for token in normalize(places.string(string_id)).split()})
+            return found
+
+        name_postings = self._name_postings
+        addr_postings = self._addr_postings
+        for place_id in range(len(places)):
+            name_tokens = tokens(places.name_id(place_id))
+            for token_id in name_tokens:
+                name_postings[token_id].append(place_id)
+            address_tokens = set()
+            for part in places.address_ids(place_id):
+                address_tokens.update(string_tokens[part] or tokens(part))
+            for token_id in address_tokens.difference(name_tokens):
+                addr_postings[token_id].append(place_id)
+
+    def _normalized_string(self, string_id):
+        text = self._normalized.get(string_id)
+        if text is None:
+            text = self._normalized[string_id] = normalize(self.places.string(string_id))
+        return text
+
+    def _compact_name(self, place_id):
+        return self._normalized_string(self.places.name_id(place_id))
+
+    def _compact_text(self, place_id):
+        parts = [self._normalized_string(part) for part in self.places.address_ids(place_id)]
+        return " ".join([""] + [self._compact_name(place_id)] + [part for part in parts if part])
+
+    def _token_id(self, token):
+        token_id = self._token_ids.get(token)
+        if token_id is None:
+            token_id = self._token_ids[token] = len(self._token_ids)
+            self._name_postings.append(array("I"))
+            self._addr_postings.append(array("I"))
+        return token_id
+
+    def __len__(self):
+        return len(self.places)
+
+    def get(self, place_id):
+        return self.places[place_id]
+
+    def names(self):
+        return [place.name for place in self.places]
+
+    # --- Vocabulary lookups ---
+    def _prefix_range(self, query_token):
+        """Slice of the sorted word list holding the words that start with query_token."""
+        low = bisect.bisect_left(self._sorted_tokens, query_token)
+        high = bisect.bisect_left(self._sorted_tokens, query_token + "\uffff", low)
+        return low, high
+
+    def _rarest_trigram(self, query_token):
+        grams = [self._trigrams.get(g, ()) for g in trigrams(query_token)]
+        return min(grams, key=len) if grams else ()
+
+    def _estimate(self, query_token, substrings):
+        """Number of places matching query_token (an upper bound for substrings),
+           without touching the postings.
+        """
+        if substrings:
+            return min(self._trigram_sizes.get(g, 0) for g in trigrams(query_token))
+        low, high = self._prefix_range(query_token)
+        return self._sorted_sizes[high] - self._sorted_sizes[low]
+
+    def _iter_tokens(self, query_token, substrings):
+        """Token ids of the words starting with query_token (the word itself comes
+           first), plus the words containing it when substrings is set.
+        """
+        low, high = self._prefix_range(query_token)
+        yield from self._sorted_ids[low:high]
+        if substrings:
+            for token_id in self._rarest_trigram(query_token):
+                token = self._tokens[token_id]
+                if query_token in token and not token.startswith(query_token):
+                    yield token_id
+
+    def _candidates(self, driver, substrings):
+        """Yields (place id, matched in the name) for places matching driver, name
+           matches first, at most MAX_SCANNED places.
+        """
+        seen = set()
+        for postings, in_name in ((self._name_postings, True), (self._addr_postings, False)):
+            for token_id in self._iter_tokens(driver, substrings):
+                for place_id in postings[token_id]:
+                    if place_id not in seen:
+                        seen.add(place_id)
+                        yield place_id, in_name
+                        if len(seen) >= MAX_SCANNED:
+                            return
+
+    def _word_places(self, query_token, substrings, limit):
+        """Places matching query_token as (set of place ids, bitmap of the common words),
+           or None when the set would hold more than limit places.
+        """
+        place_ids = set()
+        bits = 0
+        for token_id in self._iter_tokens(query_token, substrings):
+            bitmap = self._bitmaps.get(token_id)
+            if bitmap is not None:
+                bits |= bitmap
+            else:
+                place_ids.update(self._name_postings[token_id])
+                place_ids.update(self._addr_postings[token_id])
+                if len(place_ids) > limit:
+                    return None
+        return place_ids, bits
+
+    def _build_trigram_bits(self, gram, names_only):
+        """Bitmap of the places with a word containing gram (in the name, with names_only)."""
+        bits = bytearray((len(self.places) + 7) // 8)
+        common = 0
+        for token_id in self._trigrams.get(gram, ()):
+            bitmap = None if names_only else self._bitmaps.get(token_id)
+            if bitmap is not None:
+                common |= bitmap
+                continue
+            for postings in (self._name_postings,) if names_only else (self._name_postings, self._addr_postings):
+                for place_id in postings[token_id]:
+                    bits[place_id >> 3] |= 1 << (place_id & 7)
+        return int.from_bytes(bits, "little") | common
+
+    def _rare_trigrams(self, query_token, most):
+        """The FRAGMENT_TRIGRAMS trigrams of query_token in the fewest places (at most most).
+           They are also the quickest bitmaps to build.
+        """
+        sizes = self._trigram_sizes
+        grams = [gram for gram in trigrams(query_token) if sizes.get(gram, 0) <= most]
+        return heapq.nsmallest(FRAGMENT_TRIGRAMS, grams, key=sizes.get)
+
+    def _fragment_candidates(self, query_tokens, driver):
+        """(place id, driver in the name) for the places with words holding the rarest
+           trigrams of every query word (the places containing the words, and some more),
+           those with the driver's trigrams in the name first; None when no trigram is
+           rare enough to be worth a bitmap.
+        """
+        most = max(BITMAP_MIN_PLACES, len(self.places) // TRIGRAM_BITMAP_SHARE)
+        bits = None
+        for token in query_tokens:
+            for gram in self._rare_trigrams(token, most):
+                bits = self._trigram_bits(gram, False) if bits is None else bits & self._trigram_bits(gram, False)
+                if not bits:
+                    return []
+        if bits is None:
+            return None
+        in_names = bits
+        for gram in self._rare_trigrams(driver, most):
+            in_names &= self._trigram_bits(gram, True)
+        name = self._name
+        first = ((place_id, driver in name(place_id)) for place_id in _iter_bit_ids(in_names))
+        rest = ((place_id, False) for place_id in _iter_bit_ids(bits & ~in_names))
+        return itertools.islice(itertools.chain(first, rest), MAX_SCANNED)
+
+    def _intersect(self, query_tokens, substrings):
+        """(places matching the rarest word and every other word that could be looked
+           up cheaply, words left to check on the text), or None when the rarest word
+           matches too many places.
+        """
+        driver = self._word_places(query_tokens[0], substrings, MAX_SCANNED)
+        if driver is None:
+            return None
+        place_ids, driver_bits = driver
+        others = []
+        unchecked = []
+        for token in query_tokens[1:]:
+            places = self._word_places(token, substrings, MAX_SET_PLACES)
+            if places is None:
+                unchecked.append(token)
+            elif not places[0] and driver_bits:
+                driver_bits &= places[1]  # only common words: AND the bitmaps in one go
+                others.append(places)
+            else:
+                others.append(places)
+        candidates = place_ids.union(_bit_ids(driver_bits, MAX_SCANNED)) if driver_bits else place_ids
+        for place_ids, bits in others:
+            if not bits:
+                candidates = candidates.intersection(place_ids)
+            elif candidates:
+                data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+                candidates = {p for p in candidates if p in place_ids
+                              or (p >> 3 < len(data) and data[p >> 3] >> (p & 7) & 1)}
+        return candidates, unchecked
+
+    # --- Search ---
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Best matching places for query, best first. Every word has to start a word
+           of the place's name or address; only when nothing matches that way are
+           words found in the middle of other words too ("mesa" -> "Sta. Mesa" first,
+           "aranaque" -> "Parañaque" as a fallback).
+        """
+        query = normalize(query)
+        query_tokens = list(dict.fromkeys(query.split()))
+        if not query_tokens:
+            return self.places[:limit]
+        for substrings in (False, True):
+            ranked = self._search(query, query_tokens, substrings)
+            if ranked:
+                return [self.places[r[2]] for r in heapq.nsmallest(limit, ranked)]
+        corrected = self._correct(query_tokens)
+        if corrected:
+            ranked = self._search(" ".join(corrected), corrected, False)
+            return [self.places[r[2]] for r in heapq.nsmallest(limit, ranked)]
+        return []
+
+    def _search(self, query, query_tokens, substrings):
+        if substrings and any(len(t) < 3 for t in query_tokens):
+            return []  # short words only ever match word starts
+        query_tokens = sorted(query_tokens, key=lambda t: self._estimate(t, substrings))
+        driver = query_tokens[0]
+        if self._estimate(driver, substrings) == 0:
+            return []
+        if substrings:
+            candidates = self._fragment_candidates(query_tokens, driver)
+            if candidates is not None:
+                return self._rank(candidates, query, driver, query_tokens)  # every word checked on the text
+        matches = self._intersect(query_tokens, substrings) if len(query_tokens) > 1 else None
+        if matches is None:
+            # One word, or only very broad words: scan the rarest one's places
+            candidates = self._candidates(driver, substrings)
+            others = query_tokens[1:]
+        else:
+            # Name matches first, like _candidates()
+            place_ids, others = matches
+            name = self._name
+            candidates = sorted(((place_id, driver in name(place_id)) for place_id in place_ids),
+                                key=lambda c: not c[1])
+        return self._rank(candidates, query, driver, others if substrings else [" " + t for t in others])
+
+    def _rank(self, candidates, query, driver, others):
+        """(score, name length, place id) for the first MAX_CANDIDATES candidates whose
+           text contains all the others strings, lower is better.
+        """
+        ranked = []
+        for place_id, in_name in candidates:
+            text = self._text(place_id) if others else ""
+            if all(t in text for t in others):
+                name = self._name(place_id)
+                if name == query:
+                    score = 0
+                elif name.startswith(query):
+                    score = 1
+                elif in_name:
+                    score = 2 if (" " + driver) in (" " + name) else 3
+                else:
+                    score = 4
+                ranked.append((score, len(name), place_id))
+                if len(ranked) >= MAX_CANDIDATES:
+                    break
+        return ranked
+
+    # --- Typo fallback ---
+    def fuzzy(self):
+        """The fuzzy_index over the vocabulary, loaded from its cache file or built."""
+        with self._lazy_lock:
+            if self._fuzzy is None:
+                counts = [len(self._name_postings[i]) + len(self._addr_postings[i])
+                          for i in range(len(self._tokens))]
+                self._fuzzy = fuzzy_index.load_or_build(self._tokens, counts, self._fuzzy_cache_path(),
+                                                        self.source)
+            return self._fuzzy
+
+    def _fuzzy_cache_path(self):
+        if self.source is None:
+            return None
+        name = hashlib.sha1(self.source[0].encode("utf-8")).hexdigest()[:12]
+        return os.path.join(fuzzy_index.DEFAULT_CACHE_DIR, f"fuzzy-{name}.pickle")
+
+    def _correct(self, query_tokens):
+        """query_tokens with misspelled words replaced by vocabulary words, or None
+           when some word can't be corrected (or nothing needed correcting).
+        """
+        corrected = []
+        i = 0
+        while i < len(query_tokens):
+            token = query_tokens[i]
+            # A stray space: "condo tel" -> "condotel"
+            if i + 1 < len(query_tokens) and self._estimate(token + query_tokens[i + 1], False):
+                corrected.append(token + query_tokens[i + 1])
+                i += 2
+                continue
+            if not self._estimate(token, False):
+                if len(token) < FUZZY_MIN_LENGTH:
+                    return None
+                token = self.fuzzy().correct(token, 2 if len(token) >= FUZZY_LONG_WORD else 1)
+                if token is None:
+                    return None
+            corrected.append(token)
+            i += 1
+        return corrected if corrected != query_tokens else None
+
+    # --- Distance ---
+    def spatial(self):
+        """The spatial_index over the places that have coordinates."""
+        with self._lazy_lock:
+            if self._spatial is None:
+                self._spatial = spatial_index.SpatialIndex(
+                    (place.id, place.lat, place.lon) for place in self.places if place.lat is not None)
+            return self._spatial
+
+    def nearest(self, lat, lon, k=DEFAULT_NEAREST):
+        """The k places closest to (lat, lon) as (place, distance in metres), closest first."""
+        return [(self.places[place_id], distance) for distance, place_id in self.spatial().nearest(lat, lon, k)]
+
+    def within(self, lat, lon, radius_m):
+        """Places within radius_m metres of (lat, lon) as (place, distance), closest first."""
+        return [(self.places[place_id], distance)
+                for distance, place_id in self.spatial().within(lat, lon, radius_m)]
+
+    def stats(self):
+        return {
+            "places": len(self.places),
+            "tokens": len(self._token_ids),
+            "trigrams": len(self._trigrams),
+            "trigram_bitmaps": self._trigram_bits.cache_info().currsize,
+            "build_ms": round(self.build_seconds * 1000, 2),
+            "fuzzy": None if self._fuzzy is None else self._fuzzy.stats(),
+            "spatial": None if self._spatial is None else self._spatial.stats(),
+        }
+
+
+def _coordinate(text):
+    return float(text) if text and text.strip() else None
+
+
+def read_places(path):
+    """Yields the Places of a locations CSV file one by one."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            yield Place(i, row["name"], row["address"], _coordinate(row.get("lat")), _coordinate(row.get("lon")))
+
+
+def load_catalog(path=DEFAULT_PATH):
+    info = os.stat(path)
+    source = (os.path.abspath(path), info.st_mtime_ns, info.st_size)
+    if compact_catalog.is_compact(path):
+        return LocationCatalog(compact_catalog.CompactPlaces.open(path), source)
+    return LocationCatalog(read_places(path), source)
+
+
+_shared_catalog = None
+_shared_lock = threading.Lock()
+
+
+def get_catalog():
+    """The catalog loaded from DEFAULT_PATH, shared by every screen."""
+    global _shared_catalog
+    with _shared_lock:
+        if _shared_catalog is None:
+            _shared_catalog = load_catalog()
+        return _shared_catalog
+
+
+def search(query, limit=DEFAULT_LIMIT):
+    return get_catalog().search(query, limit)
+
+
+def nearest(lat, lon, k=DEFAULT_NEAREST):
+    return get_catalog().nearest(lat, lon, k)
@@ -1,7 +1,16 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk, ImageDraw, ImageFont
+from PIL import ImageTk
 import os
+import image_cache
+import image_lifetime
+import booking_service
+import fleet_store
+import fonts
+import quote_cache
+import routing
+import trip
+from async_images import AsyncImageLoader
 
 # --- Color and Font Definitions ---
 PURPLE_DARK = "#360042"
@@ -13,11 +22,16 @@ TEXT_COLOR = "#333333"
 FONT_TITLE = ("Arial", 16, "bold")
 FONT_SUBTITLE = ("Arial", 12, "bold")
 FONT_NORMAL = ("Arial", 10)
+FONT_ROUTE = ("Arial", 10)
 FONT_PRICE = ("Arial", 14, "bold")
 FONT_BUTTON = ("Arial", 14, "bold")
 
-# --- Global variable to hold image references (important for Tkinter) ---
-_image_references = {}
+NEARBY_RADIUS_M = 2000       # drivers counted around the pickup point
+NEARBY_REFRESH_MS = 2000
+
+# --- Image references (important for Tkinter) ---
+# Images are tied to the widgets that show them through image_lifetime, so they are
+# released when the App is destroyed instead of being pinned for the whole process.
 
 # --- Base directory for images (CHANGE THIS TO YOUR ACTUAL DOWNLOADS PATH) ---
 # This path needs to be correct for the images to load.
@@ -29,80 +43,121 @@ def load_image(filename, size=None):
     """
     filepath = os.path.join(IMAGE_BASE_PATH, filename)
     try:
-        img = Image.open(filepath)
-        if size:
-            img = img.resize(size, Image.LANCZOS)
-        photo = ImageTk.PhotoImage(img)
-        # Store a reference to prevent garbage collection
-        _image_references[filepath] = photo
-        return photo
+        photo = image_cache.load_photo(filepath, size)
+        # Keep a reference until a widget attaches it (see attach_image)
+        return image_lifetime.hold(photo, (filepath, size))
     except FileNotFoundError:
         print(f"Warning: Image file not found at {filepath}. Using fallback placeholder.")
-        if size is None: size = (50, 50)
-        placeholder_img = Image.new('RGB', size, (200, 200, 200)) # Grey background
-        d = ImageDraw.Draw(placeholder_img)
-        try:
-            font = ImageFont.truetype("arial.ttf", int(size[1] * 0.3))
-        except IOError:
-            font = ImageFont.load_default()
-
-        text = filename[0].upper() if filename else "N/A"
-        try:
-            bbox = d.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-        except AttributeError:
-            text_width, text_height = d.textsize(text, font=font)
-        
-        x = (size[0] - text_width) / 2
-        y = (size[1] - text_height) / 2
-        d.text((x, y), text, fill=(0,0,0), font=font)
-        
-        photo = ImageTk.PhotoImage(placeholder_img)
-        _image_references[filepath + "_fallback"] = photo
-        return photo
+        return make_placeholder(filename, size)
     except Exception as e:
         print(f"Error loading image {filepath}: {e}. Using fallback placeholder.")
         size = size if size else (50, 50)
-        blank_img = Image.new('RGB', size, (200, 200, 200))
+        error_key = (filepath + "_error_fallback", size)
+        photo = image_lifetime.get_warm(error_key)
+        if photo is not None:
+            return photo
+        blank_img = fonts.placeholder_tile("", size)
         photo = ImageTk.PhotoImage(blank_img)
-        _image_references[filepath + "_error_fallback"] = photo
+        return image_lifetime.hold(photo, error_key)
+
+
+def make_placeholder(filename, size=None):
+    """Grey placeholder with the first letter of filename, shown while an image
+       is loading or when it is missing.
+    """
+    filepath = os.path.join(IMAGE_BASE_PATH, filename)
+    if size is None: size = (50, 50)
+    fallback_key = (filepath + "_fallback", size)
+    photo = image_lifetime.get_warm(fallback_key)
+    if photo is not None:
         return photo
+    text = filename[0].upper() if filename else "N/A"
+    # Font lookup and tile rendering are cached, so missing assets stay cheap
+    placeholder_img = fonts.placeholder_tile(text, size)
+    photo = ImageTk.PhotoImage(placeholder_img)
+    return image_lifetime.hold(photo, fallback_key)
 
 
-class App(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("Enavroom Booking")
-        self.geometry("375x667")
-        self.resizable(False, False)
-        self.configure(bg=GRAY_LIGHT)
+def attach_image(widget, photo):
+    """Ties a PhotoImage from load_image to the widget showing it."""
+    widget.image = photo
+    image_lifetime.attach(widget, photo)
+
+
+def load_image_async(loader, widget, filename, size=None):
+    """Shows the placeholder on widget right away and swaps in the real image once
+       loader has decoded it off the Tk thread. Missing images keep the placeholder.
+    """
+    filepath = os.path.join(IMAGE_BASE_PATH, filename)
+    placeholder = make_placeholder(filename, size)
+    widget.config(image=placeholder)
+    attach_image(widget, placeholder)
+
+    def on_ready(photo):
+        if not widget.winfo_exists():
+            return
+        image_lifetime.hold(photo, (filepath, size))
+        widget.config(image=photo)
+        attach_image(widget, photo)
+        image_lifetime.get_shared_manager().detach(widget, str(placeholder))
+
+    def on_error(error):
+        if isinstance(error, FileNotFoundError):
+            print(f"Warning: Image file not found at {filepath}. Using fallback placeholder.")
+        else:
+            print(f"Error loading image {filepath}: {error}. Using fallback placeholder.")
+
+    loader.load(filepath, size, on_ready, on_error)
+    return placeholder
+
+
+SCREEN_TITLE = "Enavroom Booking"
+SCREEN_GEOMETRY = "375x667"
+
+
+class BookingScreen(tk.Frame):
+    def __init__(self, parent, navigate=None):
+        super().__init__(parent, bg=GRAY_LIGHT)
+        self.navigate = navigate
 
         self.current_selected_vehicle_frame = None
         self.selected_vehicle_type = tk.StringVar(value="")
         self.selected_payment_method = tk.StringVar(value="Cash")
 
+        # Images are decoded on worker threads; widgets show placeholders until then
+        self.image_loader = AsyncImageLoader(self)
+        # Fares are computed off the Tk thread too (the first one may load the road graph)
+        self.quotes = quote_cache.AsyncQuotes(self)
+
         # --- Top Map Section ---
         map_header_frame = tk.Frame(self, bg=PURPLE_DARK, height=50)
         map_header_frame.pack(fill="x", pady=(0,0))
 
         map_text_frame = tk.Frame(map_header_frame, bg=PURPLE_DARK)
-        map_text_frame.pack(pady=10)
+        map_text_frame.pack(pady=(10, 0))
 
-        tk.Label(map_text_frame, text="PUP Main", font=FONT_SUBTITLE, bg=PURPLE_DARK, fg=WHITE).pack(side="left")
+        self.pickup_label = tk.Label(map_text_frame, text=trip.DEFAULT_PICKUP, font=FONT_SUBTITLE, bg=PURPLE_DARK, fg=WHITE)
+        self.pickup_label.pack(side="left")
         tk.Label(map_text_frame, text=" → ", font=FONT_SUBTITLE, bg=PURPLE_DARK, fg=WHITE).pack(side="left")
-        tk.Label(map_text_frame, text="PUP LHS", font=FONT_SUBTITLE, bg=PURPLE_DARK, fg=WHITE).pack(side="left")
+        self.dropoff_label = tk.Label(map_text_frame, text=trip.DEFAULT_DROPOFF, font=FONT_SUBTITLE, bg=PURPLE_DARK, fg=WHITE)
+        self.dropoff_label.pack(side="left")
+
+        # Road distance and travel time, filled in once the screen is shown
+        self.route_label = tk.Label(map_header_frame, text="", font=FONT_ROUTE, bg=PURPLE_DARK, fg=WHITE)
+        self.route_label.pack(pady=(0, 8))
+        self.bind("<Map>", lambda e: self.after_idle(self.show_route) if e.widget is self else None)
+        # app_shell may destroy the screen to free memory: stop the drivers refresh with it
+        self.bind("<Destroy>", self._on_destroy, add="+")
 
 
         map_image_filename = "main_lhs.png" # Filename for the map image
-        map_img = load_image(map_image_filename, (375, 160)) # Resize to fit the UI
-        if map_img:
-            map_label = tk.Label(self, image=map_img, bg=GRAY_LIGHT)
-            map_label.image = map_img
-            map_label.pack(fill="x", pady=(0, 0))
-        else:
-            map_placeholder_label = tk.Label(self, text="Map Placeholder", font=("Arial", 20), bg="lightgray", fg="darkgray")
-            map_placeholder_label.pack(fill="both", expand=False)
+        map_label = tk.Label(self, bg=GRAY_LIGHT)
+        load_image_async(self.image_loader, map_label, map_image_filename, (375, 160)) # Resize to fit the UI
+        map_label.pack(fill="x", pady=(0, 0))
+
+        # Available drivers around the pickup point (see fleet_store.py), over the map
+        self.drivers_label = tk.Label(map_label, text="", font=FONT_NORMAL, bg=WHITE, fg=TEXT_COLOR)
+        self.drivers_label.place(relx=0.02, rely=0.95, anchor="sw")
 
 
         # --- Main Content Frame (Scrollable) ---
@@ -123,12 +178,16 @@ class App(tk.Tk):
             .pack(pady=(20, 10))
 
         self.vehicle_option_frames = []
+        self.price_labels = {}    # vehicle title -> price label, filled in by show_route
+        self.trip = None          # (pickup, dropoff) shown by show_route
+        self._drivers_job = None  # pending show_drivers refresh
+        self._booking = False     # a booking is being saved
 
-        # Service Options Data - UPDATED FILENAMES HERE
+        # Service Options Data - UPDATED FILENAMES HERE (prices come from fares.py)
         service_options = [
-            {"icon": "enavroom_price.png", "title": "Enavroom-vroom", "passengers": "1", "description": "Beat the traffic on a motorcycle ride.", "price": "75"},
-            {"icon": "car_4.png", "title": "Car (4-seater)", "passengers": "4", "description": "Get around town affordably, up to 4 passengers.", "price": "250"},
-            {"icon": "car_6.png", "title": "Car (6-seater)", "passengers": "6", "description": "Roomy and affordable rides for up to six.", "price": "450"},
+            {"icon": "enavroom_price.png", "title": "Enavroom-vroom", "passengers": "1", "description": "Beat the traffic on a motorcycle ride."},
+            {"icon": "car_4.png", "title": "Car (4-seater)", "passengers": "4", "description": "Get around town affordably, up to 4 passengers."},
+            {"icon": "car_6.png", "title": "Car (6-seater)", "passengers": "6", "description": "Roomy and affordable rides for up to six."},
         ]
 
         for option_data in service_options:
@@ -149,17 +208,12 @@ class App(tk.Tk):
         payment_frame.pack(fill="x", padx=20, pady=(20, 10))
 
         # Cash Option - UPDATED FILENAME
-        cash_img = load_image("cash.png", (30, 30))
         cash_button_frame = tk.Frame(payment_frame, bg=WHITE)
         cash_button_frame.pack(side="left", expand=True, padx=10)
 
-        if cash_img:
-            cash_icon_label = tk.Label(cash_button_frame, image=cash_img, bg=WHITE)
-            cash_icon_label.image = cash_img
-            cash_icon_label.pack(pady=(0, 5))
-        else:
-            cash_icon_label = tk.Label(cash_button_frame, text="💵", font=("Arial", 20), bg=WHITE)
-            cash_icon_label.pack(pady=(0, 5))
+        cash_icon_label = tk.Label(cash_button_frame, bg=WHITE)
+        load_image_async(self.image_loader, cash_icon_label, "cash.png", (30, 30))
+        cash_icon_label.pack(pady=(0, 5))
 
         tk.Label(cash_button_frame, text="Cash", font=FONT_SUBTITLE, bg=WHITE, fg=TEXT_COLOR).pack()
         cash_button_frame.bind("<Button-1>", lambda e: self.select_payment_method("Cash"))
@@ -168,17 +222,12 @@ class App(tk.Tk):
 
 
         # Wallet Option - UPDATED FILENAME
-        wallet_img = load_image("wallet.png", (30, 30))
         wallet_button_frame = tk.Frame(payment_frame, bg=WHITE)
         wallet_button_frame.pack(side="left", expand=True, padx=10)
 
-        if wallet_img:
-            wallet_icon_label = tk.Label(wallet_button_frame, image=wallet_img, bg=WHITE)
-            wallet_icon_label.image = wallet_img
-            wallet_icon_label.pack(pady=(0, 5))
-        else:
-            wallet_icon_label = tk.Label(wallet_button_frame, text="👛", font=("Arial", 20), bg=WHITE)
-            wallet_icon_label.pack(pady=(0, 5))
+        wallet_icon_label = tk.Label(wallet_button_frame, bg=WHITE)
+        load_image_async(self.image_loader, wallet_icon_label, "wallet.png", (30, 30))
+        wallet_icon_label.pack(pady=(0, 5))
 
         tk.Label(wallet_button_frame, text="Wallet", font=FONT_SUBTITLE, bg=WHITE, fg=TEXT_COLOR).pack()
         wallet_button_frame.bind("<Button-1>", lambda e: self.select_payment_method("Wallet"))
@@ -198,22 +247,16 @@ class App(tk.Tk):
                     self.select_vehicle_option(frame, title)
                     break
 
-    def create_service_option(self, parent, icon, title, passengers, description, price):
+    def create_service_option(self, parent, icon, title, passengers, description):
         """Creates a clickable service option frame."""
         frame = tk.Frame(parent, bg=WHITE, bd=1, relief="solid",
                          highlightbackground="light grey", highlightthickness=1,
                          padx=10, pady=10)
 
         icon_size = (40, 40)
-        icon_image = load_image(icon, icon_size)
-        if icon_image:
-            icon_label = tk.Label(frame, image=icon_image, bg=WHITE)
-            icon_label.image = icon_image
-            icon_label.grid(row=0, column=0, rowspan=2, padx=(0, 10), pady=5, sticky="n")
-        else:
-            fallback_text = title[0] if title else "?"
-            fallback_label = tk.Label(frame, text=fallback_text, font=("Arial", 20, "bold"), bg=WHITE, fg=PURPLE_DARK, width=3, height=2, bd=1, relief="solid")
-            fallback_label.grid(row=0, column=0, rowspan=2, padx=(0, 10), pady=5, sticky="n")
+        icon_label = tk.Label(frame, bg=WHITE)
+        load_image_async(self.image_loader, icon_label, icon, icon_size)
+        icon_label.grid(row=0, column=0, rowspan=2, padx=(0, 10), pady=5, sticky="n")
 
         text_frame = tk.Frame(frame, bg=WHITE)
         text_frame.grid(row=0, column=1, rowspan=2, sticky="nw")
@@ -222,12 +265,63 @@ class App(tk.Tk):
         tk.Label(text_frame, text=f"• {passengers} passengers", font=FONT_NORMAL, bg=WHITE, fg="gray", anchor="w").pack(fill="x", expand=True)
         tk.Label(text_frame, text=description, font=FONT_NORMAL, bg=WHITE, fg="gray", anchor="w", wraplength=200, justify="left").pack(fill="x", expand=True)
 
-        tk.Label(frame, text=f"₱{price}", font=FONT_PRICE, bg=WHITE, fg=PURPLE_DARK).grid(row=0, column=2, padx=(10, 0), sticky="ne")
+        price_label = tk.Label(frame, text="₱…", font=FONT_PRICE, bg=WHITE, fg=PURPLE_DARK)
+        price_label.grid(row=0, column=2, padx=(10, 0), sticky="ne")
+        self.price_labels[title] = price_label
 
         frame.grid_columnconfigure(1, weight=1)
 
         return frame
 
+    def show_route(self):
+        """Shows the current trip (see trip.py) with its road distance, ETA and fares."""
+        pickup, dropoff = self.trip = trip.get_trip()
+        self.pickup_label.config(text=pickup.name)
+        self.dropoff_label.config(text=dropoff.name)
+        self.route_label.config(text="Calculating route…")
+        for title in self.price_labels:
+            self.show_quote(title)
+        self.show_drivers()
+
+    def show_drivers(self):
+        """Shows how many drivers are near the pickup point; repeats while the screen is shown."""
+        if self._drivers_job is not None:
+            self.after_cancel(self._drivers_job)
+            self._drivers_job = None
+        if not self.winfo_ismapped() or self.trip is None:
+            return
+        pickup = self.trip[0]
+        if pickup.lat is None:
+            self.drivers_label.config(text="")
+            return
+        vehicle = self.selected_vehicle_type.get() or None
+        count = len(fleet_store.get_fleet().nearby(pickup.lat, pickup.lon, NEARBY_RADIUS_M, vehicle))
+        self.drivers_label.config(text=f"{count} driver{'' if count == 1 else 's'} nearby")
+        self._drivers_job = self.after(NEARBY_REFRESH_MS, self.show_drivers)
+
+    def _on_destroy(self, event):
+        if event.widget is self and self._drivers_job is not None:
+            self.after_cancel(self._drivers_job)
+            self._drivers_job = None
+
+    def show_quote(self, vehicle_name):
+        """Shows the fare of vehicle_name for the current trip, and the route it was quoted for
+           (cached, see quote_cache.py; "₱…" while it is being calculated).
+        """
+        if self.trip is None or vehicle_name not in self.price_labels:
+            return
+        pickup, dropoff = shown = self.trip
+
+        def on_ready(quote):
+            if self.trip is not shown:
+                return  # the rider picked another trip meanwhile
+            self.price_labels[vehicle_name].config(text=f"₱{quote.fare}" if quote else "₱—")
+            self.route_label.config(
+                text=routing.describe(quote.metres, quote.seconds) if quote else "Route unavailable")
+
+        if not self.quotes.get(pickup, dropoff, vehicle_name, on_ready):
+            self.price_labels[vehicle_name].config(text="₱…")
+
     def select_vehicle_option(self, selected_frame, vehicle_name):
         """Highlights the selected vehicle option and updates the stored value."""
         if self.current_selected_vehicle_frame:
@@ -236,6 +330,8 @@ class App(tk.Tk):
         selected_frame.config(highlightbackground=HIGHLIGHT_COLOR, highlightthickness=2)
         self.current_selected_vehicle_frame = selected_frame
         self.selected_vehicle_type.set(vehicle_name)
+        self.show_quote(vehicle_name)  # the price may have changed since the screen was shown
+        self.show_drivers()
         print(f"Selected vehicle: {vehicle_name}")
 
     def select_payment_method(self, method):
@@ -250,6 +346,18 @@ class App(tk.Tk):
         if not selected_vehicle:
             messagebox.showwarning("Selection Missing", "Please select a vehicle type before booking.")
             return
+        if self._booking:
+            return  # the previous "Book now" is still being saved
+        if self.trip is None:
+            self.show_route()
+        pickup, dropoff = self.trip
+        # The fare shown is the fare booked: read it once, so nothing is computed on the
+        # Tk thread if the quote expires while the dialog is open
+        found, quote = quote_cache.get_cache().peek(pickup, dropoff, selected_vehicle)
+        if not found:
+            self.show_quote(selected_vehicle)
+            messagebox.showinfo("Calculating fare", "The fare is still being calculated. Please try again in a moment.")
+            return
 
         confirmation_message = (
             f"Booking Details:\n"
@@ -257,15 +365,46 @@ class App(tk.Tk):
             f"Payment: {selected_payment}\n"
             f"Confirm your Enavroom booking?"
         )
-        if messagebox.askyesno("Confirm Booking", confirmation_message):
-            messagebox.showinfo("Success", "Enavroom booked successfully!")
+        if not messagebox.askyesno("Confirm Booking", confirmation_message):
+            print("Booking cancelled.")
+            return
+
+        def on_booked(booking):
+            self._booking = False
+            messagebox.showinfo("Success", f"Enavroom booked successfully! Booking #{booking.id}")
             self.selected_vehicle_type.set("")
             if self.current_selected_vehicle_frame:
                 self.current_selected_vehicle_frame.config(highlightbackground="light grey", highlightthickness=1)
                 self.current_selected_vehicle_frame = None
             self.selected_payment_method.set("Cash")
-        else:
-            print("Booking cancelled.")
+
+        def on_error(error):
+            self._booking = False
+            messagebox.showerror("Booking failed", f"Could not save the booking: {error}")
+
+        # Saving the booking waits for the journal on disk: do it on the quote worker
+        self._booking = True
+        self.quotes.submit(lambda: booking_service.book_trip(pickup, dropoff, selected_vehicle, selected_payment,
+                                                             quote=quote),
+                           on_booked, on_error)
+
+
+def build_screen(parent, navigate=None):
+    """Builds the vehicle/payment booking screen inside parent (used by app_shell)."""
+    return BookingScreen(parent, navigate)
+
+
+class App(tk.Tk):
+    """The booking screen in its own window."""
+    def __init__(self):
+        super().__init__()
+        self.title(SCREEN_TITLE)
+        self.geometry(SCREEN_GEOMETRY)
+        self.resizable(False, False)
+        self.configure(bg=GRAY_LIGHT)
+
+        self.screen = BookingScreen(self)
+        self.screen.pack(fill="both", expand=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,339 @@
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import fares
+import routing
+
+# --- Quote cache ---
+# Prices and ETAs for (pickup, drop-off, vehicle type), so switching between
+# vehicle options or coming back to the booking screen for the same trip
+# reuses the quote. Keys also hold a time bucket (BUCKET_SECONDS of wall clock),
+# so a quote never outlives the surge / traffic window it was made in, and
+# every entry has its own expiry (TTL_SECONDS, NO_ROUTE_TTL_SECONDS for trips
+# without a route). The least recently used entries go once MAX_ENTRIES is hit.
+#
+# Single flight: when several callers ask for the same missing quote at once,
+# one computes it and the others wait for that result.
+#
+#   get_cache().get(pickup, dropoff, "Car (4-seater)")  ->  Quote (fare, metres, seconds) or None
+#   start_prewarm()   # quotes PREWARM_ROUTES on a background thread
+#   get_cache().stats()  ->  hit rate, waits on in-flight quotes, evictions, age of served quotes
+#
+# get() may compute (or wait for a prewarm that is loading the road graph), so
+# the Tk thread uses AsyncQuotes instead: cached quotes are delivered at once,
+# others are computed on a worker and handed back through after(), like
+# async_images does for pictures. AsyncQuotes.submit() runs other work that may
+# need a quote (booking a trip) the same way.
+
+TTL_SECONDS = 120
+NO_ROUTE_TTL_SECONDS = 30
+BUCKET_SECONDS = 300
+POLL_INTERVAL_MS = 15  # AsyncQuotes checking for finished quotes
+
+
+def _max_entries_from_env():
+    value = os.environ.get("ENAVROOM_QUOTE_CACHE_ENTRIES")
+    if value:
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    return 10000
+
+
+MAX_ENTRIES = _max_entries_from_env()
+
+# Campus routes quoted at start-up (both directions): class changes fill these first
+PREWARM_ROUTES = [
+    ("PUP Main", "PUP LHS"), ("PUP Main", "CEA"), ("PUP Main", "Hasmin"), ("PUP Main", "iTech"),
+    ("PUP Main", "COC"), ("PUP Main", "Condotel"), ("PUP Main", "LRT-2 Pureza Station"),
+    ("PUP Main", "Sta. Mesa PNR Station"), ("PUP Main", "SM City Sta. Mesa"), ("PUP LHS", "CEA"),
+    ("Condotel", "LRT-2 Pureza Station"), ("Hasmin", "LRT-2 Pureza Station"),
+]
+
+
+class Quote:
+    __slots__ = ("fare", "metres", "seconds", "created")
+
+    def __init__(self, fare, metres, seconds, created):
+        self.fare = fare          # whole pesos
+        self.metres = metres
+        self.seconds = seconds
+        self.created = created    # time.monotonic() when it was computed
+
+    def __repr__(self):
+        return f"Quote(₱{self.fare}, {routing.describe(self.metres, self.seconds)})"
+
+
+def compute_quote(pickup, dropoff, vehicle):
+    """Fresh Quote from the road distance matrix and the tariffs, or None without a route."""
+    found = routing.get_matrix().get(pickup, dropoff)
+    if found is None:
+        return None
+    metres, seconds = found
+    return Quote(fares.get_tariffs().quote(metres, seconds, vehicle), metres, seconds, time.monotonic())
+
+
+class _Flight:
+    """A quote being computed; other callers wait on done."""
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class QuoteCache:
+    """Quotes by (pickup id, drop-off id, vehicle, time bucket), LRU with a TTL per entry."""
+
+    def __init__(self, compute=compute_quote, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS,
+                 no_route_ttl=NO_ROUTE_TTL_SECONDS, bucket_seconds=BUCKET_SECONDS, clock=time.monotonic,
+                 wall_clock=time.time):
+        self.compute = compute
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.no_route_ttl = no_route_ttl
+        self.bucket_seconds = bucket_seconds
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._entries = OrderedDict()  # key -> (quote or None, expires at)
+        self._flights = {}             # key -> _Flight
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0        # callers that got another caller's in-flight result
+        self.expired = 0
+        self.evictions = 0
+        self.compute_seconds = 0.0
+        self._served = 0        # quotes (not no-route answers) served from the cache
+        self._served_age = 0.0  # and their total age
+        self._max_served_age = 0.0
+
+    def key(self, pickup, dropoff, vehicle):
+        return pickup.id, dropoff.id, vehicle, int(self._wall_clock() // self.bucket_seconds)
+
+    def _cached(self, key, count=True):
+        """(True, quote) for a fresh entry, else (False, None) (lock held). count=False
+           leaves the hit / expiry / age statistics alone.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        now = self._clock()
+        quote, expires = entry
+        if now >= expires:
+            if count:
+                del self._entries[key]
+                self.expired += 1
+            return False, None
+        self._entries.move_to_end(key)
+        if count:
+            self.hits += 1
+            if quote is not None:
+                age = now - quote.created
+                self._served += 1
+                self._served_age += age
+                self._max_served_age = max(self._max_served_age, age)
+        return True, quote
+
+    def cached(self, pickup, dropoff, vehicle):
+        """Like peek(), but a fresh entry counts as a hit (the caller serves it)."""
+        key = self.key(pickup, dropoff, vehicle)
+        with self._lock:
+            return self._cached(key)
+
+    def peek(self, pickup, dropoff, vehicle):
+        """(True, quote or None) if the trip has a fresh entry, else (False, None); never
+           computes or waits, and is not counted as a hit or a miss.
+        """
+        key = self.key(pickup, dropoff, vehicle)
+        with self._lock:
+            return self._cached(key, count=False)
+
+    def get(self, pickup, dropoff, vehicle, ttl=None):
+        """Quote for the trip (None: no route), cached for ttl seconds (default self.ttl)."""
+        key = self.key(pickup, dropoff, vehicle)
+        with self._lock:
+            found, quote = self._cached(key)
+            if found:
+                return quote
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.waits += 1
+                owner = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+                owner = True
+
+        if not owner:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        start = time.perf_counter()
+        try:
+            flight.value = self.compute(pickup, dropoff, vehicle)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                if flight.error is None:
+                    lifetime = self.no_route_ttl if flight.value is None else (self.ttl if ttl is None else ttl)
+                    self._entries[key] = (flight.value, self._clock() + lifetime)
+                    self._entries.move_to_end(key)
+                    self._evict()
+                self.compute_seconds += time.perf_counter() - start
+            flight.done.set()
+        return flight.value
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def prewarm(self, trips, vehicles):
+        """Quotes every (pickup, drop-off) of trips for every vehicle; returns how many."""
+        count = 0
+        for pickup, dropoff in trips:
+            for vehicle in vehicles:
+                self.get(pickup, dropoff, vehicle)
+                count += 1
+        return count
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.waits
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "hit_rate": round((self.hits + self.waits) / lookups, 3) if lookups else None,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "mean_age_s": round(self._served_age / self._served, 1) if self._served else None,
+                "max_age_s": round(self._max_served_age, 1),
+                "compute_ms": round(self.compute_seconds * 1000, 2),
+            }
+
+
+class AsyncQuotes:
+    """Quotes for the Tk thread: on_ready(quote) runs on it, at once when cached."""
+
+    def __init__(self, master, cache=None, poll_ms=POLL_INTERVAL_MS):
+        self.master = master
+        self.cache = cache
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="quotes")
+        self._done = queue.SimpleQueue()
+        self._pending = 0
+        self._poll_id = None
+        self._closed = False
+        master.bind("<Destroy>", self._on_master_destroy, add="+")
+
+    def get(self, pickup, dropoff, vehicle, on_ready):
+        """Calls on_ready(quote or None); returns True if that already happened (cached)."""
+        cache = self.cache or get_cache()
+        found, quote = cache.cached(pickup, dropoff, vehicle)
+        if found:
+            on_ready(quote)
+            return True
+        self.submit(lambda: cache.get(pickup, dropoff, vehicle), on_ready)
+        return False
+
+    def submit(self, work, on_ready, on_error=None):
+        """Runs work() on the quote worker, then on_ready(result) on the Tk thread; if it
+           raised, on_error(error) (by default the error is printed and on_ready gets None).
+        """
+        if self._closed:
+            return
+        future = self._executor.submit(work)
+        future.add_done_callback(lambda f: self._done.put((f, on_ready, on_error)))
+        self._pending += 1
+        if self._poll_id is None:
+            self._poll_id = self.master.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                future, on_ready, on_error = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            try:
+                error = future.exception()
+                if error is None:
+                    on_ready(future.result())
+                elif on_error is not None:
+                    on_error(error)
+                else:
+                    print(f"Error computing a quote: {error}")
+                    on_ready(None)
+            except Exception as e:
+                # e.g. the screen was destroyed while the quote was computed
+                print(f"Error delivering a quote: {e}")
+        if self._pending > 0 and not self._closed:
+            self._poll_id = self.master.after(self.poll_ms, self._poll)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._poll_id is not None:
+            try:
+                self.master.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_master_destroy(self, event):
+        if event.widget is self.master:
+            self.close()
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_cache():
+    """The quote cache shared by every screen."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = QuoteCache()
+        return _shared_cache
+
+
+def prewarm_routes(routes=PREWARM_ROUTES):
+    """Quotes routes (pairs of place names, both directions) for every vehicle with a tariff."""
+    import location_catalog
+    trips = []
+    for pickup_name, dropoff_name in routes:
+        pickup = location_catalog.search(pickup_name, 1)
+        dropoff = location_catalog.search(dropoff_name, 1)
+        if pickup and dropoff:
+            trips += [(pickup[0], dropoff[0]), (dropoff[0], pickup[0])]
+    return get_cache().prewarm(trips, fares.get_tariffs().vehicles)
+
+
+def start_prewarm():
+    """Runs prewarm_routes() on a daemon thread (loads the catalog, roads and tariffs too)."""
+    thread = threading.Thread(target=prewarm_routes, name="quote-prewarm", daemon=True)
+    thread.start()
+    return thread
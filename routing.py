@@ -0,0 +1,350 @@
+import hashlib
+import heapq
+import json
+import math
+import os
+import threading
+import time
+from array import array
+
+import contraction
+import spatial_index
+from spatial_index import haversine_m
+
+# --- Road routing ---
+# Loads a road network from a GeoJSON file (LineStrings with "highway" and
+# optional "oneway" properties, like an OSM export) into adjacency arrays: the
+# roads leaving node n are targets[offsets[n]:offsets[n + 1]], with their length
+# in metres and travel time in seconds (from the road class speed) alongside.
+# Line vertices with the same coordinates (COORDINATE_DIGITS) become one node,
+# which is how roads meet.
+#
+# Routes are the fastest path found with A* (straight-line distance at the top
+# road speed as the estimate of the time left). Trip points are snapped to the
+# nearest road node with spatial_index, and the last bit is added at
+# ACCESS_SPEED_KPH.
+#
+#   graph = get_graph()
+#   graph.route(14.5979, 121.0108, 14.5985, 121.0110)  ->  Route (metres, seconds, path)
+#   get_matrix().get(pickup_place, dropoff_place)       ->  (metres, seconds), memoized
+#
+# get_graph() also attaches the contraction hierarchy of the road file
+# (contraction.py), if one was built beforehand with
+# "python contraction.py --build"; it is never built at runtime. With it,
+# route() and the matrix's place-to-place distances (and so the fares) are
+# hierarchy queries; without it, route() runs A* and the matrix is filled one
+# row at a time, the first question about a place running one Dijkstra search
+# from it to every other place.
+
+DEFAULT_ROADS = os.environ.get(
+    "ENAVROOM_ROADS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "roads.geojson"))
+SPEEDS_KPH = {"motorway": 60, "trunk": 40, "primary": 30, "secondary": 25, "tertiary": 20,
+              "residential": 15, "service": 10}
+DEFAULT_SPEED_KPH = 15
+ACCESS_SPEED_KPH = 10  # place <-> nearest road node
+COORDINATE_DIGITS = 6
+
+
+class Route:
+    __slots__ = ("nodes", "distance_m", "seconds", "coordinates")
+
+    def __init__(self, nodes, distance_m, seconds, coordinates):
+        self.nodes = nodes
+        self.distance_m = distance_m
+        self.seconds = seconds
+        self.coordinates = coordinates  # [(lat, lon)] from start to end
+
+    def __repr__(self):
+        return f"Route({len(self.nodes)} nodes, {describe(self.distance_m, self.seconds)})"
+
+
+def describe(distance_m, seconds):
+    """'2.4 km · 9 min' style summary."""
+    distance = f"{distance_m:.0f} m" if distance_m < 1000 else f"{distance_m / 1000:.1f} km"
+    return f"{distance} · {max(1, round(seconds / 60))} min"
+
+
+class RoadGraph:
+    """Road nodes plus adjacency arrays, and the searches over them."""
+
+    def __init__(self, lats, lons, edges):
+        """edges: (from node, to node, metres, seconds) for every direction that can be driven."""
+        start = time.perf_counter()
+        self.lats = array("d", lats)
+        self.lons = array("d", lons)
+        edges = sorted(edges)
+        self.offsets = array("I", [0] * (len(self.lats) + 1))
+        for source, _, _, _ in edges:
+            self.offsets[source + 1] += 1
+        for node in range(len(self.lats)):
+            self.offsets[node + 1] += self.offsets[node]
+        self.targets = array("I", (e[1] for e in edges))
+        self.lengths = array("d", (e[2] for e in edges))
+        self.seconds = array("d", (e[3] for e in edges))
+
+        self._nodes = spatial_index.SpatialIndex((n, lat, lon) for n, (lat, lon) in enumerate(zip(lats, lons)))
+        # Node positions on the index's flat plane, for the A* estimate
+        self._xs = array("d")
+        self._ys = array("d")
+        for lat, lon in zip(self.lats, self.lons):
+            x, y = self._nodes.project(lat, lon)
+            self._xs.append(x)
+            self._ys.append(y)
+        fastest = max((length / seconds for length, seconds in zip(self.lengths, self.seconds) if seconds),
+                      default=1.0)
+        self._seconds_per_m = 0.99 / fastest  # slightly under: the flat plane is not exact
+        self.source = None     # (path, mtime, size) of the road file, see load_geojson()
+        self.hierarchy = None  # contraction.ContractionHierarchy for route(), if attached
+        self.build_seconds = time.perf_counter() - start
+
+    @classmethod
+    def load_geojson(cls, path=DEFAULT_ROADS):
+        with open(path, encoding="utf-8") as f:
+            features = json.load(f)["features"]
+        node_ids = {}
+        lats = []
+        lons = []
+
+        def node(lon, lat):
+            key = (round(lon, COORDINATE_DIGITS), round(lat, COORDINATE_DIGITS))
+            node_id = node_ids.get(key)
+            if node_id is None:
+                node_id = node_ids[key] = len(lats)
+                lats.append(lat)
+                lons.append(lon)
+            return node_id
+
+        edges = []
+        for feature in features:
+            geometry = feature.get("geometry") or {}
+            properties = feature.get("properties") or {}
+            if geometry.get("type") == "LineString":
+                lines = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiLineString":
+                lines = geometry["coordinates"]
+            else:
+                continue
+            speed = SPEEDS_KPH.get(properties.get("highway"), DEFAULT_SPEED_KPH) / 3.6
+            oneway = str(properties.get("oneway", "no")).lower() in ("yes", "true", "1")
+            for line in lines:
+                for (lon1, lat1, *_), (lon2, lat2, *_) in zip(line, line[1:]):
+                    a = node(lon1, lat1)
+                    b = node(lon2, lat2)
+                    if a == b:
+                        continue
+                    length = haversine_m(lat1, lon1, lat2, lon2)
+                    edges.append((a, b, length, length / speed))
+                    if not oneway:
+                        edges.append((b, a, length, length / speed))
+        graph = cls(lats, lons, edges)
+        info = os.stat(path)
+        graph.source = (os.path.abspath(path), info.st_mtime_ns, info.st_size)
+        return graph
+
+    def __len__(self):
+        return len(self.lats)
+
+    def nearest_node(self, lat, lon):
+        """(node, metres away) of the road node closest to (lat, lon)."""
+        distance, node = self._nodes.nearest(lat, lon, 1)[0]
+        return node, distance
+
+    # --- Searches ---
+    def shortest_path(self, source, target):
+        """(seconds, metres, [nodes]) of the fastest path between two nodes, or None (A*)."""
+        xs, ys, per_m = self._xs, self._ys, self._seconds_per_m
+        tx, ty = xs[target], ys[target]
+        offsets, targets, lengths, seconds = self.offsets, self.targets, self.lengths, self.seconds
+        best = {source: 0.0}
+        metres = {source: 0.0}
+        parent = {source: None}
+        queue = [(math.hypot(xs[source] - tx, ys[source] - ty) * per_m, 0.0, source)]
+        while queue:
+            _, cost, node = heapq.heappop(queue)
+            if node == target:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parent[node]
+                return cost, metres[target], path[::-1]
+            if cost > best[node]:
+                continue  # already reached faster
+            for edge in range(offsets[node], offsets[node + 1]):
+                next_node = targets[edge]
+                next_cost = cost + seconds[edge]
+                if next_cost < best.get(next_node, math.inf):
+                    best[next_node] = next_cost
+                    metres[next_node] = metres[node] + lengths[edge]
+                    parent[next_node] = node
+                    estimate = math.hypot(xs[next_node] - tx, ys[next_node] - ty) * per_m
+                    heapq.heappush(queue, (next_cost + estimate, next_cost, next_node))
+        return None
+
+    def costs_from(self, source, targets=None):
+        """{node: (seconds, metres)} of the fastest paths from source (Dijkstra), stopping
+           once every node in targets has been reached.
+        """
+        remaining = set(targets) if targets is not None else None
+        offsets, next_nodes, lengths, seconds = self.offsets, self.targets, self.lengths, self.seconds
+        best = {source: 0.0}
+        metres = {source: 0.0}
+        done = {}
+        queue = [(0.0, source)]
+        while queue:
+            cost, node = heapq.heappop(queue)
+            if node in done:
+                continue
+            done[node] = (cost, metres[node])
+            if remaining is not None:
+                remaining.discard(node)
+                if not remaining:
+                    break
+            for edge in range(offsets[node], offsets[node + 1]):
+                next_node = next_nodes[edge]
+                next_cost = cost + seconds[edge]
+                if next_cost < best.get(next_node, math.inf):
+                    best[next_node] = next_cost
+                    metres[next_node] = metres[node] + lengths[edge]
+                    heapq.heappush(queue, (next_cost, next_node))
+        return done
+
+    def route(self, from_lat, from_lon, to_lat, to_lon):
+        """Fastest Route between two points (snapped to the nearest roads), or None."""
+        source, source_gap = self.nearest_node(from_lat, from_lon)
+        target, target_gap = self.nearest_node(to_lat, to_lon)
+        if self.hierarchy is not None:
+            found = self.hierarchy.path(source, target)
+        else:
+            found = self.shortest_path(source, target)
+        if found is None:
+            return None
+        seconds, metres, nodes = found
+        gap = source_gap + target_gap
+        coordinates = ([(from_lat, from_lon)] + [(self.lats[n], self.lons[n]) for n in nodes]
+                       + [(to_lat, to_lon)])
+        return Route(nodes, metres + gap, seconds + gap / (ACCESS_SPEED_KPH / 3.6), coordinates)
+
+    def stats(self):
+        return {
+            "nodes": len(self.lats),
+            "edges": len(self.targets),
+            "build_ms": round(self.build_seconds * 1000, 2),
+            "hierarchy": self.hierarchy.stats() if self.hierarchy is not None else None,
+        }
+
+
+class DistanceMatrix:
+    """Memoized (metres, seconds) between places with coordinates, one row per place."""
+
+    def __init__(self, graph, places):
+        self.graph = graph
+        self._snapped = {}  # place id -> (road node, metres to it)
+        for place in places:
+            if place.lat is not None:
+                self._snapped[place.id] = graph.nearest_node(place.lat, place.lon)
+        self._rows = {}     # place id -> {place id: (metres, seconds)}
+        self._pairs = {}    # (place id, place id) -> (metres, seconds) or None, from the hierarchy
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, from_place, to_place):
+        """(metres, seconds) by road from one place to another, or None if either has no
+           coordinates or they aren't connected.
+        """
+        row = self._rows.get(from_place.id)
+        if row is None:
+            if from_place.id not in self._snapped:
+                return None
+            if self.graph.hierarchy is not None:
+                return self._pair(from_place.id, to_place.id)
+            with self._lock:
+                row = self._rows.get(from_place.id)
+                if row is None:
+                    self.misses += 1
+                    row = self._rows[from_place.id] = self._row(from_place.id)
+        else:
+            self.hits += 1
+        return row.get(to_place.id)
+
+    def _pair(self, from_id, to_id):
+        """(metres, seconds) between two places from a hierarchy query, memoized."""
+        key = (from_id, to_id)
+        if key in self._pairs:
+            self.hits += 1
+            return self._pairs[key]
+        if to_id not in self._snapped:
+            return None
+        self.misses += 1
+        source, source_gap = self._snapped[from_id]
+        target, target_gap = self._snapped[to_id]
+        found = self.graph.hierarchy.query(source, target)
+        value = None
+        if found is not None:
+            seconds, metres = found
+            gap = source_gap + target_gap
+            value = (metres + gap, seconds + gap / (ACCESS_SPEED_KPH / 3.6))
+        self._pairs[key] = value
+        return value
+
+    def _row(self, place_id):
+        source, source_gap = self._snapped[place_id]
+        costs = self.graph.costs_from(source, {node for node, _ in self._snapped.values()})
+        access = ACCESS_SPEED_KPH / 3.6
+        row = {}
+        for other_id, (node, gap) in self._snapped.items():
+            if node in costs:
+                seconds, metres = costs[node]
+                row[other_id] = (metres + source_gap + gap, seconds + (source_gap + gap) / access)
+        return row
+
+    def fill(self):
+        """Computes every row now (e.g. on a worker thread at start-up)."""
+        for place_id in self._snapped:
+            if place_id not in self._rows:
+                with self._lock:
+                    self._rows[place_id] = self._row(place_id)
+
+    def stats(self):
+        return {"places": len(self._snapped), "rows": len(self._rows), "pairs": len(self._pairs),
+                "hits": self.hits, "misses": self.misses}
+
+
+_shared_graph = None
+_shared_matrix = None
+_shared_lock = threading.Lock()
+
+
+def get_graph():
+    """The road graph loaded from DEFAULT_ROADS, with its prebuilt contraction hierarchy if
+       there is one, shared by every screen.
+    """
+    global _shared_graph
+    with _shared_lock:
+        if _shared_graph is None:
+            graph = RoadGraph.load_geojson()
+            path = hierarchy_path(graph.source[0])
+            graph.hierarchy = contraction.ContractionHierarchy.load(path, graph.source)
+            if graph.hierarchy is None:
+                print(f"No contraction hierarchy at {path}, routing with plain searches "
+                      f"(python contraction.py --build)")
+            _shared_graph = graph
+        return _shared_graph
+
+
+def hierarchy_path(roads_path):
+    """One hierarchy file per road file, named after its path."""
+    name = hashlib.sha1(roads_path.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(contraction.DEFAULT_CACHE_DIR, f"roads-{name}.pickle")
+
+
+def get_matrix():
+    """The distance matrix between the places of the shared location catalog."""
+    global _shared_matrix
+    graph = get_graph()
+    with _shared_lock:
+        if _shared_matrix is None:
+            import location_catalog
+            _shared_matrix = DistanceMatrix(graph, location_catalog.get_catalog().places)
+        return _shared_matrix
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict
+
+import image_cache
+
+# --- Shared, memoized shape renderer ---
+# The tab buttons, "Recent" box and "Book" buttons are flat shapes drawn with
+# Pillow. Screens ask for the same few (size, radius, colour) combinations over
+# and over, so each one is rendered once and the PhotoImage is reused.
+# Rounded corners can be supersampled (drawn at N times the size and scaled
+# down) for smoother edges; that cost is only paid the first time.
+
+MAX_SHAPES = 128
+
+
+class _Shape:
+    __slots__ = ("pil_image", "photo", "interp")
+
+    def __init__(self, pil_image):
+        self.pil_image = pil_image
+        self.photo = None
+        self.interp = None
+
+
+class ShapeCache:
+    """LRU cache of rendered shapes keyed by geometry and colour."""
+
+    def __init__(self, max_shapes=MAX_SHAPES):
+        self.max_shapes = max_shapes
+        self._shapes = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.render_seconds = 0.0
+
+    def photo(self, key, render):
+        """Returns the PhotoImage for key, calling render() -> PIL image on a miss."""
+        from PIL import ImageTk
+
+        interp = image_cache._default_interp()
+        with self._lock:
+            shape = self._shapes.get(key)
+            if shape is not None:
+                self._shapes.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                start = time.perf_counter()
+                shape = _Shape(render())
+                self.render_seconds += time.perf_counter() - start
+                self._shapes[key] = shape
+                while len(self._shapes) > self.max_shapes:
+                    self._shapes.popitem(last=False)
+                    self.evictions += 1
+            # PhotoImages belong to one Tk root, rebuild from the PIL image if needed
+            if shape.photo is None or shape.interp is not interp:
+                shape.photo = ImageTk.PhotoImage(shape.pil_image)
+                shape.interp = interp
+            return shape.photo
+
+    def clear(self):
+        with self._lock:
+            self._shapes.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "shapes": len(self._shapes),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "render_ms": round(self.render_seconds * 1000, 2),
+            }
+
+
+_shape_cache = ShapeCache()
+
+
+# --- Renderers (PIL images) ---
+def _render_rounded_rectangle(width, height, radius, color, supersample):
+    from PIL import Image, ImageDraw
+
+    scale = max(1, int(supersample))
+    img = Image.new("RGBA", (width * scale, height * scale), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rounded_rectangle((0, 0, width * scale, height * scale), radius * scale, fill=color)
+    if scale > 1:
+        img = img.resize((width, height), Image.LANCZOS)
+    return img
+
+
+def _render_rectangle(width, height, color):
+    from PIL import Image, ImageDraw
+
+    img = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, width, height), fill=color)
+    return img
+
+
+# --- Public helpers used by the screens ---
+def create_rounded_rectangle(width, height, radius, color, supersample=1):
+    """Rounded rectangle PhotoImage. supersample=4 gives anti-aliased corners."""
+    key = ("rounded_rectangle", width, height, radius, color, supersample)
+    return _shape_cache.photo(key, lambda: _render_rounded_rectangle(width, height, radius, color, supersample))
+
+
+def create_rectangle(width, height, color):
+    """Plain rectangle PhotoImage."""
+    key = ("rectangle", width, height, color)
+    return _shape_cache.photo(key, lambda: _render_rectangle(width, height, color))
+
+
+def shape_stats():
+    return _shape_cache.stats()
+
+
+def clear_shapes():
+    _shape_cache.clear()
@@ -0,0 +1,294 @@
+import argparse
+import heapq
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import booking_service
+import dispatch
+import fares
+import fleet_store
+import location_catalog
+import quote_cache
+
+# --- Load simulator ---
+# Runs the booking flow of the screens without Tk, for many riders and drivers
+# at once, to see how much load the app logic takes (e.g. before the semester
+# rush). Riders arrive at random (Poisson, --riders-per-s) and each goes
+# through what the screens do:
+#
+#   search   pickup and drop-off typed into the location boxes (location_catalog.search)
+#   quote    the booking screen pricing every vehicle (quote_cache, as map.show_route)
+#   book     "Book now" (booking_service.book_trip: durable booking + dispatch queue)
+#   assign   waiting for the dispatcher to match a driver (dispatch windows)
+#
+# plus "wait" (arrival until a rider thread is free, i.e. the simulator falling
+# behind) and "total" (arrival until a driver is assigned). book_trip() is
+# called with the trip directly, since trip.py only holds the one trip shown on
+# screen.
+#
+# Drivers (--drivers, plus --drivers-per-s coming online) ping their position
+# every PING_SECONDS into a fleet store. Matched drivers drive to the pickup
+# and the drop-off (at --speedup times real time), then become available again
+# where they dropped the rider off. Bookings go to a journal in a temporary
+# folder, not the app's own.
+#
+# Usage:
+#   python simulator.py --riders-per-s 50 --drivers 2000 --duration 30
+
+PING_SECONDS = 1.0
+PING_JITTER_DEG = 0.0002     # how far an idle driver drifts between pings
+DRIVER_SPREAD_DEG = 0.01     # drivers start about a kilometre around some place
+PICKUP_SPEED_MPS = 20 / 3.6  # driving to the rider
+VEHICLE_SHARES = {"Enavroom-vroom": 0.6, "Car (4-seater)": 0.3, "Car (6-seater)": 0.1}
+PAYMENT_SHARES = {"Cash": 0.7, "Wallet": 0.3}
+CAMPUS = "PUP Main"
+STAGES = ("wait", "search", "quote", "book", "assign", "total")
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class Simulation:
+    """Synthetic riders and drivers going through the booking flow; run() then report()."""
+
+    def __init__(self, folder, riders_per_s=20.0, drivers=1000, drivers_per_s=0.0, duration=30.0,
+                 campus_share=0.3, speedup=60.0, window=dispatch.WINDOW_SECONDS, workers=32, fsync=True, seed=1):
+        self.riders_per_s = riders_per_s
+        self.duration = duration
+        self.campus_share = campus_share
+        self.speedup = speedup
+        self.window = window
+        self.workers = workers
+        self.seed = seed
+        self.rng = random.Random(seed)  # arrivals and drivers (main thread only)
+        self.places = [place for place in location_catalog.get_catalog().places if place.lat is not None]
+        self.campus = next((place for place in self.places if place.name == CAMPUS), self.places[0])
+        self.vehicles = [v for v in fares.get_tariffs().vehicles if v in fleet_store.VEHICLES]
+        self.cache = quote_cache.get_cache()
+        self.service = booking_service.BookingService(folder, fsync=fsync)
+        self.fleet = fleet_store.FleetStore()
+        self.dispatcher = dispatch.Dispatcher(on_assign=self._on_assign, fleet=self.fleet)
+
+        # Driver positions, kept here as well (the store is what the dispatcher sees)
+        import numpy as np
+        self._np = np
+        self._np_rng = np.random.default_rng(seed)
+        total = drivers + int(drivers_per_s * duration)
+        self.initial_drivers = drivers
+        self.drivers_per_s = drivers_per_s
+        homes = [self.rng.choice(self.places) for _ in range(total)]
+        self._lat = np.array([p.lat + self.rng.gauss(0, DRIVER_SPREAD_DEG) for p in homes])
+        self._lon = np.array([p.lon + self.rng.gauss(0, DRIVER_SPREAD_DEG) for p in homes])
+        weights = [VEHICLE_SHARES.get(v, 0) for v in fleet_store.VEHICLES]
+        self._vehicle = np.array(self.rng.choices(range(len(fleet_store.VEHICLES)), weights, k=total))
+        self._online = 0
+
+        self._lock = threading.Lock()
+        self._latencies = {stage: [] for stage in STAGES}
+        self._booked = {}    # booking id -> (arrival, booked at) in time.perf_counter()
+        self._assigned = {}  # booking id -> assigned at
+        self._trips = {}     # booking id -> (trip seconds, drop-off place)
+        self._events = []    # heap of (due, booking id, driver id, next status)
+        self._events_ready = threading.Condition(self._lock)
+        self.arrived = 0
+        self.failed = 0
+        self.completed = 0
+        self.pings = 0
+        self._stopping = False
+
+    # --- Drivers ---
+    def _ping_loop(self):
+        np = self._np
+        rng = self._np_rng
+        start = time.perf_counter()
+        while not self._stopping:
+            elapsed = time.perf_counter() - start
+            online = min(len(self._lat), self.initial_drivers + int(self.drivers_per_s * elapsed))
+            new = self._online < online
+            self._lat[:online] += rng.normal(0, PING_JITTER_DEG, online)
+            self._lon[:online] += rng.normal(0, PING_JITTER_DEG, online)
+            self.fleet.ingest(np.arange(online), self._lat[:online], self._lon[:online],
+                              rng.uniform(0, 360, online), np.full(online, time.time()),
+                              vehicles=self._vehicle[:online] if new else None)
+            self._online = online
+            self.pings += online
+            time.sleep(max(0.0, PING_SECONDS - (time.perf_counter() - start - elapsed)))
+
+    def _on_assign(self, booking_id, driver_id, metres):
+        self.service.set_status(booking_id, "assigned")
+        now = time.perf_counter()
+        with self._lock:
+            self._assigned[booking_id] = now
+            due = now + metres / PICKUP_SPEED_MPS / self.speedup
+            heapq.heappush(self._events, (due, booking_id, driver_id, "picked_up"))
+            self._events_ready.notify()
+
+    def _trip_loop(self):
+        """Moves assigned bookings on to picked_up and completed, and frees their drivers."""
+        while True:
+            with self._lock:
+                while not self._stopping and (not self._events or self._events[0][0] > time.perf_counter()):
+                    self._events_ready.wait(self._events[0][0] - time.perf_counter() if self._events else None)
+                if self._stopping:
+                    return
+                due, booking_id, driver_id, status = heapq.heappop(self._events)
+                seconds, dropoff = self._trips.get(booking_id, (0.0, None))
+                if status == "picked_up":
+                    heapq.heappush(self._events, (due + seconds / self.speedup, booking_id, driver_id, "completed"))
+            self.service.set_status(booking_id, status)
+            if status == "completed":
+                if dropoff is not None:
+                    self._lat[driver_id] = dropoff.lat
+                    self._lon[driver_id] = dropoff.lon
+                self.fleet.set_status([driver_id], fleet_store.AVAILABLE)
+                with self._lock:
+                    self.completed += 1
+
+    # --- Riders ---
+    def _search(self, place, rng):
+        """The place as picked from the suggestions for the first few letters typed."""
+        typed = place.name[:rng.randint(3, 8)]
+        for found in location_catalog.search(typed):
+            if found.id == place.id:
+                return found
+        return location_catalog.search(place.name, 1)[0]
+
+    def _rider(self, arrival, number):
+        start = time.perf_counter()
+        # Every rider has its own generator, so a seed gives the same riders whichever
+        # worker thread happens to run them
+        rng = random.Random(self.seed + 1 + number)
+        if rng.random() < self.campus_share:
+            pickup, dropoff = self.campus, rng.choice(self.places)
+        else:
+            pickup, dropoff = rng.sample(self.places, 2)
+        while dropoff.id == pickup.id:
+            dropoff = rng.choice(self.places)
+        vehicle = rng.choices(list(VEHICLE_SHARES), list(VEHICLE_SHARES.values()))[0]
+        payment = rng.choices(list(PAYMENT_SHARES), list(PAYMENT_SHARES.values()))[0]
+
+        pickup = self._search(pickup, rng)
+        dropoff = self._search(dropoff, rng)
+        searched = time.perf_counter()
+        quotes = {v: self.cache.get(pickup, dropoff, v) for v in self.vehicles}
+        quoted = time.perf_counter()
+        booking = booking_service.book_trip(pickup, dropoff, vehicle, payment, self.service, self.dispatcher)
+        booked = time.perf_counter()
+
+        quote = quotes.get(vehicle)
+        with self._lock:
+            self._trips[booking.id] = (quote.seconds if quote else 0.0, dropoff)
+            self._booked[booking.id] = (arrival, booked)
+            self._latencies["wait"].append(start - arrival)
+            self._latencies["search"].append(searched - start)
+            self._latencies["quote"].append(quoted - searched)
+            self._latencies["book"].append(booked - quoted)
+
+    def _rider_done(self, future):
+        if future.exception() is not None:
+            with self._lock:
+                self.failed += 1
+            print(f"Rider failed: {future.exception()}")
+
+    def run(self, drain=None):
+        """Riders arrive for duration seconds; then waits up to drain seconds (default: two
+           dispatch windows) for the open ones to get drivers.
+        """
+        threads = [threading.Thread(target=self._ping_loop, name="sim-pings", daemon=True),
+                   threading.Thread(target=self._trip_loop, name="sim-trips", daemon=True)]
+        for thread in threads:
+            thread.start()
+        while self._online < self.initial_drivers:
+            time.sleep(0.01)
+        self.dispatcher.start(self.window)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sim-rider") as executor:
+            arrival = start
+            while True:
+                arrival += self.rng.expovariate(self.riders_per_s)
+                if arrival - start >= self.duration:
+                    break
+                time.sleep(max(0.0, arrival - time.perf_counter()))
+                executor.submit(self._rider, arrival, self.arrived).add_done_callback(self._rider_done)
+                self.arrived += 1
+            self.arrival_seconds = time.perf_counter() - start
+        drain_until = time.perf_counter() + (2 * self.window if drain is None else drain)
+        while self.dispatcher.open_requests() and time.perf_counter() < drain_until:
+            time.sleep(0.05)
+        self.seconds = time.perf_counter() - start
+
+        self.dispatcher.stop()
+        with self._lock:
+            self._stopping = True
+            self._events_ready.notify()
+        for thread in threads:
+            thread.join()
+        for booking_id, (arrival, booked) in self._booked.items():
+            assigned = self._assigned.get(booking_id)
+            if assigned is not None:
+                self._latencies["assign"].append(assigned - booked)
+                self._latencies["total"].append(assigned - arrival)
+        self.service.close()
+
+    # --- Report ---
+    def report(self):
+        """Stage rates are per second of arrivals; the run also includes the drain after it."""
+        print(f"{self.arrived} riders in {self.arrival_seconds:.1f} s of arrivals ({self.riders_per_s:g}/s offered), "
+              f"{self.seconds:.1f} s with the drain, {self._online} drivers online")
+        print(f"  {'stage':8} {'count':>7} {'per s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for stage in STAGES:
+            values = sorted(self._latencies[stage])
+            if not values:
+                print(f"  {stage:8} {0:7}")
+                continue
+            print(f"  {stage:8} {len(values):7} {len(values) / self.arrival_seconds:8.1f} "
+                  f"{_percentile(values, 0.5) * 1000:9.2f} {_percentile(values, 0.95) * 1000:9.2f} "
+                  f"{_percentile(values, 0.99) * 1000:9.2f} {values[-1] * 1000:9.2f}")
+        booked = len(self._booked)
+        print(f"  throughput  {booked / self.arrival_seconds:.1f} bookings/s over the arrivals, "
+              f"{booked / self.seconds:.1f}/s over the whole run; "
+              f"{len(self._assigned) / self.seconds:.1f} assignments/s over the whole run")
+        print(f"  booked {booked}, assigned {len(self._assigned)}, completed {self.completed}, "
+              f"still waiting {self.dispatcher.open_requests()}, failed {self.failed}")
+        print(f"  dispatch  {self.dispatcher.stats()}")
+        print(f"  bookings  {self.service.stats()}")
+        print(f"  quotes    {self.cache.stats()}")
+        print(f"  fleet     {self.fleet.stats()}")
+
+
+def run(args, folder):
+    simulation = Simulation(folder, args.riders_per_s, args.drivers, args.drivers_per_s, args.duration,
+                            args.campus, args.speedup, args.window, args.workers, not args.no_fsync, args.seed)
+    simulation.run()
+    simulation.report()
+    return 0 if simulation.failed == 0 else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate riders and drivers going through the booking flow.")
+    parser.add_argument("--riders-per-s", type=float, default=20.0, help="mean rider arrival rate")
+    parser.add_argument("--drivers", type=int, default=1000, help="drivers online at the start")
+    parser.add_argument("--drivers-per-s", type=float, default=0.0, help="drivers coming online per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of rider arrivals")
+    parser.add_argument("--campus", type=float, default=0.3, help="share of riders picked up at the campus")
+    parser.add_argument("--speedup", type=float, default=60.0, help="trip time compression")
+    parser.add_argument("--window", type=float, default=dispatch.WINDOW_SECONDS, help="dispatch window (seconds)")
+    parser.add_argument("--workers", type=int, default=32, help="riders going through the flow at once")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--folder", help="booking journal folder (default: a temporary one)")
+    parser.add_argument("--no-fsync", action="store_true", help="skip fsync in the booking journal")
+    args = parser.parse_args(argv)
+    if args.folder:
+        return run(args, args.folder)
+    with tempfile.TemporaryDirectory() as folder:
+        return run(args, folder)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import heapq
+import math
+import time
+from array import array
+
+# --- Nearest-place lookups (k-d tree) ---
+# Points are (item id, lat, lon). They are projected once onto a flat plane in
+# metres around the middle of the data (equirectangular: good to well under 1%
+# across a city), then stored in one k-d tree: each node splits its points at
+# the median x or y, alternating per level, and small groups stay unsplit as
+# leaves. A query only walks the branches that can still hold something closer
+# than what it has found, so k-nearest and radius queries touch about log(n)
+# nodes instead of every point.
+#
+#   index = SpatialIndex((place.id, place.lat, place.lon) for place in places)
+#   index.nearest(14.5979, 121.0108, k=3)   ->  [(distance_m, item_id), ...]
+#   index.within(14.5979, 121.0108, 500)    ->  [(distance_m, item_id), ...]
+#
+# nearest_many() / within_many() take NumPy arrays of coordinates (NumPy is
+# only imported by them).
+
+EARTH_RADIUS_M = 6371008.8
+LEAF_SIZE = 8              # points per leaf, scanned one by one
+BRUTE_FORCE_POINTS = 2000  # batch queries on smaller indexes compare against every point
+BATCH_CHUNK_PAIRS = 4000000  # query x point distances held in memory at once by a batch
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+class SpatialIndex:
+    """k-d tree over (item id, lat, lon) points."""
+
+    def __init__(self, points, leaf_size=LEAF_SIZE):
+        start = time.perf_counter()
+        points = [(item_id, float(lat), float(lon)) for item_id, lat, lon in points]
+        self.leaf_size = leaf_size
+        self.origin_lat = sum(p[1] for p in points) / len(points) if points else 0.0
+        self._x_scale = EARTH_RADIUS_M * math.cos(math.radians(self.origin_lat)) * math.pi / 180
+        self._y_scale = EARTH_RADIUS_M * math.pi / 180
+
+        # The tree is implicit: the node for points[lo:hi] splits at mid = (lo + hi) // 2
+        # on axis depth % 2, so only the reordered points need storing
+        order = [(self._x_scale * lon, self._y_scale * lat, item_id) for item_id, lat, lon in points]
+        self._sort(order, 0, len(order), 0)
+        self.xs = array("d", (p[0] for p in order))
+        self.ys = array("d", (p[1] for p in order))
+        self.ids = array("q", (p[2] for p in order))
+        self._np_points = None  # NumPy views of xs / ys / ids, made by the first batch
+        self.build_seconds = time.perf_counter() - start
+
+    def _sort(self, order, lo, hi, depth):
+        while hi - lo > self.leaf_size:
+            order[lo:hi] = sorted(order[lo:hi], key=lambda p: p[depth % 2])
+            mid = (lo + hi) // 2
+            self._sort(order, lo, mid, depth + 1)
+            lo, depth = mid + 1, depth + 1  # right half in the loop, saves a recursion level
+
+    def __len__(self):
+        return len(self.ids)
+
+    def project(self, lat, lon):
+        """(x, y) in metres on the index's plane."""
+        return self._x_scale * lon, self._y_scale * lat
+
+    # --- Queries ---
+    def nearest(self, lat, lon, k=1):
+        """The k points closest to (lat, lon) as (distance in metres, item id), closest first."""
+        if k <= 0 or not self.ids:
+            return []
+        x, y = self.project(lat, lon)
+        found = []  # max-heap of (-squared distance, item id), at most k long
+        xs, ys, ids, leaf_size = self.xs, self.ys, self.ids, self.leaf_size
+        stack = [(0, len(ids), 0, 0.0)]  # (lo, hi, depth, squared distance to the node's side)
+        while stack:
+            lo, hi, depth, bound = stack.pop()
+            if len(found) == k and bound >= -found[0][0]:
+                continue
+            if hi - lo <= leaf_size:
+                for i in range(lo, hi):
+                    d2 = (xs[i] - x) ** 2 + (ys[i] - y) ** 2
+                    if len(found) < k:
+                        heapq.heappush(found, (-d2, ids[i]))
+                    elif d2 < -found[0][0]:
+                        heapq.heapreplace(found, (-d2, ids[i]))
+                continue
+            mid = (lo + hi) // 2
+            d2 = (xs[mid] - x) ** 2 + (ys[mid] - y) ** 2
+            if len(found) < k:
+                heapq.heappush(found, (-d2, ids[mid]))
+            elif d2 < -found[0][0]:
+                heapq.heapreplace(found, (-d2, ids[mid]))
+            diff = (x - xs[mid]) if depth % 2 == 0 else (y - ys[mid])
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            stack.append((far[0], far[1], depth + 1, max(bound, diff * diff)))
+            stack.append((near[0], near[1], depth + 1, bound))  # popped first
+        return sorted((math.sqrt(-d2), item_id) for d2, item_id in found)
+
+    def within(self, lat, lon, radius_m):
+        """Every point within radius_m metres of (lat, lon) as (distance, item id), closest first."""
+        x, y = self.project(lat, lon)
+        limit = radius_m * radius_m
+        found = []
+        xs, ys, ids, leaf_size = self.xs, self.ys, self.ids, self.leaf_size
+        stack = [(0, len(ids), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= leaf_size:
+                for i in range(lo, hi):
+                    d2 = (xs[i] - x) ** 2 + (ys[i] - y) ** 2
+                    if d2 <= limit:
+                        found.append((math.sqrt(d2), ids[i]))
+                continue
+            mid = (lo + hi) // 2
+            d2 = (xs[mid] - x) ** 2 + (ys[mid] - y) ** 2
+            if d2 <= limit:
+                found.append((math.sqrt(d2), ids[mid]))
+            diff = (x - xs[mid]) if depth % 2 == 0 else (y - ys[mid])
+            if diff < 0 or diff * diff <= limit:
+                stack.append((lo, mid, depth + 1))
+            if diff >= 0 or diff * diff <= limit:
+                stack.append((mid + 1, hi, depth + 1))
+        found.sort()
+        return found
+
+    # --- Batches (NumPy) ---
+    def _arrays(self):
+        import numpy as np
+        if self._np_points is None:
+            self._np_points = (np.frombuffer(self.xs, dtype=np.float64), np.frombuffer(self.ys, dtype=np.float64),
+                               np.frombuffer(self.ids, dtype=np.int64))
+        return self._np_points
+
+    def nearest_many(self, lats, lons, k=1):
+        """k nearest points for every (lats[i], lons[i]): (distances, ids), two arrays of
+           shape (len(lats), k), closest first. Missing neighbours (fewer than k
+           points) have distance inf and id -1.
+        """
+        import numpy as np
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        distances = np.full((len(lats), k), np.inf)
+        ids = np.full((len(lats), k), -1, dtype=np.int64)
+        count = min(k, len(self.ids))
+        if count == 0:
+            return distances, ids
+        if len(self.ids) > BRUTE_FORCE_POINTS:
+            # Big index: one tree walk per query beats comparing against every point
+            for row, (lat, lon) in enumerate(zip(lats.tolist(), lons.tolist())):
+                for column, (distance, item_id) in enumerate(self.nearest(lat, lon, k)):
+                    distances[row, column] = distance
+                    ids[row, column] = item_id
+            return distances, ids
+        xs, ys, point_ids = self._arrays()
+        qx = self._x_scale * lons
+        qy = self._y_scale * lats
+        chunk = max(1, BATCH_CHUNK_PAIRS // len(point_ids))
+        for start in range(0, len(lats), chunk):
+            stop = start + chunk
+            d2 = (qx[start:stop, None] - xs) ** 2 + (qy[start:stop, None] - ys) ** 2
+            if count < len(point_ids):
+                best = np.argpartition(d2, count - 1, axis=1)[:, :count]
+            else:
+                best = np.broadcast_to(np.arange(count), (len(d2), count))
+            best_d2 = np.take_along_axis(d2, best, axis=1)
+            order = np.argsort(best_d2, axis=1)
+            distances[start:stop, :count] = np.sqrt(np.take_along_axis(best_d2, order, axis=1))
+            ids[start:stop, :count] = point_ids[np.take_along_axis(best, order, axis=1)]
+        return distances, ids
+
+    def within_many(self, lats, lons, radius_m):
+        """Item ids within radius_m of every (lats[i], lons[i]): a list with one id array per
+           query, closest first.
+        """
+        import numpy as np
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if len(self.ids) > BRUTE_FORCE_POINTS or not len(self.ids):
+            return [np.array([item_id for _, item_id in self.within(lat, lon, radius_m)], dtype=np.int64)
+                    for lat, lon in zip(lats.tolist(), lons.tolist())]
+        xs, ys, point_ids = self._arrays()
+        qx = self._x_scale * lons
+        qy = self._y_scale * lats
+        limit = radius_m * radius_m
+        results = []
+        chunk = max(1, BATCH_CHUNK_PAIRS // len(point_ids))
+        for start in range(0, len(lats), chunk):
+            d2 = (qx[start:start + chunk, None] - xs) ** 2 + (qy[start:start + chunk, None] - ys) ** 2
+            for row in d2:
+                inside = np.flatnonzero(row <= limit)
+                results.append(point_ids[inside[np.argsort(row[inside])]])
+        return results
+
+    def stats(self):
+        return {
+            "points": len(self.ids),
+            "leaf_size": self.leaf_size,
+            "build_ms": round(self.build_seconds * 1000, 2),
+            "memory_kb": round((self.xs.itemsize * len(self.xs) * 3) / 1024, 1),
+        }
@@ -0,0 +1,200 @@
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+# --- Startup profiler ---
+# Measures, for each page script, in a fresh interpreter:
+#   import_ms      - importing the page module (and everything it pulls in)
+#   imports        - the most expensive modules, from python -X importtime
+#   build_ms       - creating the window and running build_screen()
+#   asset_ms       - decoding/resizing images and rendering shapes during the build
+#   first_idle_ms  - process start until Tk first goes idle (window is usable)
+#   pil_loaded     - whether Pillow got imported at all
+# Results are written as JSON and compared with the committed budget file.
+#
+# Usage:
+#   python startup_profile.py                      # every page in app_shell.SCREENS
+#   python startup_profile.py home_page map --out profile.json
+#   python home_page.py --profile                  # same, for one page
+#   ENAVROOM_PROFILE=1 python home_page.py
+# Needs a display (use xvfb-run on a headless machine).
+
+_PROCESS_START = time.perf_counter()
+
+PROFILE_ENV = "ENAVROOM_PROFILE"
+PROFILE_FLAG = "--profile"
+DEFAULT_OUT = "startup_profile.json"
+DEFAULT_BUDGET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+BUDGET_KEYS = ("import_ms", "build_ms", "asset_ms", "first_idle_ms")
+TOP_IMPORTS = 15
+
+
+def enabled(argv=None):
+    """True when profiling was asked for with ENAVROOM_PROFILE=1 or --profile."""
+    argv = sys.argv[1:] if argv is None else argv
+    return os.environ.get(PROFILE_ENV, "") not in ("", "0") or PROFILE_FLAG in argv
+
+
+def entry_modules():
+    import app_shell
+    return list(dict.fromkeys(app_shell.SCREENS.values()))
+
+
+# --- Child process: profile one page ---
+def _profile_child(module_name):
+    import tkinter as tk
+
+    import app_shell
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    import_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    root = tk.Tk()
+    root.title(getattr(module, "SCREEN_TITLE", module_name))
+    root.geometry(getattr(module, "SCREEN_GEOMETRY", "400x700"))
+    frame = module.build_screen(root)
+    frame.pack(fill=tk.BOTH, expand=True)
+    root.update_idletasks()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    idle = []
+    root.after_idle(lambda: idle.append(time.perf_counter()))
+    while not idle:
+        root.update()
+    first_idle_ms = (idle[0] - _PROCESS_START) * 1000
+
+    asset_ms = 0.0
+    if "image_cache" in sys.modules:
+        asset_ms += sys.modules["image_cache"].cache_stats()["load_ms"]
+    if "shapes" in sys.modules:
+        asset_ms += sys.modules["shapes"].shape_stats()["render_ms"]
+
+    result = {
+        "module": module_name,
+        "import_ms": round(import_ms, 2),
+        "build_ms": round(build_ms, 2),
+        "asset_ms": round(asset_ms, 2),
+        "first_idle_ms": round(first_idle_ms, 2),
+        "widgets": app_shell.count_widgets(frame),
+        "pil_loaded": any(name == "PIL" or name.startswith("PIL.") for name in sys.modules),
+    }
+    root.destroy()
+    print(json.dumps(result))
+
+
+def _parse_importtime(stderr, module_name):
+    """Turns -X importtime output into [(module, self_ms, cumulative_ms)] under module_name."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # header line
+        name = parts[2].rstrip()
+        depth = len(name) - len(name.lstrip())
+        entries.append((name.strip(), depth, self_us / 1000, cumulative_us / 1000))
+    # Children are printed (more indented) just before their parent; keep the page
+    # module and everything it imported
+    page = []
+    for index, (name, depth, _, _) in enumerate(entries):
+        if name == module_name:
+            start = index
+            while start > 0 and entries[start - 1][1] > depth:
+                start -= 1
+            page = entries[start:index + 1]
+            break
+    page.sort(key=lambda e: e[3], reverse=True)
+    return [{"module": n, "self_ms": round(s, 2), "cumulative_ms": round(c, 2)}
+            for n, _, s, c in page[:TOP_IMPORTS]]
+
+
+def profile_module(module_name, timeout=60):
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    code = f"import startup_profile; startup_profile._profile_child({module_name!r})"
+    env = dict(os.environ)
+    env.pop(PROFILE_ENV, None)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=project_dir,
+                          env=env, capture_output=True, text=True, timeout=timeout)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        error = proc.stderr.strip().splitlines()[-1:] or ["no output"]
+        return {"module": module_name, "error": error[0]}
+    result = json.loads(lines[-1])
+    result["imports"] = _parse_importtime(proc.stderr, module_name)
+    return result
+
+
+# --- Budget ---
+def load_budget(path=DEFAULT_BUDGET):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_budget(results, budget):
+    """Returns a list of human readable budget violations."""
+    failures = []
+    defaults = budget.get("default", {})
+    for result in results:
+        name = result["module"]
+        if "error" in result:
+            failures.append(f"{name}: could not be profiled ({result['error']})")
+            continue
+        limits = dict(defaults, **budget.get("screens", {}).get(name, {}))
+        for key in BUDGET_KEYS:
+            if key in limits and result[key] > limits[key]:
+                failures.append(f"{name}: {key} {result[key]:.1f} > budget {limits[key]}")
+        if not limits.get("pil_allowed", True) and result["pil_loaded"]:
+            failures.append(f"{name}: imports Pillow but is a text-only screen")
+    return failures
+
+
+def run(modules, out_path=DEFAULT_OUT, budget_path=DEFAULT_BUDGET):
+    results = []
+    for module_name in modules:
+        result = profile_module(module_name)
+        results.append(result)
+        if "error" in result:
+            print(f"{module_name:22} ERROR {result['error']}")
+        else:
+            print(f"{module_name:22} import {result['import_ms']:7.1f} ms  build {result['build_ms']:7.1f} ms  "
+                  f"assets {result['asset_ms']:7.1f} ms  first idle {result['first_idle_ms']:7.1f} ms"
+                  f"{'  (PIL)' if result['pil_loaded'] else ''}")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+    print(f"Wrote {out_path}")
+
+    if budget_path and os.path.exists(budget_path):
+        failures = check_budget(results, load_budget(budget_path))
+        for failure in failures:
+            print(f"OVER BUDGET: {failure}")
+        return 1 if failures else 0
+    return 0
+
+
+def profile_current_script():
+    """Called by app_shell.run_standalone in profiling mode for the running page."""
+    module_name = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+    out_path = os.environ.get("ENAVROOM_PROFILE_OUT", DEFAULT_OUT)
+    return run([module_name], out_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile start-up time of the ENAVROOM pages.")
+    parser.add_argument("modules", nargs="*", help="page modules (default: all app_shell screens)")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="JSON results file")
+    parser.add_argument("--budget", default=DEFAULT_BUDGET, help="budget file to check against ('' to skip)")
+    args = parser.parse_args(argv)
+    return run(args.modules or entry_modules(), args.out, args.budget)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import atexit
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+
+# --- Persistent thumbnail cache ---
+# Resized images are stored on disk so a warm start doesn't resample anything.
+# Entries are content addressed: <sha1 of source>-<w>x<h>-<filter>.thumb, so two
+# copies of the same PNG share thumbnails and an edited file gets new ones.
+# Hashing a source means reading it, so index.json remembers the hash per source
+# path together with its mtime and size; while those match the hash is reused.
+# Files are written to a temp file and renamed into place (atomic), and the
+# least recently used thumbnails are removed once the folder is over its cap.
+
+DEFAULT_CACHE_DIR = os.environ.get("ENAVROOM_THUMB_CACHE_DIR") or \
+    os.path.join(os.path.expanduser("~"), ".cache", "enavroom", "thumbnails")
+DEFAULT_MAX_BYTES = int(os.environ.get("ENAVROOM_THUMB_CACHE_BYTES", 64 * 1024 * 1024))
+
+INDEX_FILENAME = "index.json"
+INDEX_VERSION = 1
+# Thumbnail file header: magic, mode (padded to 4 bytes), width, height
+_HEADER = struct.Struct("<4s4sII")
+_MAGIC = b"ETH1"
+
+
+def _hash_file(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, data):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ThumbnailCache:
+    """On-disk cache of resized images, shared across launches."""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+        self._lock = threading.RLock()
+        self._sources = {}   # source path -> [mtime_ns, size, sha1]
+        self._entries = {}   # thumbnail filename -> [bytes, last access time]
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.trimmed = 0
+        self._load_index()
+
+    # --- Index ---
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_FILENAME)
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        if index.get("version") != INDEX_VERSION:
+            return
+        self._sources = index.get("sources", {})
+        self._entries = index.get("entries", {})
+
+    def flush(self):
+        """Writes the index if anything changed since the last flush."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps({"version": INDEX_VERSION, "sources": self._sources,
+                               "entries": self._entries}, separators=(",", ":"))
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                _atomic_write(self._index_path(), data.encode("utf-8"))
+                self._dirty = False
+            except OSError as e:
+                print(f"Warning: could not write thumbnail index: {e}")
+
+    # --- Keys ---
+    def source_hash(self, path):
+        """sha1 of the source file, reusing the stored one while mtime and size match."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            known = self._sources.get(path)
+            if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                return known[2]
+        digest = _hash_file(path)
+        with self._lock:
+            self._sources[path] = [stat.st_mtime_ns, stat.st_size, digest]
+            self._dirty = True
+        return digest
+
+    @staticmethod
+    def thumbnail_name(digest, size, resample):
+        return f"{digest}-{size[0]}x{size[1]}-{resample}.thumb"
+
+    # --- Lookups ---
+    def get(self, path, size, resample="lanczos"):
+        """Returns the cached PIL image for path resized to size, or None."""
+        from PIL import Image
+
+        name = self.thumbnail_name(self.source_hash(path), size, resample)
+        thumb_path = os.path.join(self.cache_dir, name)
+        try:
+            with open(thumb_path, "rb") as f:
+                data = f.read()
+            magic, mode, width, height = _HEADER.unpack_from(data)
+            if magic != _MAGIC:
+                raise ValueError("not a thumbnail file")
+            image = Image.frombytes(mode.rstrip(b"\0").decode("ascii"), (width, height),
+                                    data[_HEADER.size:])
+        except (OSError, ValueError, struct.error):
+            with self._lock:
+                self.misses += 1
+                if self._entries.pop(name, None) is not None:
+                    self._dirty = True
+            return None
+        with self._lock:
+            self.hits += 1
+            self._entries[name] = [len(data), time.time()]
+            self._dirty = True
+        return image
+
+    def put(self, path, size, image, resample="lanczos"):
+        """Stores a resized image for path; failures only print a warning."""
+        name = self.thumbnail_name(self.source_hash(path), size, resample)
+        if image.mode not in ("RGB", "RGBA", "L", "LA"):
+            # Keep the raw format simple (no palettes or 16-bit modes)
+            image = image.convert("RGBA")
+        header = _HEADER.pack(_MAGIC, image.mode.encode("ascii"), image.size[0], image.size[1])
+        data = header + image.tobytes()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            _atomic_write(os.path.join(self.cache_dir, name), data)
+        except OSError as e:
+            print(f"Warning: could not write thumbnail for {path}: {e}")
+            return
+        with self._lock:
+            self.writes += 1
+            self._entries[name] = [len(data), time.time()]
+            self._dirty = True
+            self._trim()
+        self.flush()
+
+    def _trim(self):
+        total = sum(entry[0] for entry in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        for name, (nbytes, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            del self._entries[name]
+            total -= nbytes
+            self.trimmed += 1
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(entry[0] for entry in self._entries.values())
+
+    def clear(self):
+        with self._lock:
+            for name in list(self._entries):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._sources.clear()
+            self._dirty = True
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes_used": sum(entry[0] for entry in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "trimmed": self.trimmed,
+            }
+
+
+# --- Module-level cache used by image_cache ---
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache():
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ThumbnailCache()
+            # Access times are only written out on the next put, so save them at exit
+            atexit.register(_shared_cache.flush)
+        return _shared_cache
+
+
+def set_shared_cache(cache):
+    """Replaces the shared cache (e.g. to point it at another folder)."""
+    global _shared_cache
+    with _shared_lock:
+        _shared_cache = cache
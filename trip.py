@@ -0,0 +1,26 @@
+# --- Current trip ---
+# The pickup and drop-off chosen on the location screens, kept here so the
+# booking screen (built earlier or later, see app_shell) can show the route.
+# Until the rider picks, the campus default trip is used.
+
+DEFAULT_PICKUP = "PUP Main"
+DEFAULT_DROPOFF = "PUP LHS"
+
+_pickup = None
+_dropoff = None
+
+
+def set_trip(pickup, dropoff):
+    global _pickup, _dropoff
+    _pickup = pickup
+    _dropoff = dropoff
+
+
+def get_trip():
+    """(pickup place, drop-off place) of the current trip."""
+    pickup, dropoff = _pickup, _dropoff
+    if pickup is None or dropoff is None:
+        import location_catalog
+        pickup = pickup or location_catalog.search(DEFAULT_PICKUP, 1)[0]
+        dropoff = dropoff or location_catalog.search(DEFAULT_DROPOFF, 1)[0]
+    return pickup, dropoff
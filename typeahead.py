@@ -0,0 +1,146 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Typeahead for ttk.Combobox ---
+# Giving a Combobox every location as values= makes Tk build (and lay out) the
+# whole list. Here the Combobox is editable instead: after the user stops typing
+# for delay_ms the text is searched on a worker thread, and only the best
+# `limit` results are formatted and put in the dropdown.
+# A newer keystroke makes older searches stale: queued ones are cancelled and
+# results of ones already running are dropped when they arrive.
+#
+#   Typeahead(combobox, location_catalog.search, lambda place: place.name, on_select)
+#
+# search(text, limit) runs on the worker thread and returns a list of items.
+# format_item(item) -> the text shown for one item (only called for shown rows).
+# on_select(item) runs when one of the results is picked.
+#
+# With show=, results go to show(items) on the Tk thread instead of the
+# dropdown, and the box can be a plain Entry (e.g. over a VirtualList):
+#
+#   Typeahead(entry, search, show=rows.set_items, limit=100)
+
+DEBOUNCE_MS = 150
+RESULT_LIMIT = 8
+POLL_INTERVAL_MS = 15
+NAVIGATION_KEYS = {"Up", "Down", "Return", "KP_Enter", "Escape", "Tab", "ISO_Left_Tab",
+                   "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R"}
+
+
+class Typeahead:
+    """Debounced, off-thread search feeding the dropdown of an editable Combobox."""
+
+    def __init__(self, combobox, search, format_item=str, on_select=None, placeholder=None,
+                 delay_ms=DEBOUNCE_MS, limit=RESULT_LIMIT, poll_ms=POLL_INTERVAL_MS, show=None):
+        self.combobox = combobox
+        self.search = search
+        self.format_item = format_item
+        self.on_select = on_select
+        self.show = show
+        self.placeholder = placeholder
+        self.delay_ms = delay_ms
+        self.limit = limit
+        self.poll_ms = poll_ms
+        self.results = []       # items behind the dropdown rows
+        self.selected = None    # last item picked from the dropdown
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="typeahead")
+        self._done = queue.SimpleQueue()
+        self._generation = 0    # bumped for every new query; older results are stale
+        self._future = None
+        self._waiting = 0       # searches whose result hasn't been collected yet
+        self._debounce_id = None
+        self._poll_id = None
+        self._closed = False
+        self.stale = 0          # searches cancelled or dropped
+
+        combobox.configure(state="normal")
+        combobox.bind("<KeyRelease>", self._on_key, add="+")
+        combobox.bind("<<ComboboxSelected>>", self._on_selected, add="+")
+        combobox.bind("<FocusIn>", self._on_focus, add="+")
+        combobox.bind("<Destroy>", self._on_destroy, add="+")
+        self.query("")  # something to show before the first key
+
+    # --- Typing ---
+    def _on_focus(self, event):
+        if self.placeholder is not None and self.combobox.get() == self.placeholder:
+            self.combobox.set("")
+
+    def _on_key(self, event):
+        if event.keysym in NAVIGATION_KEYS:
+            return
+        self.selected = None  # the text no longer names a picked item
+        if self._debounce_id is not None:
+            self.combobox.after_cancel(self._debounce_id)
+        self._debounce_id = self.combobox.after(self.delay_ms, self._fire)
+
+    def _fire(self):
+        self._debounce_id = None
+        self.query(self.combobox.get())
+
+    def query(self, text):
+        """Starts a search for text now, making any earlier one stale."""
+        if self._closed:
+            return
+        self._generation += 1
+        if self._future is not None and self._future.cancel():
+            self.stale += 1
+        generation = self._generation
+        self._future = self._executor.submit(self.search, text, self.limit)
+        self._future.add_done_callback(lambda f: self._done.put((generation, f)))
+        self._waiting += 1
+        if self._poll_id is None:
+            self._poll_id = self.combobox.after(self.poll_ms, self._poll)
+
+    # --- Results (Tk thread) ---
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                generation, future = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._waiting -= 1
+            if future.cancelled():
+                continue
+            if generation != self._generation:
+                self.stale += 1
+                continue
+            error = future.exception()
+            if error is not None:
+                print(f"Typeahead search failed: {error}")
+                continue
+            self._show(future.result())
+        if self._waiting > 0 and not self._closed:
+            self._poll_id = self.combobox.after(self.poll_ms, self._poll)
+
+    def _show(self, items):
+        if self.show is not None:
+            self.results = items  # search() already kept to limit; may be a lazy sequence
+            self.show(items)
+            return
+        self.results = list(items[:self.limit])
+        self.combobox.configure(values=[self.format_item(item) for item in self.results])
+
+    def _on_selected(self, event):
+        index = self.combobox.current()
+        if 0 <= index < len(self.results):
+            self.selected = self.results[index]
+            if self.on_select is not None:
+                self.on_select(self.selected)
+
+    # --- Shutdown ---
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for after_id in (self._debounce_id, self._poll_id):
+            if after_id is not None:
+                try:
+                    self.combobox.after_cancel(after_id)
+                except Exception:
+                    pass
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_destroy(self, event):
+        if event.widget is self.combobox:
+            self.close()
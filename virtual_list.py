@@ -0,0 +1,142 @@
+# --- Virtualized list on a Canvas ---
+# Instead of one set of widgets per item, only enough rows to fill the visible
+# part of the canvas are created. Each row is a canvas window placed at
+# index * row_height; when the view scrolls, rows that went out of view are
+# moved to the new positions and filled with the new items. The scroll region is
+# simply len(items) * row_height, so building, scrolling and memory don't depend
+# on how many items there are.
+#
+#   rows = VirtualList(canvas, scrollbar, ROW_HEIGHT, create_row, fill_row, on_select)
+#   rows.set_items(places)
+#
+# create_row(parent) builds one empty row widget and returns it.
+# fill_row(row, item) shows item in a row made by create_row.
+# on_select(item) is called when a row is clicked.
+#
+# Rows all have the same height, so text that wraps must be kept to the lines a
+# row has room for: clip_lines() cuts it to max_lines, ending in "…".
+
+
+def clip_lines(font, text, width, max_lines):
+    """text cut to what fits in max_lines lines of width pixels when wrapped at spaces (as
+       a Label with wraplength=width does), ending in "…" if anything was cut. font is a
+       tkinter.font.Font.
+    """
+    if font.measure(text) <= width:
+        return text
+    lines = []
+    line = ""
+    for word in text.split(" "):
+        candidate = f"{line} {word}" if line else word
+        if line and font.measure(candidate) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    lines.append(line)
+    if len(lines) <= max_lines:
+        return text
+    last = lines[max_lines - 1]
+    while last and font.measure(last.rstrip(" ,") + "…") > width:
+        last = last[:-1]
+    return " ".join(lines[:max_lines - 1] + [last.rstrip(" ,") + "…"])
+
+
+class VirtualList:
+    """Recycles a small pool of row widgets to show any number of items."""
+
+    def __init__(self, canvas, scrollbar, row_height, create_row, fill_row, on_select=None):
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.row_height = row_height
+        self.create_row = create_row
+        self.fill_row = fill_row
+        self.on_select = on_select
+        self.items = []
+        self._rows = []      # [row widget, canvas window id, index shown or None]
+        self._width = 1
+
+        canvas.configure(yscrollcommand=self._on_view_change, yscrollincrement=row_height)
+        scrollbar.configure(command=canvas.yview)
+        canvas.bind("<Configure>", self._on_resize, add="+")
+
+    # --- Data ---
+    def set_items(self, items):
+        """Shows items (anything with len() and indexing), scrolled to the top."""
+        self.items = items
+        self.canvas.configure(scrollregion=(0, 0, self._width, len(items) * self.row_height))
+        self.canvas.yview_moveto(0)
+        for row in self._rows:
+            row[2] = None
+        self._refresh()
+
+    def item_at(self, row_widget):
+        for row, _, index in self._rows:
+            if row is row_widget and index is not None:
+                return self.items[index]
+        return None
+
+    # --- Row pool ---
+    def _add_row(self):
+        row = self.create_row(self.canvas)
+        window = self.canvas.create_window(0, 0, window=row, anchor="nw",
+                                           width=self._width, height=self.row_height, state="hidden")
+        # Bound once per pooled row, not once per item
+        for widget in self._descendants(row):
+            widget.bind("<Button-1>", lambda e, r=row: self._on_click(r), add="+")
+        self._rows.append([row, window, None])
+
+    def _descendants(self, widget):
+        yield widget
+        for child in widget.winfo_children():
+            yield from self._descendants(child)
+
+    def _ensure_rows(self):
+        visible = self.canvas.winfo_height() // self.row_height + 2
+        while len(self._rows) < visible:
+            self._add_row()
+
+    # --- Scrolling ---
+    def _refresh(self):
+        self._ensure_rows()
+        first = max(0, int(self.canvas.canvasy(0)) // self.row_height)
+        wanted = range(first, min(first + len(self._rows), len(self.items)))
+
+        # Rows still showing a wanted item stay where they are
+        free = []
+        shown = set()
+        for row in self._rows:
+            if row[2] in wanted:
+                shown.add(row[2])
+            else:
+                free.append(row)
+        for index in wanted:
+            if index in shown:
+                continue
+            row = free.pop()
+            self.fill_row(row[0], self.items[index])
+            self.canvas.coords(row[1], 0, index * self.row_height)
+            self.canvas.itemconfigure(row[1], state="normal")
+            row[2] = index
+        for row in free:
+            self.canvas.itemconfigure(row[1], state="hidden")
+            row[2] = None
+
+    def _on_view_change(self, first, last):
+        self.scrollbar.set(first, last)
+        self._refresh()
+
+    def _on_resize(self, event):
+        self._width = event.width
+        for _, window, _ in self._rows:
+            self.canvas.itemconfigure(window, width=event.width)
+        self.canvas.configure(scrollregion=(0, 0, self._width, len(self.items) * self.row_height))
+        self._refresh()
+
+    def _on_click(self, row_widget):
+        item = self.item_at(row_widget)
+        if item is not None and self.on_select is not None:
+            self.on_select(item)
+
+    def stats(self):
+        return {"items": len(self.items), "row_widgets": len(self._rows)}